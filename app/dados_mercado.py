@@ -0,0 +1,126 @@
+"""
+Dados de mercado compartilhados pelas páginas do app (app.py e pages/).
+
+As interações nunca esperam pelas fontes: uma thread por servidor mantém o
+snapshot em dia, e a página lê o snapshot que estiver na memória. Só o
+primeiro carregamento (sem snapshot algum) busca nas fontes. Os resultados
+das páginas ficam em st.cache_data com a versão do snapshot na chave, então
+um snapshot novo invalida os cálculos antigos sem precisar limpar nada.
+Quem depende só de uma parte dos dados (o VNA da Selic, os Prefixados...)
+usa versao_componente(), que só muda quando essa parte muda (tesouro.cdc).
+
+O Streamlit não deixa acrescentar rotas HTTP, então as métricas do processo
+(tesouro.metricas) são servidas por um servidor à parte, só quando
+TESOURO_METRICAS_PORTA está definida (em 127.0.0.1, salvo
+TESOURO_METRICAS_ENDERECO).
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import streamlit as st
+
+# Permite importar o pacote tesouro/ a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tesouro import cdc, mercado, metricas
+from tesouro.disjuntor import orcamento
+
+# Tempo máximo (s) que uma busca nas fontes pode levar; fonte lenta ou fora
+# do ar é servida do cache e marcada como desatualizada
+ORCAMENTO_FONTES = 5.0
+
+# Idade (s) a partir da qual o snapshot é mostrado como desatualizado
+IDADE_DESATUALIZADO = 600
+
+# A cada quantos segundos o renovador confere se o snapshot venceu, e a
+# idade (s) a partir da qual ele busca um novo
+INTERVALO_RENOVACAO = 30
+IDADE_RENOVACAO = 300
+
+
+@st.cache_resource(show_spinner=False)
+def renovador_mercado():
+    """Thread (uma por servidor) que renova o snapshot em segundo plano"""
+    def renovar():
+        while True:
+            try:
+                with orcamento(ORCAMENTO_FONTES):
+                    mercado.obter_snapshot(IDADE_RENOVACAO)
+            except Exception:
+                pass  # segue com o snapshot anterior; tenta de novo na próxima volta
+            time.sleep(INTERVALO_RENOVACAO)
+
+    thread = threading.Thread(target=renovar, name="renovador-mercado", daemon=True)
+    thread.start()
+    return thread
+
+
+@st.cache_resource(show_spinner=False)
+def servidor_metricas():
+    """Servidor de /metrics (um por servidor do Streamlit), ou None se desligado"""
+    if not metricas.PORTA_APP:
+        return None
+    try:
+        return metricas.servir(metricas.PORTA_APP)
+    except OSError as e:
+        print(f"⚠️  Métricas não iniciadas na porta {metricas.PORTA_APP}: {e}")
+        return None
+
+
+def obter_snapshot():
+    """Snapshot de mercado do processo (None se as fontes falharem)"""
+    renovador_mercado()
+    servidor_metricas()
+    snapshot = mercado.snapshot_em_dia(float('inf'))
+    if snapshot is not None:
+        return snapshot
+    try:
+        with st.spinner("Buscando dados de mercado..."), orcamento(ORCAMENTO_FONTES):
+            return mercado.obter_snapshot()
+    except Exception as e:
+        st.error(f"Erro ao buscar dados de mercado: {e}")
+        return None
+
+
+def versao_mercado():
+    """Versão do snapshot de mercado (0 se não for possível obtê-lo)"""
+    snapshot = obter_snapshot()
+    return snapshot.versao if snapshot is not None else 0
+
+
+def versao_componente(componente):
+    """
+    Versão em que um componente dos dados mudou pela última vez (0 sem
+    snapshot); ver tesouro.cdc.versao_de
+    """
+    if obter_snapshot() is None:
+        return 0
+    return cdc.versao_de(componente) or 0
+
+
+def ler_numero(texto):
+    """'13,92' ou '13.92' -> 13.92"""
+    return float(texto.replace(',', '.'))
+
+
+def situacao_mercado():
+    """Aviso de dados desatualizados e versão do snapshot, na barra lateral"""
+    snapshot = mercado.snapshot_em_dia(float('inf'))
+    if snapshot is None:
+        return
+
+    # Dados servidos do cache porque alguma fonte falhou
+    if snapshot.obsoletos or snapshot.idade() > IDADE_DESATUALIZADO:
+        fontes = ', '.join(snapshot.obsoletos) or 'todas'
+        st.sidebar.warning(
+            f"⚠️ Dados possivelmente desatualizados (fontes: {fontes}). "
+            f"Última atualização há {snapshot.idade() / 60:.0f} min."
+        )
+
+    st.sidebar.markdown("---")
+    st.sidebar.caption(
+        f"🗄️ Mercado: versão {snapshot.versao} · "
+        f"atualizado há {snapshot.idade() / 60:.0f} min"
+    )
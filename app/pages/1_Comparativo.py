@@ -0,0 +1,113 @@
+import streamlit as st
+from datetime import date
+import sys
+from pathlib import Path
+
+# Permite importar dados_mercado.py (pasta app/), que por sua vez põe a raiz
+# do repositório no caminho para o pacote tesouro/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from dados_mercado import ler_numero, obter_snapshot, situacao_mercado, versao_mercado
+from tesouro import cdc
+from tesouro.cache import obter_cache
+from tesouro.precificacao import reprecificar_catalogo
+
+st.set_page_config(
+    page_title="Comparativo - Tesouro Direto",
+    page_icon="📊",
+    layout="wide",
+)
+
+# Colunas da tabela: chave de precificar_catalogo -> título exibido
+COLUNAS = {
+    'titulo': 'Título',
+    'vencimento': 'Vencimento',
+    'taxa': 'Taxa (% a.a.)',
+    'preco': 'PU calculado',
+    'pu_mercado': 'PU Tesouro',
+    'dias_uteis': 'Dias úteis',
+    'duration': 'Duration (anos)',
+    'duration_modificada': 'Duration modificada',
+    'rentabilidade_bruta': 'Rentab. bruta (% a.a.)',
+    'rentabilidade_liquida': 'Rentab. líquida (% a.a.)',
+}
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def tabela_comparativa(versao, hoje, selic, ipca_mensal):
+    """Catálogo inteiro precificado numa passada só (None sem snapshot)"""
+    snapshot = obter_snapshot()
+    if snapshot is None:
+        return None
+    # Último catálogo precificado com estes parâmetros, de qualquer versão:
+    # de um snapshot para o outro só os títulos que mudaram são refeitos
+    anteriores = obter_cache('catalogo_precificado', 64)
+    chave = (hoje, selic, ipca_mensal)
+    versao_anterior, anterior = anteriores.obter(chave, (None, None))
+    delta = cdc.delta_desde(versao_anterior) if anterior is not None else None
+    if delta is not None and delta.versao != snapshot.versao:
+        delta = None
+    resultado = reprecificar_catalogo(anterior, snapshot, delta, selic, ipca_mensal, data=hoje)
+    anteriores.guardar(chave, (snapshot.versao, resultado))
+    tabela = pd.DataFrame({titulo: resultado[chave] for chave, titulo in COLUNAS.items()})
+    tabela['Vencimento'] = pd.to_datetime(tabela['Vencimento']).dt.date
+    return tabela.sort_values(['Título', 'Vencimento'], ignore_index=True)
+
+@st.fragment
+def painel_comparativo():
+    with st.form("form_comparativo", border=False):
+        col1, col2, col3 = st.columns([1, 1, 1])
+        selic_input = col1.text_input(
+            "📈 Taxa Selic projetada (% a.a.):",
+            value="11.75",
+            help="Usada no Tesouro Selic. Ex: 11.75"
+        )
+        ipca_input = col2.text_input(
+            "📈 IPCA projetado mensal (%):",
+            value="0.59",
+            help="Usado no Tesouro IPCA+. Ex: 0.59"
+        )
+        col3.markdown("&nbsp;")
+        col3.form_submit_button("🔄 Atualizar", type="primary", use_container_width=True)
+
+    try:
+        selic = ler_numero(selic_input)
+        ipca_mensal = ler_numero(ipca_input)
+    except ValueError:
+        st.error("❌ Por favor, insira valores numéricos válidos!")
+        return
+
+    tabela = tabela_comparativa(versao_mercado(), date.today(), selic, ipca_mensal)
+    if tabela is None or tabela.empty:
+        st.error("❌ Não foi possível carregar os títulos. Verifique sua conexão.")
+        return
+
+    st.dataframe(
+        tabela,
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            'Taxa (% a.a.)': st.column_config.NumberColumn(format="%.2f"),
+            'PU calculado': st.column_config.NumberColumn(format="R$ %.2f"),
+            'PU Tesouro': st.column_config.NumberColumn(format="R$ %.2f"),
+            'Duration (anos)': st.column_config.NumberColumn(format="%.2f"),
+            'Duration modificada': st.column_config.NumberColumn(format="%.2f"),
+            'Rentab. bruta (% a.a.)': st.column_config.NumberColumn(format="%.2f"),
+            'Rentab. líquida (% a.a.)': st.column_config.NumberColumn(format="%.2f"),
+        },
+    )
+    st.caption(
+        "Clique no cabeçalho de uma coluna para ordenar. Rentabilidade líquida de "
+        "IOF, IR e custódia da B3 para quem leva o título até o vencimento."
+    )
+
+def main():
+    st.title("📊 Comparativo do Catálogo")
+    st.markdown("### Todos os títulos sem cupom, precificados de uma vez")
+    st.markdown("---")
+
+    painel_comparativo()
+    situacao_mercado()
+
+main()
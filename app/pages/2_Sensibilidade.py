@@ -0,0 +1,144 @@
+import streamlit as st
+from datetime import date
+import sys
+from pathlib import Path
+
+# Permite importar dados_mercado.py (pasta app/), que por sua vez põe a raiz
+# do repositório no caminho para o pacote tesouro/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import altair as alt
+import pandas as pd
+
+from dados_mercado import ler_numero, obter_snapshot, situacao_mercado, versao_mercado
+from tesouro import mercado
+from tesouro.sensibilidade import grade_pu, reduzir
+
+st.set_page_config(
+    page_title="Sensibilidade - Tesouro Direto",
+    page_icon="🌡️",
+    layout="wide",
+)
+
+PRODUTOS = {
+    "Tesouro Prefixado": 'prefixado',
+    "Tesouro Selic": 'selic',
+    "Tesouro IPCA+": 'ipca',
+}
+
+# Pontos desenhados no mapa de calor (datas × taxas) e na curva PU × taxa
+PONTOS_MAPA = 80
+PONTOS_CURVA = 200
+
+# A grade fica em st.cache_resource (sem cópia a cada leitura): mexer nos
+# sliders só consulta posições dela, nada é recalculado
+@st.cache_resource(max_entries=16, show_spinner=False)
+def obter_grade(versao, hoje, produto, ano, taxa_central, selic, ipca_mensal):
+    """Grade datas × taxas de PUs do título (None se ele não existir)"""
+    snapshot = obter_snapshot()
+    if snapshot is None:
+        return None
+    return grade_pu(snapshot, produto, ano, taxa_central, inicio=hoje,
+                    selic=selic, ipca_mensal=ipca_mensal)
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def mapa_de_calor(versao, hoje, produto, ano, taxa_central, selic, ipca_mensal):
+    """Grade reduzida para o desenho, em formato longo (data, taxa, pu)"""
+    grade = obter_grade(versao, hoje, produto, ano, taxa_central, selic, ipca_mensal)
+    pequena = reduzir(grade, PONTOS_MAPA, PONTOS_MAPA)
+    return pd.DataFrame({
+        'data': pd.to_datetime(pequena.datas).repeat(len(pequena.taxas)),
+        'taxa': list(pequena.taxas) * len(pequena.datas),
+        'pu': pequena.pu.ravel(),
+    })
+
+@st.fragment
+def painel_sensibilidade():
+    snapshot = obter_snapshot()
+    if snapshot is None:
+        return
+
+    with st.form("form_sensibilidade", border=False):
+        col1, col2, col3, col4, col5 = st.columns([1.2, 1, 1, 1, 1])
+        nome_produto = col1.selectbox("🎯 Título:", list(PRODUTOS))
+        ano_input = col2.text_input("📅 Ano de vencimento:", value="2029")
+        taxa_input = col3.text_input(
+            "📊 Taxa central (% a.a.):",
+            value="13.92",
+            help="Prefixado: taxa anual; Selic: ágio/deságio; IPCA+: taxa real"
+        )
+        selic_input = col4.text_input("📈 Selic projetada (% a.a.):", value="11.75")
+        ipca_input = col5.text_input("📈 IPCA projetado mensal (%):", value="0.59")
+        st.form_submit_button("🚀 Montar grade", type="primary")
+
+    try:
+        produto = PRODUTOS[nome_produto]
+        ano = int(ano_input)
+        taxa_central = ler_numero(taxa_input)
+        selic = ler_numero(selic_input)
+        ipca_mensal = ler_numero(ipca_input)
+    except ValueError:
+        st.error("❌ Por favor, insira valores numéricos válidos!")
+        return
+
+    chave = (versao_mercado(), date.today(), produto, ano, taxa_central, selic, ipca_mensal)
+    with st.spinner("Montando a grade..."):
+        grade = obter_grade(*chave)
+
+    if grade is None:
+        disponiveis = ', '.join(map(str, mercado.anos_prefixado(snapshot)))
+        st.error(f"❌ Título para {ano} não encontrado!"
+                 + (f" Prefixados disponíveis: {disponiveis}" if produto == 'prefixado' else ""))
+        return
+
+    # Sliders: só leem a grade já calculada
+    col1, col2 = st.columns(2)
+    taxa = col1.slider(
+        "📊 Taxa (% a.a.)",
+        min_value=float(grade.taxas[0]),
+        max_value=float(grade.taxas[-1]),
+        value=float(taxa_central),
+        step=float(grade.taxas[1] - grade.taxas[0]),
+        format="%.2f",
+    )
+    data = col2.select_slider(
+        "📅 Data de referência",
+        options=grade.datas.astype(object).tolist(),
+        format_func=lambda d: d.strftime('%d/%m/%Y'),
+    )
+    linha, coluna = grade.posicao(data, taxa)
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("💎 Preço Unitário", f"R$ {grade.pu[linha, coluna]:,.2f}")
+    col2.metric("📊 Taxa", f"{grade.taxas[coluna]:.2f}% a.a.")
+    col3.metric("📅 Vencimento", grade.vencimento.astype(object).strftime('%d/%m/%Y'))
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader("🌡️ PU por data e taxa")
+        mapa = mapa_de_calor(*chave)
+        st.altair_chart(
+            alt.Chart(mapa).mark_rect().encode(
+                x=alt.X('taxa:O', title='Taxa (% a.a.)', axis=alt.Axis(labelExpr="format(datum.value, '.1f')", labelOverlap=True)),
+                y=alt.Y('yearmonthdate(data):O', title='Data', axis=alt.Axis(format='%m/%Y', labelOverlap=True)),
+                color=alt.Color('pu:Q', title='PU', scale=alt.Scale(scheme='viridis')),
+                tooltip=[alt.Tooltip('data:T', format='%d/%m/%Y'), 'taxa:Q', alt.Tooltip('pu:Q', format=',.2f')],
+            ),
+            use_container_width=True,
+        )
+
+    with col2:
+        st.subheader(f"📈 PU × taxa em {data.strftime('%d/%m/%Y')}")
+        colunas = reduzir(grade, 1, PONTOS_CURVA).taxas
+        posicoes = grade.taxas.searchsorted(colunas)
+        st.line_chart(pd.DataFrame({'PU': grade.pu[linha, posicoes]}, index=pd.Index(colunas, name='Taxa (% a.a.)')))
+
+def main():
+    st.title("🌡️ Sensibilidade do Preço")
+    st.markdown("### PU por taxa e data de referência")
+    st.markdown("---")
+
+    painel_sensibilidade()
+    situacao_mercado()
+
+main()
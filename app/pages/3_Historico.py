@@ -0,0 +1,142 @@
+import streamlit as st
+import sys
+from pathlib import Path
+
+# Permite importar dados_mercado.py (pasta app/), que por sua vez põe a raiz
+# do repositório no caminho para o pacote tesouro/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from dados_mercado import situacao_mercado
+from tesouro.amostragem import janela, lttb
+from tesouro.historico import CAMINHO_PADRAO, carregar_arquivo
+
+st.set_page_config(
+    page_title="Histórico - Tesouro Direto",
+    page_icon="📜",
+    layout="wide",
+)
+
+SERIES = {
+    "PU de compra": 'pu_compra',
+    "PU de venda": 'pu_venda',
+    "Taxa de compra (% a.a.)": 'taxa_compra',
+    "Taxa de venda (% a.a.)": 'taxa_venda',
+}
+
+# Pontos enviados ao navegador por gráfico (mais ou menos a largura em pixels)
+PONTOS_PADRAO = 800
+
+# O arquivo (matrizes datas × títulos) é carregado uma vez por servidor e
+# lido sem cópia; a assinatura do arquivo na chave recarrega quando ele muda
+@st.cache_resource(max_entries=1, show_spinner=False)
+def obter_arquivo(assinatura):
+    return carregar_arquivo()
+
+def assinatura_arquivo():
+    estado = CAMINHO_PADRAO.stat()
+    return estado.st_mtime_ns, estado.st_size
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def serie_reduzida(assinatura, coluna, serie, inicio, fim, pontos):
+    """
+    Trecho [inicio, fim] da série de um título, reduzido por LTTB
+
+    Só o trecho pedido é percorrido, então o tempo e o tamanho da resposta
+    dependem de `pontos`, não do tamanho do histórico.
+    """
+    arquivo = obter_arquivo(assinatura)
+    trecho = janela(arquivo['datas'], inicio, fim)
+    datas = arquivo['datas'][trecho]
+    valores = arquivo[serie][trecho, coluna]
+    posicoes = lttb(datas, valores, pontos)
+    return pd.DataFrame({'data': pd.to_datetime(datas[posicoes]), 'valor': valores[posicoes]}), len(datas)
+
+def limites_da_selecao(evento):
+    """(início, fim) do intervalo selecionado no gráfico geral, ou None"""
+    try:
+        inicio, fim = evento.selection['zoom']['data']
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return None
+    converter = lambda v: pd.to_datetime(v, unit='ms') if isinstance(v, (int, float)) else pd.to_datetime(v)
+    return np.datetime64(converter(inicio).date(), 'D'), np.datetime64(converter(fim).date(), 'D')
+
+def grafico(tabela, titulo_eixo, selecao=None):
+    linha = alt.Chart(tabela).mark_line().encode(
+        x=alt.X('data:T', title='Data'),
+        y=alt.Y('valor:Q', title=titulo_eixo, scale=alt.Scale(zero=False)),
+        tooltip=[alt.Tooltip('data:T', format='%d/%m/%Y'), alt.Tooltip('valor:Q', format=',.2f')],
+    )
+    return linha.add_params(selecao) if selecao is not None else linha
+
+@st.fragment
+def painel_historico():
+    arquivo = obter_arquivo(assinatura_arquivo())
+    titulos = pd.DataFrame({
+        'tipo': arquivo['tipos'],
+        'vencimento': pd.to_datetime(arquivo['vencimentos']).date,
+    })
+
+    col1, col2, col3, col4 = st.columns([1.5, 1, 1.2, 0.8])
+    tipo = col1.selectbox("🎯 Título:", sorted(titulos['tipo'].unique()))
+    vencimentos = titulos.loc[titulos['tipo'] == tipo, 'vencimento']
+    vencimento = col2.selectbox(
+        "📅 Vencimento:",
+        vencimentos.tolist(),
+        index=len(vencimentos) - 1,
+        format_func=lambda d: d.strftime('%d/%m/%Y'),
+    )
+    nome_serie = col3.selectbox("📈 Série:", list(SERIES))
+    pontos = col4.number_input("Pontos", min_value=100, max_value=5000, value=PONTOS_PADRAO, step=100)
+
+    coluna = int(vencimentos.index[vencimentos.tolist().index(vencimento)])
+    serie = SERIES[nome_serie]
+    assinatura = assinatura_arquivo()
+
+    # Visão geral: o histórico inteiro, reduzido à largura do gráfico
+    geral, total = serie_reduzida(assinatura, coluna, serie, None, None, pontos)
+    if geral.empty:
+        st.warning("⚠️ Sem cotações para esse título.")
+        return
+
+    st.subheader("🗺️ Histórico completo")
+    st.caption("Arraste sobre o gráfico para ampliar um período.")
+    zoom = alt.selection_interval(encodings=['x'], name='zoom')
+    evento = st.altair_chart(
+        grafico(geral, nome_serie, zoom),
+        use_container_width=True,
+        on_select="rerun",
+        key=f"geral_{coluna}_{serie}",
+    )
+
+    # Detalhe: o trecho selecionado com a mesma quantidade de pontos, ou seja,
+    # mais detalhe quanto menor o período
+    limites = limites_da_selecao(evento)
+    if limites is not None:
+        detalhe, no_periodo = serie_reduzida(assinatura, coluna, serie, *limites, pontos)
+        st.subheader(f"🔍 {limites[0].astype(object).strftime('%d/%m/%Y')} a "
+                     f"{limites[1].astype(object).strftime('%d/%m/%Y')}")
+        st.altair_chart(grafico(detalhe, nome_serie), use_container_width=True)
+        st.caption(f"{len(detalhe)} de {no_periodo} dias do período desenhados.")
+
+    st.caption(f"Visão geral: {len(geral)} de {total} dias desenhados.")
+
+def main():
+    st.title("📜 Histórico de Preços e Taxas")
+    st.markdown("### Dados do Tesouro Transparente")
+    st.markdown("---")
+
+    if not CAMINHO_PADRAO.exists():
+        st.info("O arquivo histórico ainda não foi baixado (um CSV grande do Tesouro Transparente).")
+        if not st.button("📥 Baixar histórico", type="primary"):
+            return
+        with st.spinner("Baixando e montando o arquivo histórico..."):
+            carregar_arquivo()
+
+    painel_historico()
+    situacao_mercado()
+
+main()
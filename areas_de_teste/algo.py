@@ -1,5 +1,3 @@
-import requests
-import pandas as pd
 from datetime import datetime, timedelta
 import calendar
 
@@ -7,6 +5,9 @@ def obter_ultimo_vna_oficial(data_referencia):
     """
     Obtém o VNA oficial do último dia 15 anterior à data de referência.
     """
+    import pandas as pd
+    import requests
+
     # Para simplificar, vamos usar o VNA calculado até o último dia 15
     ano = data_referencia.year
     mes = data_referencia.month
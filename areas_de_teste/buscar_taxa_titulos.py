@@ -1,10 +1,10 @@
-import tesouro_direto_br as td
-
 def buscar_taxa_titulo(tipo: str, ano: int):
     """
     Busca taxa de compra/venda de um título do Tesouro Direto
     Exemplo: buscar_taxa_titulo("ipca", 2035)
     """
+    import tesouro_direto_br as td
+
     print(f"🔍 BUSCANDO TAXA {tipo.upper()} {ano}...")
     print("-" * 50)
 
@@ -45,8 +45,10 @@ def buscar_taxa_titulo(tipo: str, ano: int):
     except Exception as e:
         print(f"❌ Erro ao buscar taxa: {e}")
         return None, None
-tipo = input("Digite o tipo de título (prefixado, ipca, selic): ")
-ano = int(input("Digite o ano de vencimento (ex: 2032): "))
 
-buscar_taxa_titulo(tipo, ano)
+if __name__ == "__main__":
+    tipo = input("Digite o tipo de título (prefixado, ipca, selic): ")
+    ano = int(input("Digite o ano de vencimento (ex: 2032): "))
+
+    buscar_taxa_titulo(tipo, ano)
 
@@ -1,5 +1,3 @@
-import requests
-import pandas as pd
 from datetime import datetime, timedelta
 import calendar
 
@@ -8,6 +6,9 @@ def calcular_vna():
     Calcula o VNA (Valor Nominal Atualizado) automaticamente até hoje.
     Base: R$ 1.000,00 em 15/07/2000 corrigido pelo IPCA.
     """
+    import pandas as pd
+    import requests
+
     # Série 433 = IPCA (variação % mensal) no SGS do Bacen
     url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.433/dados?formato=json"
     r = requests.get(url)
@@ -33,6 +34,9 @@ def obter_ultimo_vna_oficial(data_referencia):
     """
     Obtém o VNA oficial do último dia 15 anterior à data de referência.
     """
+    import pandas as pd
+    import requests
+
     # Para simplificar, vamos usar o VNA calculado até o último dia 15
     ano = data_referencia.year
     mes = data_referencia.month
@@ -156,10 +160,8 @@ def calcular_preco_ntnb(data_compra, data_vencimento, taxa_contratada_aa, ipca_p
 
 #print(calcular_preco_ntnb(data_compra=input("Data compra (AAAA-MM-DD): "),data_vencimento=input("Data vencimento (AAAA-MM-DD): "),taxa_contratada_aa=float(input("Taxa contratada (ex: 0.0613 para 6,13%): "))), ipca_projetado_mensal= input("IPCA projetado mensal (ex: 0.005 para 0,5%): "))
 
-2025
-
-
-print(calcular_preco_ntnb(data_compra=datetime(2025,9,4),data_vencimento=datetime(2040,8,15),taxa_contratada_aa=0.0731, ipca_projetado_mensal=0.0059))  
+if __name__ == "__main__":
+    print(calcular_preco_ntnb(data_compra=datetime(2025,9,4),data_vencimento=datetime(2040,8,15),taxa_contratada_aa=0.0731, ipca_projetado_mensal=0.0059))
 
 
 
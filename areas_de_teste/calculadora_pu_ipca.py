@@ -1,6 +1,6 @@
 from datetime import date
-from ipca.calculadora_vna_ipca import vna_hoje
-def preco_ipca(vna, taxa_real, vencimento, hoje=date.today(),):
+
+def preco_ipca(vna, taxa_real, vencimento, hoje=None):
     """
     Calcula o preço teórico (PU) de um Tesouro IPCA+ Principal.
     
@@ -9,6 +9,8 @@ def preco_ipca(vna, taxa_real, vencimento, hoje=date.today(),):
     vencimento -> data de vencimento do título (objeto datetime.date)
     hoje       -> data de cálculo (default: hoje)
     """
+    hoje = hoje or date.today()
+
     # diferença em dias corridos
     dias = (vencimento - hoje).days
     
@@ -23,9 +25,12 @@ def preco_ipca(vna, taxa_real, vencimento, hoje=date.today(),):
 
 # -------------------------------
 # Exemplo
-vna_hoje = vna_hoje       # exemplo do VNA que você já calculouS
-taxa_real = 0.0731        # 6% a.a.
-vencimento = date(2040,8,15)
+if __name__ == "__main__":
+    from ipca.calculadora_vna_ipca import calcular_vna
+
+    vna_hoje = calcular_vna()   # exemplo do VNA que você já calculou
+    taxa_real = 0.0731          # 6% a.a.
+    vencimento = date(2040,8,15)
 
-pu = preco_ipca(vna_hoje, taxa_real, vencimento)
-#print(f"📊 PU teórico: R$ {pu:,.2f}")
+    pu = preco_ipca(vna_hoje, taxa_real, vencimento)
+    #print(f"📊 PU teórico: R$ {pu:,.2f}")
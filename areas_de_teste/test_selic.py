@@ -1,11 +1,18 @@
-import requests
-import pandas as pd
 from datetime import datetime, timedelta
+import sys
+from pathlib import Path
+
+# Permite importar o pacote tesouro/ a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tesouro.vna import vna_selic_atual
 
 def obter_vna_selic_atual():
     """
     Obtém o VNA atual do Tesouro Selic da ANBIMA
     """
+    import requests
+
     try:
         url = "https://www.anbima.com.br/informacoes/merc-sec-debentures/arqs/vna.txt"
         response = requests.get(url)
@@ -103,9 +110,9 @@ def calculadora_tesouro_selic(ano_vencimento, taxa_contratada=0.0, taxa_selic_pr
     vna_atual, data_ref = obter_vna_selic_atual()
     
     if vna_atual is None:
-        # Usar valor atual mais realista baseado na data
-        vna_atual = 17284.36  # Valor próximo ao mostrado no site (05/09/2025)
-        print(f"⚠️  Usando VNA estimado: R$ {vna_atual:,.2f}")
+        # Outras fontes (com hedge) e, se todas falharem, o último VNA válido
+        vna_atual, data_ref = vna_selic_atual()
+        print(f"⚠️  VNA de fonte alternativa ({data_ref}): R$ {vna_atual:,.2f}")
     else:
         print(f"✅ VNA atual ({data_ref}): R$ {vna_atual:,.2f}")
     
@@ -1,10 +1,10 @@
-import tesouro_direto_br as td
-
 def buscar_titulo(tipo: str, ano: int):
     """
     Busca título do Tesouro Direto de um tipo específico e vencimento em um ano informado.
     Exemplo: buscar_titulo("prefixado", 2032)
     """
+    import tesouro_direto_br as td
+
     print(f"🔍 BUSCANDO TESOURO {tipo.upper()} {ano}...")
     print("-" * 50)
     
@@ -62,10 +62,11 @@ def buscar_titulo(tipo: str, ano: int):
 
 # ---------------------------
 # Uso interativo:
-tipo = input("Digite o tipo de título (prefixado, ipca, selic): ")
-ano = int(input("Digite o ano de vencimento (ex: 2032): "))
+if __name__ == "__main__":
+    tipo = input("Digite o tipo de título (prefixado, ipca, selic): ")
+    ano = int(input("Digite o ano de vencimento (ex: 2032): "))
 
-buscar_titulo(tipo, ano)
+    buscar_titulo(tipo, ano)
 
 
 
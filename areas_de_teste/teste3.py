@@ -1,10 +1,9 @@
-import tesouro_direto_br as td
-
-
 def buscar_tesouro_prefixado(ano):  # olhar qual é o ano e a partir disso criar a função para calcular os anos diferentes
     """
     Busca especificamente o Tesouro Prefixado com vencimento em 2032
     """
+    import tesouro_direto_br as td
+
     print("🔍 BUSCANDO TESOURO PREFIXADO 2032...")
     print("-" * 50)
 
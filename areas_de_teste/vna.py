@@ -1,8 +1,3 @@
-import tesouro_direto_br as td
-
-todos_titulos = td.busca_tesouro_direto()
-print(f"✅ Total de títulos encontrados: {len(todos_titulos)}")
-
 #titulo_encontrado = input("Digite o nome do título que deseja buscar: ").strip().lower()
 #print(f"🔍 BUSCANDO TESOURO {titulo_encontrado.upper()}...")
 #print(titulo_encontrado)
@@ -19,6 +14,8 @@ def buscar_titulo(tipo: str, ano: int):
     #print(f"🔍 BUSCANDO TESOURO {tipo.upper()} {ano}...")
     #print("-" * 50)
     
+    import tesouro_direto_br as td
+
     try:
         # Busca todos os títulos
         todos_titulos = td.busca_tesouro_direto()
@@ -80,8 +77,6 @@ def buscar_titulo(tipo: str, ano: int):
 
 
 
-import requests
-import pandas as pd
 from datetime import datetime
 
 def calcular_vna():
@@ -89,6 +84,9 @@ def calcular_vna():
     Calcula o VNA (Valor Nominal Atualizado) automaticamente até hoje.
     Base: R$ 1.000,00 em 15/07/2000 corrigido pelo IPCA.
     """
+    import pandas as pd
+    import requests
+
     # Série 433 = IPCA (variação % mensal) no SGS do Bacen
     url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.433/dados?formato=json"
     r = requests.get(url)
@@ -111,5 +109,11 @@ def calcular_vna():
     return vna
 
 # -------------------------------
-vna_hoje = calcular_vna()
-print(f"📊 VNA atualizado em {datetime.today().date()}: R$ {vna_hoje:,.2f}")
+if __name__ == "__main__":
+    import tesouro_direto_br as td
+
+    todos_titulos = td.busca_tesouro_direto()
+    print(f"✅ Total de títulos encontrados: {len(todos_titulos)}")
+
+    vna_hoje = calcular_vna()
+    print(f"📊 VNA atualizado em {datetime.today().date()}: R$ {vna_hoje:,.2f}")
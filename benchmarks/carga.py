@@ -0,0 +1,334 @@
+"""
+Teste de carga do app Streamlit e da API de precificação.
+
+Sobe o espelho das fontes com os dados gravados (servidor_gravado.py, com
+latência injetada) e dispara contra o alvo uma mistura de pedidos de
+Prefixado, Selic e IPCA+ com 1, 4, 16... usuários simultâneos, cada um
+fazendo um pedido atrás do outro. Para cada nível sai a latência (p50, p95,
+p99) e a vazão; a vazão de saturação é a do nível a partir do qual mais
+usuários já não aumentam a vazão em mais de 10%.
+
+    python benchmarks/carga.py api --usuarios 1,4,16,64 --duracao 10
+    python benchmarks/carga.py app --usuarios 1,2,4 --latencia 0.3
+
+No modo api, a API roda num processo à parte (python -m tesouro.api). No
+modo app, cada usuário é um AppTest (o script do app sem navegador) rodando
+numa thread deste processo; cada interação (trocar o título, preencher o
+formulário e calcular) conta como um pedido. O AppTest não aguenta duas
+execuções ao mesmo tempo no mesmo processo (o Runtime do Streamlit é
+global), então as execuções passam por uma trava: como num servidor
+Streamlit, em que os scripts das sessões disputam o mesmo GIL, a latência
+inclui a espera pela vez.
+"""
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from urllib.parse import urlencode
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import dados_gravados
+from servidor_gravado import ServidorGravado
+
+# Participação padrão de cada produto nos pedidos
+MISTURA_PADRAO = {'prefixado': 0.4, 'selic': 0.35, 'ipca': 0.25}
+
+# Ganho mínimo de vazão para um nível de usuários não contar como saturado
+GANHO_MINIMO = 0.10
+
+RADIO_APP = {'prefixado': "Tesouro Prefixado", 'selic': "Tesouro Selic", 'ipca': "Tesouro IPCA+"}
+
+
+def gerador_de_pedidos(mercado, mistura, semente):
+    """Função que devolve um pedido aleatório (produto, ano, taxas em %) por chamada"""
+    gerador = np.random.default_rng(semente)
+    produtos = list(mistura)
+    pesos = np.array([mistura[p] for p in produtos], dtype=float)
+    pesos /= pesos.sum()
+
+    anos = {}
+    for linha in mercado.bruto["catalogo"]:
+        titulo = linha["titulo"].lower()
+        if "juros" in titulo:
+            continue
+        produto = 'prefixado' if 'prefixado' in titulo else 'selic' if 'selic' in titulo else \
+            'ipca' if titulo == 'tesouro ipca+' else None
+        if produto:
+            anos.setdefault(produto, []).append(int(linha["vencimento"][:4]))
+
+    def proximo():
+        produto = produtos[gerador.choice(len(produtos), p=pesos)]
+        pedido = {'produto': produto, 'ano': int(gerador.choice(anos[produto]))}
+        if produto == 'prefixado':
+            pedido['taxa'] = round(float(gerador.uniform(10, 15)), 2)
+        elif produto == 'selic':
+            pedido['taxa'] = round(float(gerador.uniform(-0.05, 0.2)), 4)
+            pedido['selic'] = round(float(gerador.uniform(10, 15)), 2)
+        else:
+            pedido['taxa'] = round(float(gerador.uniform(5, 8)), 2)
+            pedido['ipca_mensal'] = round(float(gerador.uniform(0.2, 0.7)), 2)
+        return pedido
+
+    return proximo
+
+
+# ==================== ALVOS ====================
+
+def _porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class AlvoAPI:
+    """API num processo à parte, com as fontes apontadas para o espelho"""
+
+    def __init__(self, espelho, processos=2):
+        self.porta = _porta_livre()
+        ambiente = dict(os.environ, TESOURO_ESPELHO=espelho, TESOURO_CACHE_DIR=tempfile.mkdtemp())
+        self._processo = subprocess.Popen(
+            [sys.executable, "-m", "tesouro.api", "--porta", str(self.porta), "--processos", str(processos)],
+            cwd=RAIZ, env=ambiente, stdout=subprocess.DEVNULL,
+        )
+
+    def aguardar(self, limite=120):
+        """Espera o primeiro snapshot (partida a frio) e devolve quanto levou"""
+        inicio = time.perf_counter()
+        while time.perf_counter() - inicio < limite:
+            if self._processo.poll() is not None:
+                raise RuntimeError(f"a API terminou com código {self._processo.returncode}")
+            try:
+                conexao = http.client.HTTPConnection("127.0.0.1", self.porta, timeout=limite)
+                conexao.request("GET", "/snapshot")
+                if conexao.getresponse().status == 200:
+                    return time.perf_counter() - inicio
+            except OSError:
+                time.sleep(0.1)
+        raise RuntimeError("a API não respondeu a tempo")
+
+    def usuario(self):
+        """Função que faz um pedido e devolve True se deu certo"""
+        conexao = http.client.HTTPConnection("127.0.0.1", self.porta, timeout=60)
+
+        def pedir(pedido):
+            conexao.request("GET", "/cotacao?" + urlencode(pedido))
+            resposta = conexao.getresponse()
+            corpo = resposta.read()
+            return resposta.status == 200 and not json.loads(corpo).get('erro')
+        return pedir
+
+    def encerrar(self):
+        self._processo.terminate()
+        self._processo.wait(timeout=10)
+
+
+class AlvoApp:
+    """Script do app via AppTest, com as fontes apontadas para o espelho"""
+
+    def __init__(self, espelho):
+        # Lido por tesouro.dados na importação, que acontece dentro do AppTest
+        os.environ["TESOURO_ESPELHO"] = espelho
+        os.environ.setdefault("TESOURO_CACHE_DIR", tempfile.mkdtemp())
+        os.environ.setdefault("TESOURO_METRICAS_PORTA", "0")
+        self.script = str(RAIZ / "app" / "app.py")
+        self._trava = threading.Lock()   # uma execução do AppTest por vez
+
+    def _abrir(self):
+        from streamlit.testing.v1 import AppTest
+
+        teste = AppTest.from_file(self.script, default_timeout=120)
+        with self._trava:
+            teste.run()
+        if teste.exception:
+            raise RuntimeError(teste.exception[0].message)
+        return teste
+
+    def aguardar(self, limite=120):
+        inicio = time.perf_counter()
+        self._abrir()
+        return time.perf_counter() - inicio
+
+    def usuario(self):
+        teste = self._abrir()
+
+        def pedir(pedido):
+            with self._trava:
+                return _interagir(teste, pedido)
+        return pedir
+
+    def encerrar(self):
+        pass
+
+
+def _interagir(teste, pedido):
+    """Um pedido no app: escolhe o título, preenche o formulário e calcula"""
+    produto = pedido['produto']
+    teste.sidebar.radio[0].set_value(RADIO_APP[produto]).run()
+    campos = [pedido['ano'], pedido['taxa']]
+    if produto == 'selic':
+        campos.append(pedido['selic'])
+    elif produto == 'ipca':
+        campos.append(pedido['ipca_mensal'])
+    # Cada painel é um st.form (form_<produto>) com as caixas na ordem acima
+    formulario = f"form_{produto}"
+    caixas = [caixa for caixa in teste.text_input if caixa.form_id == formulario]
+    for caixa, valor in zip(caixas, campos):
+        caixa.input(str(valor))
+    next(botao for botao in teste.button if botao.form_id == formulario).click().run()
+    # Deu certo se o PU apareceu
+    return (not teste.exception and not teste.error
+            and any(metrica.label.startswith("💎") for metrica in teste.metric))
+
+
+# ==================== EXECUÇÃO ====================
+
+def rodar_nivel(alvo, usuarios, duracao, proximo_pedido):
+    """Roda `usuarios` em paralelo por `duracao` segundos e resume o nível"""
+    latencias, erros = [], [0]
+    trava = threading.Lock()
+    fim = [0.0]
+    # O prazo só começa a contar quando todos os usuários estão conectados
+    pronto = threading.Barrier(usuarios + 1, action=lambda: fim.__setitem__(0, time.perf_counter() + duracao))
+
+    def usuario():
+        try:
+            pedir = alvo.usuario()
+            pronto.wait()
+        except Exception:
+            pronto.abort()   # um usuário que não conecta derruba o nível inteiro
+            return
+        minhas, meus_erros = [], 0
+        while time.perf_counter() < fim[0]:
+            with trava:
+                pedido = proximo_pedido()
+            inicio = time.perf_counter()
+            try:
+                ok = pedir(pedido)
+            except Exception:
+                ok = False
+            minhas.append(time.perf_counter() - inicio)
+            meus_erros += not ok
+        with trava:
+            latencias.extend(minhas)
+            erros[0] += meus_erros
+
+    threads = [threading.Thread(target=usuario) for _ in range(usuarios)]
+    for thread in threads:
+        thread.start()
+    try:
+        pronto.wait()
+    except threading.BrokenBarrierError:
+        for thread in threads:
+            thread.join()
+        raise RuntimeError(f"nem todos os {usuarios} usuários conseguiram se conectar")
+    inicio = fim[0] - duracao
+    for thread in threads:
+        thread.join()
+    decorrido = time.perf_counter() - inicio
+
+    ms = np.array(latencias) * 1000
+    return {
+        'usuarios': usuarios,
+        'pedidos': len(latencias),
+        'erros': erros[0],
+        'vazao': len(latencias) / decorrido,
+        'p50_ms': float(np.percentile(ms, 50)) if len(ms) else None,
+        'p95_ms': float(np.percentile(ms, 95)) if len(ms) else None,
+        'p99_ms': float(np.percentile(ms, 99)) if len(ms) else None,
+    }
+
+
+def saturacao(niveis):
+    """Nível a partir do qual mais usuários não aumentam a vazão em GANHO_MINIMO"""
+    melhor = niveis[0]
+    for nivel in niveis[1:]:
+        if nivel['vazao'] < melhor['vazao'] * (1 + GANHO_MINIMO):
+            break
+        melhor = nivel
+    return melhor
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Teste de carga do app e da API de precificação")
+    parser.add_argument("alvo", choices=("api", "app"))
+    parser.add_argument("--usuarios", default="1,4,16,64", help="níveis de usuários simultâneos")
+    parser.add_argument("--duracao", type=float, default=10.0, help="segundos por nível")
+    parser.add_argument("--mistura", default=None,
+                        help="participação de prefixado,selic,ipca (padrão: 40,35,25)")
+    parser.add_argument("--latencia", type=float, default=0.2, help="latência injetada nas fontes (s)")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--processos", type=int, default=2, help="processos do pool da API")
+    parser.add_argument("--dados", default=str(dados_gravados.CAMINHO_PADRAO), help="dados gravados")
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    args = parser.parse_args(argv)
+
+    mistura = MISTURA_PADRAO
+    if args.mistura:
+        mistura = dict(zip(('prefixado', 'selic', 'ipca'), (float(p) for p in args.mistura.split(","))))
+    niveis_usuarios = [int(n) for n in args.usuarios.split(",")]
+
+    mercado = dados_gravados.carregar(args.dados)
+    espelho = ServidorGravado(mercado.bruto, latencia=args.latencia, jitter=args.jitter).iniciar()
+    print(f"🔄 Fontes gravadas em {espelho.url} (latência {args.latencia}s + até {args.jitter}s)")
+
+    try:
+        alvo = AlvoAPI(espelho.url, args.processos) if args.alvo == "api" else AlvoApp(espelho.url)
+    except ModuleNotFoundError as e:
+        print(f"❌ Dependência ausente: {e.name}")
+        return 1
+
+    try:
+        partida = alvo.aguardar()
+        print(f"🧊 Partida a frio (primeiro snapshot): {partida * 1000:.0f} ms\n")
+
+        print(f"{'USUÁRIOS':>8} {'PEDIDOS':>8} {'ERROS':>6} {'VAZÃO (/s)':>11} "
+              f"{'P50 (ms)':>9} {'P95 (ms)':>9} {'P99 (ms)':>9}")
+        print("-" * 66)
+        proximo = gerador_de_pedidos(mercado, mistura, semente=0)
+        niveis = []
+        for usuarios in niveis_usuarios:
+            r = rodar_nivel(alvo, usuarios, args.duracao, proximo)
+            niveis.append(r)
+            if r['pedidos']:
+                print(f"{r['usuarios']:>8} {r['pedidos']:>8} {r['erros']:>6} {r['vazao']:>11.1f} "
+                      f"{r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['p99_ms']:>9.1f}")
+            else:
+                print(f"{r['usuarios']:>8} {0:>8} {r['erros']:>6}")
+    except ModuleNotFoundError as e:
+        print(f"❌ Dependência ausente: {e.name}")
+        return 1
+    finally:
+        alvo.encerrar()
+        espelho.parar()
+
+    ponto = saturacao(niveis)
+    print(f"\n📈 Saturação: ~{ponto['vazao']:.1f} pedidos/s com {ponto['usuarios']} usuário(s) "
+          f"(p99 {ponto['p99_ms'] or 0:.1f} ms)")
+
+    if args.json:
+        saida = {
+            'alvo': args.alvo,
+            'mistura': mistura,
+            'latencia_fontes': [args.latencia, args.jitter],
+            'partida_a_frio_s': partida,
+            'niveis': niveis,
+            'saturacao': ponto,
+        }
+        Path(args.json).write_text(json.dumps(saida, indent=2, ensure_ascii=False), encoding="utf-8")
+    return 0 if all(n['erros'] == 0 for n in niveis) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
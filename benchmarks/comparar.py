@@ -0,0 +1,98 @@
+"""
+Compara dois resultados do executar.py e acusa regressões.
+
+Um caso regrediu quando a mediana nova passa da mediana da base por mais
+que a tolerância (10% por padrão). Um caso que rodava na base e agora
+falha (erro ou dependência ausente) também conta como regressão. Casos que
+só existem de um lado, ou que já não rodavam na base, aparecem na tabela
+sem contar.
+
+Uso:
+    python benchmarks/executar.py --json base.json        # antes da mudança
+    python benchmarks/executar.py --json novo.json        # depois
+    python benchmarks/comparar.py base.json novo.json --tolerancia 0.15
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+TOLERANCIA_PADRAO = 0.10
+
+
+def comparar(base, novo, tolerancia=TOLERANCIA_PADRAO):
+    """
+    Returns:
+        list[dict]: uma linha por caso, com 'caso', 'base_ms', 'novo_ms',
+                    'razao' (novo/base) e 'situacao'
+    """
+    linhas = []
+    resultados_base, resultados_novo = base['resultados'], novo['resultados']
+    for nome in sorted(set(resultados_base) | set(resultados_novo)):
+        antes = resultados_base.get(nome, {})
+        depois = resultados_novo.get(nome, {})
+        if antes.get('status') == 'ok' and depois and depois.get('status') != 'ok':
+            linhas.append({'caso': nome, 'base_ms': antes['mediana_s'] * 1000, 'novo_ms': None, 'razao': None,
+                           'situacao': 'quebrou', 'motivo': depois.get('status')})
+            continue
+        if antes.get('status') != 'ok' or depois.get('status') != 'ok':
+            situacao = 'novo' if not antes else 'removido' if not depois else 'não rodou'
+            linhas.append({'caso': nome, 'base_ms': None, 'novo_ms': None, 'razao': None, 'situacao': situacao})
+            continue
+
+        razao = depois['mediana_s'] / antes['mediana_s']
+        if razao > 1 + tolerancia:
+            situacao = 'regressão'
+        elif razao < 1 / (1 + tolerancia):
+            situacao = 'melhora'
+        else:
+            situacao = 'igual'
+        linhas.append({
+            'caso': nome,
+            'base_ms': antes['mediana_s'] * 1000,
+            'novo_ms': depois['mediana_s'] * 1000,
+            'razao': razao,
+            'situacao': situacao,
+        })
+    return linhas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compara resultados de benchmark com uma base")
+    parser.add_argument("base", help="JSON da base (executar.py --json)")
+    parser.add_argument("novo", help="JSON novo")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO,
+                        help="piora relativa aceita (0.10 = 10%%)")
+    args = parser.parse_args(argv)
+
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    novo = json.loads(Path(args.novo).read_text(encoding="utf-8"))
+    linhas = comparar(base, novo, args.tolerancia)
+
+    if base.get('maquina') != novo.get('maquina'):
+        print(f"⚠️  Máquinas diferentes: {base.get('maquina')} × {novo.get('maquina')}")
+
+    marcas = {'regressão': '🔴', 'melhora': '🟢', 'igual': '⚪'}
+    falhas = ('regressão', 'quebrou')
+    print(f"{'CASO':<32} {'BASE (ms)':>11} {'NOVO (ms)':>11} {'RAZÃO':>7}  SITUAÇÃO")
+    print("-" * 80)
+    for linha in linhas:
+        if linha['situacao'] == 'quebrou':
+            print(f"{linha['caso']:<32} {linha['base_ms']:>11.3f} {'':>11} {'':>7}  🔴 quebrou ({linha['motivo']})")
+        elif linha['razao'] is None:
+            print(f"{linha['caso']:<32} {'':>11} {'':>11} {'':>7}  {linha['situacao']}")
+        else:
+            print(f"{linha['caso']:<32} {linha['base_ms']:>11.3f} {linha['novo_ms']:>11.3f} "
+                  f"{linha['razao']:>6.2f}x  {marcas[linha['situacao']]} {linha['situacao']}")
+
+    regressoes = [linha['caso'] for linha in linhas if linha['situacao'] in falhas]
+    if regressoes:
+        print(f"\n❌ {len(regressoes)} regressão(ões) (piora acima de {args.tolerancia:.0%} ou caso quebrado): "
+              f"{', '.join(regressoes)}")
+        return 1
+    print(f"\n✅ Nenhuma regressão acima de {args.tolerancia:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Dados de mercado gravados para os benchmarks.
+
+Os benchmarks não podem depender da rede (nem da hora em que rodam): o
+catálogo, os VNAs e a série do IPCA ficam gravados em dados/mercado.json e
+são lidos daqui. Para regravar com os dados do dia:
+
+    python benchmarks/dados_gravados.py --gravar
+
+Sem acesso às fontes, --sintetico grava uma amostra fixa com o mesmo
+formato (catálogo com os títulos atuais e IPCA de ~0,4% ao mês).
+"""
+import argparse
+import json
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+CAMINHO_PADRAO = Path(__file__).resolve().parent / "dados" / "mercado.json"
+
+# Catálogo da amostra sintética: (título, vencimento, taxa de compra % a.a.)
+_CATALOGO_SINTETICO = [
+    ("Tesouro Prefixado", "2027-01-01", 14.52),
+    ("Tesouro Prefixado", "2028-01-01", 13.98),
+    ("Tesouro Prefixado", "2031-01-01", 13.71),
+    ("Tesouro Prefixado", "2032-01-01", 13.69),
+    ("Tesouro Prefixado com Juros Semestrais", "2035-01-01", 13.62),
+    ("Tesouro Selic", "2027-03-01", 0.0407),
+    ("Tesouro Selic", "2028-03-01", 0.0592),
+    ("Tesouro Selic", "2029-03-01", 0.0913),
+    ("Tesouro Selic", "2031-03-01", 0.1214),
+    ("Tesouro IPCA+", "2029-05-15", 7.74),
+    ("Tesouro IPCA+", "2035-05-15", 7.36),
+    ("Tesouro IPCA+", "2040-08-15", 7.01),
+    ("Tesouro IPCA+", "2045-05-15", 6.82),
+    ("Tesouro IPCA+", "2050-08-15", 6.79),
+    ("Tesouro IPCA+ com Juros Semestrais", "2035-05-15", 7.41),
+    ("Tesouro IPCA+ com Juros Semestrais", "2060-08-15", 6.88),
+    ("Tesouro Educa+", "2030-12-15", 7.45),
+    ("Tesouro Renda+ Aposentadoria Extra", "2049-12-15", 6.91),
+]
+
+
+def gerar_sintetico(data_referencia=date(2025, 10, 1)):
+    """Amostra fixa (sempre a mesma) no formato de dados/mercado.json"""
+    from tesouro.precificacao import cotacao, preco_prefixado
+    from tesouro.vna import calcular_vna_ipca
+
+    import pandas as pd
+
+    meses = pd.date_range("2000-01-01", data_referencia, freq="MS")[:-1]
+    ipca = np.round(np.random.default_rng(433).normal(0.0042, 0.0025, len(meses)), 4)
+    serie = pd.DataFrame({"data": meses, "valor": ipca})
+    vna_ipca = calcular_vna_ipca(serie, data_referencia)
+    vna_selic = (17284.361, data_referencia.strftime("%d/%m/%Y"))
+
+    referencia = np.datetime64(data_referencia, "D")
+    catalogo = []
+    for titulo, vencimento, taxa in _CATALOGO_SINTETICO:
+        du = int((np.datetime64(vencimento, "D") - referencia).astype(int) * 252 / 365)
+        if "Prefixado" in titulo:
+            pu = float(preco_prefixado(taxa, du))
+        elif "Selic" in titulo:
+            pu = vna_selic[0] * float(cotacao(taxa / 100, du)) / 100
+        else:
+            pu = vna_ipca[0] * float(cotacao(taxa / 100, du)) / 100
+        catalogo.append({
+            "titulo": titulo, "vencimento": vencimento, "pu": round(pu, 2),
+            "taxa_compra": taxa, "taxa_venda": round(taxa + 0.12, 4),
+        })
+
+    return {
+        "data_referencia": str(data_referencia),
+        "origem": "sintético",
+        "catalogo": catalogo,
+        "vna_selic": list(vna_selic),
+        "vna_ipca": [round(vna_ipca[0], 6), vna_ipca[1]],
+        "serie_ipca": [[str(m.date()), v] for m, v in zip(meses, ipca.tolist())],
+    }
+
+
+def gravar_das_fontes():
+    """Busca catálogo, VNAs e série do IPCA nas fontes, no formato do arquivo"""
+    from tesouro import dados, vna
+
+    catalogo = dados.buscar_catalogo()
+    serie = dados.buscar_serie_ipca()
+    coluna = lambda nome, linha: float(linha[nome]) if nome in linha and linha[nome] == linha[nome] else None
+    return {
+        "data_referencia": str(date.today()),
+        "origem": "fontes",
+        "catalogo": [
+            {
+                "titulo": str(indice[0]), "vencimento": str(indice[1])[:10],
+                "pu": coluna("PU", linha),
+                "taxa_compra": coluna("Taxa Compra Manha", linha),
+                "taxa_venda": coluna("Taxa Venda Manha", linha),
+            }
+            for indice, linha in catalogo.iterrows()
+        ],
+        "vna_selic": list(vna.vna_selic_atual()),
+        "vna_ipca": list(vna.vna_ipca_atual()),
+        "serie_ipca": [[str(d.date()), float(v)] for d, v in zip(serie["data"], serie["valor"])],
+    }
+
+
+class Mercado:
+    """Dados gravados, nos formatos que as funções do pacote recebem"""
+
+    def __init__(self, bruto):
+        import pandas as pd
+
+        self.bruto = bruto
+        self.data_referencia = date.fromisoformat(bruto["data_referencia"])
+        self.vna_selic = tuple(bruto["vna_selic"])
+        self.vna_ipca = tuple(bruto["vna_ipca"])
+
+        linhas = bruto["catalogo"]
+        indice = pd.MultiIndex.from_tuples(
+            [(l["titulo"], pd.Timestamp(l["vencimento"])) for l in linhas],
+            names=["Tipo Titulo", "Vencimento"],
+        )
+        self.catalogo = pd.DataFrame({
+            "PU": [l["pu"] for l in linhas],
+            "Taxa Compra Manha": [l["taxa_compra"] for l in linhas],
+            "Taxa Venda Manha": [l["taxa_venda"] for l in linhas],
+        }, index=indice, dtype=float)
+
+        self.serie_ipca = pd.DataFrame({
+            "data": pd.to_datetime([d for d, _ in bruto["serie_ipca"]]),
+            "valor": [v for _, v in bruto["serie_ipca"]],
+        })
+
+    def snapshot(self, versao=1):
+        """MarketSnapshot montado com os dados gravados"""
+        from tesouro.mercado import snapshot_de_catalogo
+
+        return snapshot_de_catalogo(self.catalogo, self.vna_selic, self.vna_ipca,
+                                    versao=versao, data_referencia=self.data_referencia)
+
+
+def carregar(caminho=CAMINHO_PADRAO):
+    """Lê o arquivo gravado"""
+    return Mercado(json.loads(Path(caminho).read_text(encoding="utf-8")))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grava os dados de mercado usados pelos benchmarks")
+    grupo = parser.add_mutually_exclusive_group(required=True)
+    grupo.add_argument("--gravar", action="store_true", help="busca nas fontes")
+    grupo.add_argument("--sintetico", action="store_true", help="grava a amostra fixa")
+    parser.add_argument("--caminho", default=str(CAMINHO_PADRAO))
+    args = parser.parse_args(argv)
+
+    bruto = gravar_das_fontes() if args.gravar else gerar_sintetico()
+    caminho = Path(args.caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    caminho.write_text(json.dumps(bruto, indent=1, ensure_ascii=False), encoding="utf-8")
+    print(f"✅ {len(bruto['catalogo'])} títulos e {len(bruto['serie_ipca'])} meses de IPCA gravados em {caminho}")
+
+
+if __name__ == "__main__":
+    main()
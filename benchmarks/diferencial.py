@@ -0,0 +1,473 @@
+"""
+Testes diferenciais, com entradas aleatórias, entre as versões escalares e
+as vetorizadas (ou em lote) dos mesmos cálculos.
+
+O lado escalar é a fórmula original em Python puro, escrita aqui (seção
+REFERÊNCIA): as calcular_* do pacote são só float() em volta do kernel
+vetorizado e nunca divergiriam dele.
+
+Cada propriedade gera N entradas, calcula o resultado pelos dois caminhos
+e exige que coincidam (inteiros iguais, floats dentro da tolerância
+relativa). As entradas misturam valores comuns com os casos de borda:
+du = 0, ágio/deságio negativo do Tesouro Selic, compras em torno do dia
+15 (aniversário do VNA do IPCA+), vésperas e dias seguintes de feriados
+e fins de mês. Quando uma propriedade falha, o contraexemplo é mostrado
+com a semente para reproduzi-lo. O tempo dos dois caminhos também é
+medido, para acompanhar a aceleração.
+
+A propriedade pagina.precos roda o JavaScript da calculadora.html no Node
+(pulada se não houver `node` no PATH) com as tabelas de exportar_tabelas.
+
+    python benchmarks/diferencial.py                       # semente aleatória
+    python benchmarks/diferencial.py --casos 20000 --semente 123
+"""
+import argparse
+import json
+import random
+import shutil
+import subprocess
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import dados_gravados
+
+TOLERANCIA_PADRAO = 1e-12
+CASOS_PADRAO = 2_000
+
+PROPRIEDADES = {}
+
+
+class PropriedadePulada(Exception):
+    """A propriedade não pode rodar aqui (ex: falta o Node)"""
+
+
+def propriedade(nome):
+    """
+    Registra uma propriedade: a função recebe (gerador, n, mercado) e devolve
+    (entradas, escalar, vetorizado), onde entradas é um dict de arrays e as
+    duas funções recebem as entradas e devolvem um array
+    """
+    def registrar(funcao):
+        PROPRIEDADES[nome] = funcao
+        return funcao
+    return registrar
+
+
+# ==================== GERADORES ====================
+
+INICIO = np.datetime64('2024-01-01')
+FIM = np.datetime64('2060-12-31')
+
+
+def gerar_datas(gerador, n):
+    """Datas de compra: comuns, em torno do dia 15, em volta de feriados e em viradas de mês"""
+    from tesouro.calendario import feriados
+
+    tipo = gerador.choice(4, n, p=[0.4, 0.2, 0.25, 0.15])
+    comuns = INICIO + gerador.integers(0, (FIM - INICIO).astype(int), n)
+
+    meses = (INICIO.astype('datetime64[M]') + gerador.integers(0, 12 * 36, n)).astype('datetime64[D]')
+    dia_15 = meses + 14 + gerador.integers(-2, 3, n)          # 13 a 17
+
+    lista_feriados = feriados()
+    lista_feriados = lista_feriados[(lista_feriados >= INICIO) & (lista_feriados <= FIM)]
+    perto_de_feriado = gerador.choice(lista_feriados, n) + gerador.integers(-3, 4, n)
+
+    virada = meses + gerador.integers(-2, 2, n)                # dois últimos e dois primeiros dias
+
+    return np.select([tipo == 0, tipo == 1, tipo == 2], [comuns, dia_15, perto_de_feriado], virada)
+
+
+def gerar_prazos(gerador, n):
+    """Dias corridos até o vencimento: 0 (du = 0), poucos dias (feriados no meio) ou anos"""
+    tipo = gerador.choice(3, n, p=[0.1, 0.3, 0.6])
+    return np.select([tipo == 0, tipo == 1],
+                     [np.zeros(n, dtype=np.int64), gerador.integers(1, 15, n)],
+                     gerador.integers(15, 365 * 30, n))
+
+
+def _com_bordas(gerador, n, minimo, maximo, bordas):
+    """Valores uniformes em [minimo, maximo] com 10% sorteados entre as bordas"""
+    valores = gerador.uniform(minimo, maximo, n)
+    sorteio = gerador.random(n) < 0.1
+    valores[sorteio] = gerador.choice(bordas, int(sorteio.sum()))
+    return valores
+
+
+# ==================== REFERÊNCIA ====================
+# Um título por vez, sem numpy, como nas calculadoras antes do pacote tesouro/.
+
+def ref_dias_uteis(data_atual, data_vencimento):
+    """(du, dias corridos) pela aproximação 252/365, com datas do Python"""
+    dias_corridos = (data_vencimento - data_atual).days
+    return int(dias_corridos * (252 / 365)), dias_corridos
+
+
+def ref_pu_prefixado(vn, taxa_anual, du):
+    return vn / (((taxa_anual / 100) + 1) ** (du / 252))
+
+
+def ref_cotacao(taxa, du):
+    """Cotação do Selic e do IPCA+, com a taxa em decimal"""
+    return 100 / ((1 + taxa) ** (du / 252))
+
+
+def ref_vna_selic_projetado(vna_atual, taxa_selic_anual):
+    """(VNA projetado para D+1, taxa diária), com a Selic em decimal"""
+    taxa_diaria = (1 + taxa_selic_anual) ** (1 / 252) - 1
+    return vna_atual * (1 + taxa_diaria), taxa_diaria
+
+
+def ref_vna_ipca_projetado(vna_atual, ipca_mensal):
+    return vna_atual * (1 + ipca_mensal)
+
+
+# ==================== PROPRIEDADES ====================
+
+def _laco(funcao, *colunas):
+    """Aplica a função escalar linha a linha"""
+    return np.array([funcao(*linha) for linha in zip(*(np.asarray(c).tolist() for c in colunas))])
+
+
+@propriedade('dias_uteis.aproximado')
+def _du_aproximado(gerador, n, mercado):
+    from tesouro.calendario import dias_uteis
+
+    compras = gerar_datas(gerador, n)
+    entradas = {'compra': compras, 'vencimento': compras + gerar_prazos(gerador, n)}
+    escalar = lambda e: _laco(ref_dias_uteis, e['compra'].astype(object), e['vencimento'].astype(object))
+    vetorizado = lambda e: np.stack(dias_uteis(e['compra'], e['vencimento']), axis=1)
+    return entradas, escalar, vetorizado
+
+
+@propriedade('dias_uteis.exato')
+def _du_exato(gerador, n, mercado):
+    """Contagem dia a dia (fins de semana e feriados) contra o busday_count"""
+    from tesouro.calendario import dias_uteis_exatos, feriados
+
+    compras = gerar_datas(gerador, n)
+    entradas = {'compra': compras, 'vencimento': compras + gerar_prazos(gerador, n)}
+    conjunto_feriados = set(feriados().astype(object))
+
+    def contar(compra, vencimento):
+        du, dia = 0, compra
+        while dia < vencimento:
+            du += dia.weekday() < 5 and dia not in conjunto_feriados
+            dia += timedelta(days=1)
+        return du
+
+    escalar = lambda e: _laco(contar, e['compra'].astype(object), e['vencimento'].astype(object))
+    vetorizado = lambda e: dias_uteis_exatos(e['compra'], e['vencimento'])[0]
+    return entradas, escalar, vetorizado
+
+
+@propriedade('prefixado.pu')
+def _pu_prefixado(gerador, n, mercado):
+    from tesouro.precificacao import VALOR_NOMINAL_PREFIXADO, preco_prefixado
+
+    entradas = {
+        'taxa': _com_bordas(gerador, n, 0.0, 30.0, [0.0, 0.01, 30.0]),
+        'du': np.where(gerador.random(n) < 0.1, 0, gerador.integers(0, 252 * 35, n)),
+    }
+    escalar = lambda e: _laco(lambda t, d: ref_pu_prefixado(VALOR_NOMINAL_PREFIXADO, t, d), e['taxa'], e['du'])
+    vetorizado = lambda e: preco_prefixado(e['taxa'], e['du'])
+    return entradas, escalar, vetorizado
+
+
+@propriedade('selic.cotacao')
+def _cotacao_selic(gerador, n, mercado):
+    """Ágio (taxa negativa) e deságio da LFT, com du = 0 entre as bordas"""
+    from tesouro.precificacao import cotacao
+
+    entradas = {
+        'taxa': _com_bordas(gerador, n, -0.005, 0.005, [0.0, -0.0001, -0.005, 0.005]),
+        'du': np.where(gerador.random(n) < 0.1, 0, gerador.integers(0, 252 * 10, n)),
+    }
+    escalar = lambda e: _laco(ref_cotacao, e['taxa'], e['du'])
+    vetorizado = lambda e: cotacao(e['taxa'], e['du'])
+    return entradas, escalar, vetorizado
+
+
+@propriedade('selic.vna_projetado')
+def _vna_selic(gerador, n, mercado):
+    """
+    Compara o fator diário (1 + taxa diária), e não a taxa: ela sai de
+    (1 + selic)^(1/252) - 1, e a subtração amplia a diferença de 1 ulp entre
+    a potência escalar e a vetorizada do numpy para ~1e-12 relativo
+    """
+    from tesouro.precificacao import vna_selic_projetado
+
+    entradas = {
+        'vna': gerador.uniform(10_000, 30_000, n),
+        'selic': _com_bordas(gerador, n, 0.0, 0.3, [0.0, 0.1175]),
+    }
+    escalar = lambda e: _laco(ref_vna_selic_projetado, e['vna'], e['selic']) + [0, 1]
+    vetorizado = lambda e: np.stack(vna_selic_projetado(e['vna'], e['selic']), axis=1) + [0, 1]
+    return entradas, escalar, vetorizado
+
+
+@propriedade('ipca.cotacao')
+def _cotacao_ipca(gerador, n, mercado):
+    from tesouro.precificacao import cotacao
+
+    entradas = {
+        'taxa': _com_bordas(gerador, n, -0.02, 0.12, [0.0, -0.02]),
+        'du': np.where(gerador.random(n) < 0.1, 0, gerador.integers(0, 252 * 40, n)),
+    }
+    escalar = lambda e: _laco(ref_cotacao, e['taxa'], e['du'])
+    vetorizado = lambda e: cotacao(e['taxa'], e['du'])
+    return entradas, escalar, vetorizado
+
+
+@propriedade('lote.pipeline')
+def _pipeline(gerador, n, mercado):
+    """
+    Um título por vez, como nas calculadoras (dias úteis -> VNA projetado ->
+    cotação -> preço), contra o precificar_lote com a data de cada compra
+    """
+    from tesouro.precificacao import VALOR_NOMINAL_PREFIXADO, precificar_lote
+
+    snapshot = mercado.snapshot()
+    compras = gerar_datas(gerador, n)
+    entradas = {
+        'produto': gerador.choice(['prefixado', 'selic', 'ipca'], n),
+        'data': compras,
+        'vencimento': compras + gerar_prazos(gerador, n),
+        'selic': _com_bordas(gerador, n, 5, 15, [0.0, 11.75]),
+        'ipca_mensal': _com_bordas(gerador, n, -0.5, 1.5, [0.0]),
+    }
+    e_selic = entradas['produto'] == 'selic'
+    entradas['taxa'] = np.where(e_selic, _com_bordas(gerador, n, -0.5, 0.5, [0.0, -0.01]),
+                                gerador.uniform(2, 15, n))
+    entradas['ano'] = entradas['vencimento'].astype('datetime64[Y]').astype(int) + 1970
+
+    def um_titulo(produto, data, vencimento, taxa, selic, ipca_mensal):
+        du, _ = ref_dias_uteis(data, vencimento)
+        if produto == 'prefixado':
+            return ref_pu_prefixado(VALOR_NOMINAL_PREFIXADO, taxa, du)
+        if produto == 'selic':
+            vna, _ = ref_vna_selic_projetado(snapshot.vna_selic, selic / 100)
+            return vna * ref_cotacao(taxa / 100, du) / 100
+        vna = ref_vna_ipca_projetado(snapshot.vna_ipca, ipca_mensal / 100)
+        return vna * ref_cotacao(taxa / 100, du) / 100
+
+    escalar = lambda e: _laco(um_titulo, e['produto'], e['data'].astype(object), e['vencimento'].astype(object),
+                              e['taxa'], e['selic'], e['ipca_mensal'])
+    vetorizado = lambda e: precificar_lote(snapshot, e)['preco']
+    return entradas, escalar, vetorizado
+
+
+@propriedade('grafo.incremental')
+def _grafo_incremental(gerador, n, mercado):
+    """
+    Uma sequência de edições (taxa, Selic, ano, data ou snapshot, uma por
+    linha) no mesmo grafo da calculadora da Selic, contra um grafo novo
+    calculado do zero a cada linha
+    """
+    import dataclasses
+
+    from tesouro import grafo
+
+    base = mercado.snapshot()
+    snapshots = [
+        base,
+        dataclasses.replace(base, versao=base.versao + 1),                  # mesmo VNA
+        dataclasses.replace(base, versao=base.versao + 2, vna_selic=base.vna_selic * 1.0004),
+    ]
+    campos = {
+        'taxa': _com_bordas(gerador, n, -0.005, 0.005, [0.0]),
+        'taxa_selic': _com_bordas(gerador, n, 0.0, 0.3, [0.0, 0.1175]),
+        'ano': gerador.integers(2026, 2040, n),
+        'hoje': gerar_datas(gerador, n),
+        'snapshot': gerador.integers(0, len(snapshots), n),
+    }
+    # Cada linha muda só um campo; os outros repetem a linha anterior
+    editado = gerador.integers(0, len(campos), n)
+    entradas = {}
+    for k, (campo, valores) in enumerate(campos.items()):
+        mantem = editado != k
+        mantem[0] = False
+        indices = np.maximum.accumulate(np.where(mantem, 0, np.arange(n)))
+        entradas[campo] = valores[indices]
+
+    def definir(calculo, taxa, taxa_selic, ano, hoje, snapshot):
+        calculo.definir(snapshot=snapshots[snapshot], hoje=hoje, ano=ano, taxa=taxa, taxa_selic=taxa_selic)
+        return calculo.valor('preco')
+
+    colunas = lambda e: (e['taxa'], e['taxa_selic'], e['ano'], e['hoje'].astype(object), e['snapshot'])
+    escalar = lambda e: _laco(lambda *linha: definir(grafo.montar('selic'), *linha), *colunas(e))
+    incremental = grafo.montar('selic')
+    vetorizado = lambda e: _laco(lambda *linha: definir(incremental, *linha), *colunas(e))
+    return entradas, escalar, vetorizado
+
+
+# Roda os precificadores da calculadora.html (o último <script> inline) num
+# contexto do Node com as tabelas exportadas e um document que não faz nada
+_DRIVER_PAGINA = r'''
+const fs = require('fs');
+const vm = require('vm');
+const entrada = JSON.parse(fs.readFileSync(0, 'utf8'));
+const html = fs.readFileSync(process.argv[1], 'utf8');
+const scripts = [...html.matchAll(/<script>([\s\S]*?)<\/script>/g)].map(m => m[1]);
+const elemento = { textContent: '', value: '', classList: { add() {}, remove() {} } };
+const contexto = vm.createContext({
+    window: { TABELAS_TESOURO: entrada.tabelas },
+    document: { getElementById: () => elemento, querySelectorAll: () => [] },
+    alert: () => {},
+});
+vm.runInContext(scripts.join('\n'), contexto);
+contexto.linhas = entrada.linhas;
+const saida = vm.runInContext(`linhas.map(([produto, ano, taxa, selic, ipca, data]) => {
+    const dia = dataISO(data);
+    const r = produto === 'prefixado' ? precoPrefixado(dia, ano, taxa)
+        : produto === 'selic' ? precoSelic(dia, ano, taxa / 100, selic / 100)
+        : precoIPCA(dia, ano, taxa / 100, ipca / 100);
+    return r ? [r.diasUteis, r.pu ?? r.preco] : [null, null];
+})`, contexto);
+process.stdout.write(JSON.stringify(saida));
+'''
+
+
+@propriedade('pagina.precos')
+def _pagina(gerador, n, mercado):
+    """
+    Dias úteis e PU da calculadora.html contra o precificar_lote, os dois
+    com as tabelas exportadas (VNAs arredondados como no JSON)
+    """
+    import dataclasses
+
+    from tesouro.exportar_tabelas import montar_tabelas
+    from tesouro.mercado import anos_prefixado
+    from tesouro.precificacao import precificar_lote
+
+    node = shutil.which('node')
+    if node is None:
+        raise PropriedadePulada("sem node no PATH")
+
+    tabelas = montar_tabelas(mercado.snapshot())
+    snapshot = dataclasses.replace(mercado.snapshot(), vna_selic=tabelas['vna']['selic']['valor'],
+                                   vna_ipca=tabelas['vna']['ipca']['valor'])
+
+    compras = gerar_datas(gerador, n)
+    produto = gerador.choice(['prefixado', 'selic', 'ipca'], n)
+    entradas = {
+        'produto': produto,
+        'data': compras,
+        # Prefixado só nos anos do catálogo; pós-fixados de 0 a 30 anos depois da compra
+        'ano': np.where(produto == 'prefixado', gerador.choice(anos_prefixado(snapshot), n),
+                        compras.astype('datetime64[Y]').astype(int) + 1970 + gerador.integers(0, 31, n)),
+        'selic': _com_bordas(gerador, n, 5, 15, [0.0, 11.75]),
+        'ipca_mensal': _com_bordas(gerador, n, -0.5, 1.5, [0.0]),
+    }
+    entradas['taxa'] = np.where(produto == 'selic', _com_bordas(gerador, n, -0.5, 0.5, [0.0, -0.01]),
+                                gerador.uniform(2, 15, n))
+
+    def pagina(e):
+        linhas = [[p, int(a), float(t), float(s), float(i), str(d)] for p, a, t, s, i, d
+                  in zip(e['produto'], e['ano'], e['taxa'], e['selic'], e['ipca_mensal'], e['data'])]
+        pagina_html = RAIZ / "calculadora.html"
+        saida = subprocess.run([node, "-e", _DRIVER_PAGINA, str(pagina_html)], check=True, capture_output=True,
+                               input=json.dumps({'tabelas': tabelas, 'linhas': linhas}), text=True)
+        return np.array(json.loads(saida.stdout), dtype=float)
+
+    def lote(e):
+        resultado = precificar_lote(snapshot, e)
+        return np.stack([resultado['dias_uteis'], resultado['preco']], axis=1)
+
+    return entradas, pagina, lote
+
+
+# ==================== EXECUÇÃO ====================
+
+def _tempo(funcao, entradas):
+    inicio = time.perf_counter()
+    resultado = funcao(entradas)
+    return np.asarray(resultado), time.perf_counter() - inicio
+
+
+def contraexemplo(escalar, vetorizado, tolerancia):
+    """Índice da primeira linha em que os dois caminhos divergem (None se nenhuma)"""
+    if escalar.shape != vetorizado.shape:
+        return 0
+    if np.issubdtype(escalar.dtype, np.integer) and np.issubdtype(vetorizado.dtype, np.integer):
+        diferentes = escalar != vetorizado
+    else:
+        escalar, vetorizado = escalar.astype(float), vetorizado.astype(float)
+        diferentes = ~np.isclose(vetorizado, escalar, rtol=tolerancia, atol=0, equal_nan=True)
+    if diferentes.ndim > 1:
+        diferentes = diferentes.any(axis=tuple(range(1, diferentes.ndim)))
+    linhas = np.flatnonzero(diferentes)
+    return int(linhas[0]) if len(linhas) else None
+
+
+def verificar(nome, casos, semente, mercado, tolerancia=TOLERANCIA_PADRAO):
+    """
+    Returns:
+        dict: 'casos', 'aceleracao' e, se falhou, 'contraexemplo'
+    """
+    gerador = np.random.default_rng(semente)
+    entradas, escalar, vetorizado = PROPRIEDADES[nome](gerador, casos, mercado)
+    esperado, tempo_escalar = _tempo(escalar, entradas)
+    obtido, tempo_vetorizado = _tempo(vetorizado, entradas)
+
+    resultado = {'casos': casos, 'aceleracao': tempo_escalar / tempo_vetorizado}
+    linha = contraexemplo(esperado, obtido, tolerancia)
+    if linha is not None:
+        resultado['contraexemplo'] = {
+            'entrada': {campo: str(valores[linha]) for campo, valores in entradas.items()},
+            'escalar': str(esperado[linha]) if linha < len(esperado) else None,
+            'vetorizado': str(obtido[linha]) if linha < len(obtido) else None,
+        }
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Testes diferenciais escalar × vetorizado")
+    parser.add_argument("--casos", type=int, default=CASOS_PADRAO, help="entradas por propriedade")
+    parser.add_argument("--semente", type=int, default=None, help="semente (padrão: aleatória)")
+    parser.add_argument("--filtro", help="só as propriedades cujo nome contém este texto")
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO)
+    parser.add_argument("--dados", default=str(dados_gravados.CAMINHO_PADRAO), help="dados gravados")
+    args = parser.parse_args(argv)
+
+    semente = args.semente if args.semente is not None else random.randrange(2**32)
+    mercado = dados_gravados.carregar(args.dados)
+    print(f"🎲 Semente {semente} ({args.casos} casos por propriedade)\n")
+    print(f"{'PROPRIEDADE':<24} {'CASOS':>7} {'ACELERAÇÃO':>11}  RESULTADO")
+    print("-" * 60)
+
+    falhas = 0
+    for nome in PROPRIEDADES:
+        if args.filtro and args.filtro not in nome:
+            continue
+        try:
+            r = verificar(nome, args.casos, semente, mercado, args.tolerancia)
+        except PropriedadePulada as e:
+            print(f"{nome:<24} {'':>7} {'':>11}  ⏭️  pulada ({e})")
+            continue
+        if 'contraexemplo' in r:
+            falhas += 1
+            print(f"{nome:<24} {r['casos']:>7} {r['aceleracao']:>10.1f}x  ❌ divergiu")
+            exemplo = r['contraexemplo']
+            print(f"    entrada: {exemplo['entrada']}")
+            print(f"    escalar: {exemplo['escalar']}  vetorizado: {exemplo['vetorizado']}")
+        else:
+            print(f"{nome:<24} {r['casos']:>7} {r['aceleracao']:>10.1f}x  ✅")
+
+    if falhas:
+        print(f"\n❌ {falhas} propriedade(s) falharam; reproduza com --semente {semente}")
+        return 1
+    print("\n✅ Escalar e vetorizado coincidem em todas as propriedades")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,403 @@
+"""
+Benchmarks dos caminhos de precificação e de dados.
+
+Tudo roda sobre os dados gravados em dados/mercado.json (sem rede), e o
+resultado vai para um JSON que o comparar.py confronta com uma base:
+
+    python benchmarks/executar.py --json resultados.json
+    python benchmarks/executar.py --filtro dias_uteis --repeticoes 10
+    python benchmarks/comparar.py base.json resultados.json
+
+Cada caso é uma função que prepara os dados e devolve (n, função medida);
+a função é executada `repeticoes` vezes e guarda-se o mínimo e a mediana.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / "app"))     # dados_mercado.py, importado pelo app
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import dados_gravados
+
+CASOS = {}
+
+
+def caso(nome):
+    """Registra um benchmark: a função recebe o Mercado gravado e devolve (n, medida)"""
+    def registrar(funcao):
+        CASOS[nome] = funcao
+        return funcao
+    return registrar
+
+
+def _pedidos(n, produto, mercado, semente=0):
+    """n pedidos aleatórios (mas sempre os mesmos) de um produto"""
+    from tesouro import mercado as mod_mercado
+
+    gerador = np.random.default_rng(semente)
+    if produto == 'prefixado':
+        anos = np.array(mod_mercado.anos_prefixado(mercado.snapshot()))
+    else:
+        anos = np.arange(2027, 2051)
+    return {
+        'produto': np.full(n, produto),
+        'ano': gerador.choice(anos, n),
+        'taxa': gerador.uniform(5, 15, n) if produto != 'selic' else gerador.uniform(-0.05, 0.2, n),
+        'selic': np.full(n, 11.75),
+        'ipca_mensal': np.full(n, 0.45),
+    }
+
+
+# ==================== PRECIFICADORES ====================
+
+N_ESCALAR = 1_000
+N_VETORIZADO = 100_000
+
+
+@caso('escalar.prefixado')
+def _escalar_prefixado(mercado):
+    from tesouro.calendario import calcular_dias_uteis
+    from tesouro.precificacao import calcular_pu_prefixado_oficial
+
+    hoje = mercado.data_referencia
+    taxas = np.linspace(5, 15, N_ESCALAR).tolist()
+
+    def medir():
+        for taxa in taxas:
+            du, _ = calcular_dias_uteis(hoje, date(2031, 1, 1))
+            calcular_pu_prefixado_oficial(1000.0, taxa, du)
+    return N_ESCALAR, medir
+
+
+@caso('escalar.selic')
+def _escalar_selic(mercado):
+    from tesouro.calendario import calcular_dias_uteis
+    from tesouro.precificacao import calcular_cotacao_selic, calcular_vna_selic_projetado
+
+    hoje = mercado.data_referencia
+    taxas = np.linspace(-0.0005, 0.002, N_ESCALAR).tolist()
+
+    def medir():
+        for taxa in taxas:
+            vna, _ = calcular_vna_selic_projetado(mercado.vna_selic[0], 0.1175)
+            du, _ = calcular_dias_uteis(hoje, date(2029, 3, 1))
+            vna * calcular_cotacao_selic(taxa, du) / 100
+    return N_ESCALAR, medir
+
+
+@caso('escalar.ipca')
+def _escalar_ipca(mercado):
+    from tesouro.calendario import calcular_dias_uteis
+    from tesouro.precificacao import calcular_cotacao_ipca, projetar_vna_ipca
+
+    hoje = mercado.data_referencia
+    taxas = np.linspace(0.05, 0.08, N_ESCALAR).tolist()
+
+    def medir():
+        for taxa in taxas:
+            vna = float(projetar_vna_ipca(mercado.vna_ipca[0], 0.0045))
+            du, _ = calcular_dias_uteis(hoje, date(2035, 5, 15))
+            vna * calcular_cotacao_ipca(taxa, du) / 100
+    return N_ESCALAR, medir
+
+
+def _vetorizado(produto):
+    def preparar(mercado):
+        from tesouro.precificacao import precificar_lote
+
+        snapshot = mercado.snapshot()
+        pedidos = _pedidos(N_VETORIZADO, produto, mercado)
+        return N_VETORIZADO, lambda: precificar_lote(snapshot, pedidos)
+    return preparar
+
+
+for _produto in ('prefixado', 'selic', 'ipca'):
+    caso(f'vetorizado.{_produto}')(_vetorizado(_produto))
+
+
+@caso('vetorizado.catalogo')
+def _catalogo_inteiro(mercado):
+    from tesouro.precificacao import precificar_catalogo
+
+    snapshot = mercado.snapshot()
+    return len(snapshot.tipos), lambda: precificar_catalogo(snapshot, 11.75, 0.45)
+
+
+# ==================== DIAS ÚTEIS ====================
+
+N_DATAS = 10_000
+
+
+def _pares_de_datas(mercado):
+    gerador = np.random.default_rng(1)
+    inicio = np.datetime64(mercado.data_referencia, 'D')
+    compras = inicio + gerador.integers(0, 365, N_DATAS)
+    return compras, compras + gerador.integers(1, 365 * 25, N_DATAS)
+
+
+@caso('dias_uteis.aproximado')
+def _du_aproximado(mercado):
+    from tesouro.calendario import dias_uteis
+
+    compras, vencimentos = _pares_de_datas(mercado)
+    return N_DATAS, lambda: dias_uteis(compras, vencimentos)
+
+
+@caso('dias_uteis.exato')
+def _du_exato(mercado):
+    from tesouro.calendario import dias_uteis_exatos
+
+    compras, vencimentos = _pares_de_datas(mercado)
+    return N_DATAS, lambda: dias_uteis_exatos(compras, vencimentos)
+
+
+@caso('dias_uteis.laco_de_dias')
+def _du_laco(mercado):
+    """Contagem dia a dia em Python, como nos scripts antigos (só 100 pares: é lenta)"""
+    from datetime import timedelta
+
+    from tesouro.calendario import feriados
+
+    n = 100
+    compras, vencimentos = _pares_de_datas(mercado)
+    pares = list(zip(compras[:n].astype(object), vencimentos[:n].astype(object)))
+    feriados_set = set(feriados().astype(object))
+
+    def medir():
+        for compra, vencimento in pares:
+            du, dia = 0, compra
+            while dia < vencimento:
+                if dia.weekday() < 5 and dia not in feriados_set:
+                    du += 1
+                dia += timedelta(days=1)
+    return n, medir
+
+
+# ==================== VNA ====================
+
+N_CONSULTAS_VNA = 1_000
+
+
+def _datas_vna():
+    return [date(2001 + i % 24, 1 + i % 12, 15) for i in range(N_CONSULTAS_VNA)]
+
+
+@caso('vna.produto_da_serie')
+def _vna_produto(mercado):
+    """Como os scripts antigos: filtra a série e refaz o produto a cada consulta"""
+    serie = mercado.serie_ipca
+    datas = _datas_vna()
+
+    def medir():
+        for data in datas:
+            filtro = (serie['data'] >= '2000-07-01') & (serie['data'] <= str(data))
+            1000 * (1 + serie.loc[filtro, 'valor']).prod()
+    return N_CONSULTAS_VNA, medir
+
+
+@caso('vna.indexado')
+def _vna_indexado(mercado):
+    from tesouro.vna import serie_vna_ipca
+
+    serie = serie_vna_ipca(mercado.serie_ipca)
+    datas = _datas_vna()
+
+    def medir():
+        for data in datas:
+            serie.em(data)
+    return N_CONSULTAS_VNA, medir
+
+
+# ==================== CATÁLOGO ====================
+
+N_BUSCAS = 200
+
+
+@caso('catalogo.iterrows')
+def _catalogo_iterrows(mercado):
+    """Como os scripts antigos: percorre o DataFrame linha a linha"""
+    catalogo = mercado.catalogo
+    anos = [2027, 2028, 2031, 2032] * (N_BUSCAS // 4)
+
+    def medir():
+        for ano in anos:
+            for indice, linha in catalogo.iterrows():
+                if 'prefixado' in indice[0].lower() and 'juros' not in indice[0].lower() \
+                        and indice[1].year == ano:
+                    break
+    return N_BUSCAS, medir
+
+
+@caso('catalogo.indice')
+def _catalogo_indice(mercado):
+    from tesouro.mercado import titulo_prefixado
+
+    snapshot = mercado.snapshot()
+    anos = [2027, 2028, 2031, 2032] * (N_BUSCAS // 4)
+    return N_BUSCAS, lambda: [titulo_prefixado(snapshot, ano) for ano in anos]
+
+
+# ==================== SNAPSHOT ====================
+
+@caso('snapshot.montar')
+def _snapshot_montar(mercado):
+    return 1, mercado.snapshot
+
+
+@caso('snapshot.ler_compartilhado')
+def _snapshot_ler(mercado):
+    from tesouro.compartilhado import escrever_snapshot, ler_snapshot
+
+    caminho = Path(tempfile.mkdtemp()) / "snapshot.bin"
+    escrever_snapshot(mercado.snapshot(), caminho)
+    return 1, lambda: ler_snapshot(caminho)
+
+
+# ==================== TEMPOS POR ETAPA ====================
+
+N_ETAPAS = 100_000
+
+
+def _etapas(habilitado):
+    def preparar(mercado):
+        from tesouro import tempos
+
+        def medir():
+            anterior = tempos.HABILITADO
+            tempos.ativar(habilitado, caminho_trace=tempos.CAMINHO_TRACE)
+            try:
+                for _ in range(N_ETAPAS):
+                    with tempos.etapa("preco"):
+                        pass
+            finally:
+                tempos.ativar(anterior, caminho_trace=tempos.CAMINHO_TRACE)
+        return N_ETAPAS, medir
+    return preparar
+
+
+caso('tempos.desligado')(_etapas(False))
+caso('tempos.ligado')(_etapas(True))
+
+
+# ==================== GRAFO DE CÁLCULO ====================
+
+N_GRAFO = 10_000
+
+
+def _grafo(incremental):
+    def preparar(mercado):
+        from tesouro import grafo
+
+        snapshot = mercado.snapshot()
+        taxas = np.linspace(-0.0005, 0.002, N_GRAFO).tolist()
+        calculo = grafo.montar('selic')
+
+        def medir():
+            for taxa in taxas:
+                # Do zero: um grafo novo por cálculo, como refazer tudo a cada clique
+                atual = calculo if incremental else grafo.montar('selic')
+                atual.definir(snapshot=snapshot, hoje=mercado.data_referencia, ano=2029,
+                              taxa=taxa, taxa_selic=0.1175)
+                atual.valor('preco')
+        return N_GRAFO, medir
+    return preparar
+
+
+caso('grafo.do_zero')(_grafo(False))
+caso('grafo.troca_taxa')(_grafo(True))
+
+
+# ==================== APP STREAMLIT ====================
+
+@caso('streamlit.app')
+def _streamlit_app(mercado):
+    """Execução completa do script do app (AppTest), com o snapshot gravado já publicado"""
+    from streamlit.testing.v1 import AppTest
+
+    from tesouro import mercado as mod_mercado
+
+    def medir():
+        mod_mercado.publicar_snapshot(mercado.snapshot())
+        teste = AppTest.from_file(str(RAIZ / "app" / "app.py"), default_timeout=30)
+        teste.run()
+        if teste.exception:
+            raise RuntimeError(teste.exception[0].message)
+    return 1, medir
+
+
+# ==================== EXECUÇÃO ====================
+
+def medir_caso(nome, mercado, repeticoes):
+    """Roda um caso e devolve as estatísticas (ou o motivo de não ter rodado)"""
+    try:
+        n, funcao = CASOS[nome](mercado)
+        funcao()  # aquecimento: importações e caches
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            funcao()
+            tempos.append(time.perf_counter() - inicio)
+    except ModuleNotFoundError as e:
+        return {'status': f"dependência ausente: {e.name}"}
+    except Exception as e:
+        return {'status': f"erro: {type(e).__name__}: {e}"}
+
+    mediana = statistics.median(tempos)
+    return {
+        'status': 'ok',
+        'n': n,
+        'repeticoes': repeticoes,
+        'minimo_s': min(tempos),
+        'mediana_s': mediana,
+        'por_item_us': mediana / n * 1e6,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de precificação e dados")
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    parser.add_argument("--filtro", help="só os casos cujo nome contém este texto")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--dados", default=str(dados_gravados.CAMINHO_PADRAO), help="dados gravados")
+    args = parser.parse_args(argv)
+
+    mercado = dados_gravados.carregar(args.dados)
+    nomes = [nome for nome in CASOS if not args.filtro or args.filtro in nome]
+
+    print(f"{'CASO':<32} {'N':>8} {'MEDIANA (ms)':>13} {'POR ITEM (µs)':>14}  STATUS")
+    print("-" * 90)
+    resultados = {}
+    for nome in nomes:
+        r = resultados[nome] = medir_caso(nome, mercado, args.repeticoes)
+        if r['status'] == 'ok':
+            print(f"{nome:<32} {r['n']:>8} {r['mediana_s']*1000:>13.3f} {r['por_item_us']:>14.3f}  ok")
+        else:
+            print(f"{nome:<32} {'':>8} {'':>13} {'':>14}  {r['status']}")
+
+    if args.json:
+        saida = {
+            'quando': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'maquina': platform.platform(),
+            'dados': mercado.bruto.get('origem'),
+            'resultados': resultados,
+        }
+        Path(args.json).write_text(json.dumps(saida, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    return 0 if all(r['status'] == 'ok' or r['status'].startswith('dependência') for r in resultados.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
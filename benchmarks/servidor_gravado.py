@@ -0,0 +1,132 @@
+"""
+Espelho local das fontes, servindo os dados gravados (dados/mercado.json).
+
+Responde nos mesmos formatos das fontes reais (série do IPCA do BCB,
+tabelas de VNA do brasilindicadores, vna.txt da ANBIMA) e o catálogo em
+JSON, com uma latência injetada em cada resposta para simular as fontes.
+O pacote passa a usá-lo com TESOURO_ESPELHO (ver tesouro/dados.py):
+
+    python benchmarks/servidor_gravado.py --porta 8765 --latencia 0.3 --jitter 0.2
+    TESOURO_ESPELHO=http://localhost:8765 python -m tesouro.api
+"""
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import dados_gravados
+
+
+def _numero_br(valor, casas):
+    """17284.361 -> '17.284,361000'"""
+    return f"{valor:,.{casas}f}".replace(",", "_").replace(".", ",").replace("_", ".")
+
+
+def montar_respostas(bruto):
+    """Corpo e tipo de cada rota, a partir dos dados gravados"""
+    vna_selic, data_selic = bruto["vna_selic"]
+    vna_ipca, data_ipca = bruto["vna_ipca"]
+
+    serie = [
+        {"data": f"{d[8:10]}/{d[5:7]}/{d[0:4]}", "valor": f"{valor * 100:.2f}"}
+        for d, valor in bruto["serie_ipca"]
+    ]
+    # O brasilindicadores tem a tabela da LFT em terceiro lugar na página
+    tabela_vazia = "<table><tr><th>-</th></tr><tr><td>-</td></tr></table>"
+    html = (
+        "<html><body>" + tabela_vazia * 2 +
+        "<table><tr><th>Dt. referência</th><th>VNA</th></tr>"
+        f"<tr><td>{data_selic}</td><td>R$ {_numero_br(vna_selic, 6)}</td></tr></table>"
+        "</body></html>"
+    )
+    vna_txt = "\n".join([
+        "Data Referência@Título@VNA",
+        f"{data_selic}@LFT@{_numero_br(vna_selic, 6)}",
+        f"{data_ipca}@NTN-B@{_numero_br(vna_ipca, 6)}",
+    ])
+
+    return {
+        "/bcb/ipca": (json.dumps(serie), "application/json"),
+        "/brasilindicadores/vna": (html, "text/html; charset=utf-8"),
+        "/anbima/vna.txt": (vna_txt, "text/plain; charset=utf-8"),
+        "/tesouro/catalogo": (json.dumps(bruto["catalogo"], ensure_ascii=False), "application/json"),
+    }
+
+
+class ServidorGravado:
+    """
+    Servidor HTTP (numa thread) com os dados gravados e latência injetada
+
+    Args:
+        bruto (dict): conteúdo de dados/mercado.json
+        latencia (float): atraso fixo (s) de cada resposta
+        jitter (float): atraso extra aleatório (s), de 0 a jitter
+    """
+
+    def __init__(self, bruto, porta=0, latencia=0.0, jitter=0.0):
+        self.latencia = latencia
+        self.jitter = jitter
+        self.requisicoes = 0
+        respostas = {rota: (corpo.encode("utf-8"), tipo) for rota, (corpo, tipo) in montar_respostas(bruto).items()}
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                servidor.requisicoes += 1
+                time.sleep(servidor.latencia + random.uniform(0, servidor.jitter))
+                resposta = respostas.get(self.path.split("?")[0])
+                if resposta is None:
+                    self.send_error(404)
+                    return
+                corpo, tipo = resposta
+                self.send_response(200)
+                self.send_header("Content-Type", tipo)
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", porta), Handler)
+        self._http.daemon_threads = True
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._http.server_address[1]}"
+
+    def iniciar(self):
+        threading.Thread(target=self._http.serve_forever, name="servidor-gravado", daemon=True).start()
+        return self
+
+    def parar(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Espelho local das fontes com os dados gravados")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--latencia", type=float, default=0.0, help="atraso fixo (s) de cada resposta")
+    parser.add_argument("--jitter", type=float, default=0.0, help="atraso extra aleatório (s)")
+    parser.add_argument("--dados", default=str(dados_gravados.CAMINHO_PADRAO), help="dados gravados")
+    args = parser.parse_args(argv)
+
+    bruto = json.loads(Path(args.dados).read_text(encoding="utf-8"))
+    servidor = ServidorGravado(bruto, args.porta, args.latencia, args.jitter).iniciar()
+    print(f"🚀 Fontes gravadas em {servidor.url} (latência {args.latencia}s + até {args.jitter}s)")
+    print(f"   TESOURO_ESPELHO={servidor.url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.parar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark do tempo de importação de cada módulo.
+
+Cada módulo é importado em um processo Python novo (importação a frio),
+com rede e input() bloqueados: se o módulo buscar dados ou pedir entrada
+ao ser importado, o benchmark acusa o efeito colateral.
+
+Uso:
+    python benchmarks/tempo_import.py
+    python benchmarks/tempo_import.py --json import.json --limite 0.5
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+# Pastas com scripts de precificação importados pelo caminho do arquivo
+PASTAS_SCRIPTS = ['app', 'ipca', 'prefixado', 'prefixado_todos', 'selic', 'areas_de_teste']
+
+# Código executado no processo filho: mede a importação e bloqueia E/S
+_CODIGO_FILHO = r'''
+import builtins, importlib, importlib.util, json, socket, sys, time
+raiz, pasta, alvo = sys.argv[1:4]
+sys.path[:0] = [raiz, pasta]
+efeitos = []
+
+def _bloquear(nome):
+    def bloqueado(*args, **kwargs):
+        efeitos.append(nome)
+        raise RuntimeError(f"{nome} durante a importação")
+    return bloqueado
+
+socket.socket.connect = _bloquear("rede")
+socket.create_connection = _bloquear("rede")
+builtins.input = _bloquear("input()")
+
+inicio = time.perf_counter()
+try:
+    if alvo.endswith(".py"):
+        spec = importlib.util.spec_from_file_location("_modulo_medido", alvo)
+        spec.loader.exec_module(importlib.util.module_from_spec(spec))
+    else:
+        importlib.import_module(alvo)
+    status = "ok"
+except ModuleNotFoundError as e:
+    status = f"dependência ausente: {e.name}"
+except Exception as e:
+    status = f"erro: {type(e).__name__}: {e}"
+segundos = time.perf_counter() - inicio
+print("\n" + json.dumps({"segundos": segundos, "status": status, "efeitos": sorted(set(efeitos))}))
+'''
+
+
+def listar_alvos():
+    """Módulos do pacote tesouro e scripts das pastas de precificação"""
+    alvos = [
+        (f"tesouro.{caminho.stem}", RAIZ)
+        for caminho in sorted((RAIZ / "tesouro").glob("*.py"))
+        if caminho.stem != "__init__"
+    ]
+    for pasta in PASTAS_SCRIPTS:
+        for caminho in sorted((RAIZ / pasta).glob("*.py")):
+            alvos.append((str(caminho), caminho.parent))
+    return alvos
+
+
+def medir(alvo, pasta, repeticoes=3):
+    """
+    Importa o alvo `repeticoes` vezes em processos novos
+
+    Returns:
+        dict: menor tempo de importação, menor tempo total do processo
+              (partida a frio), status e efeitos colaterais detectados
+    """
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        processo = subprocess.run(
+            [sys.executable, "-c", _CODIGO_FILHO, str(RAIZ), str(pasta), alvo],
+            capture_output=True, text=True, stdin=subprocess.DEVNULL, cwd=RAIZ,
+        )
+        total = time.perf_counter() - inicio
+        try:
+            medida = json.loads(processo.stdout.strip().splitlines()[-1])
+        except (IndexError, json.JSONDecodeError):
+            medida = {"segundos": float("nan"), "status": f"erro: {processo.stderr.strip()[-200:]}", "efeitos": []}
+        medida["partida_segundos"] = total
+
+        if melhor is None or medida["segundos"] < melhor["segundos"]:
+            melhor = medida
+
+    nome = alvo if not alvo.endswith(".py") else str(Path(alvo).relative_to(RAIZ))
+    return {"modulo": nome, **melhor}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tempo de importação a frio de cada módulo")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--json", help="grava os resultados neste arquivo")
+    parser.add_argument("--limite", type=float, help="falha se alguma importação passar disso (s)")
+    args = parser.parse_args(argv)
+
+    resultados = [medir(alvo, pasta, args.repeticoes) for alvo, pasta in listar_alvos()]
+
+    print(f"{'MÓDULO':<48} {'IMPORT (ms)':>12} {'PARTIDA (ms)':>13}  STATUS")
+    print("-" * 100)
+    falhou = False
+    for r in resultados:
+        efeitos = f" ⚠️  E/S na importação: {', '.join(r['efeitos'])}" if r["efeitos"] else ""
+        print(f"{r['modulo']:<48} {r['segundos']*1000:>12.1f} {r['partida_segundos']*1000:>13.1f}  {r['status']}{efeitos}")
+        lento = args.limite is not None and r["segundos"] > args.limite
+        falhou = falhou or bool(r["efeitos"]) or lento
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(resultados, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    return 1 if falhou else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
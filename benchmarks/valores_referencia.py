@@ -0,0 +1,272 @@
+"""
+Valores de referência (golden values) dos precificadores e trava de desempenho.
+
+O corpus (dados/valores_referencia.npz) tem as entradas de uma grade
+aleatória grande, mas fixa, e as saídas das fórmulas de um título por vez
+(PU do Prefixado, cotação do Selic e do IPCA+ e VNA projetado do IPCA+)
+escritas aqui em Python puro, sem o numpy: as calcular_* do pacote hoje
+chamam o mesmo kernel vetorizado, e compará-las com ele seria comparar a
+função com ela mesma. Cada motor do pacote (vetorizado, memorizado...)
+registrado em MOTORES precisa:
+
+    - reproduzir o corpus dentro da tolerância relativa, e
+    - ser pelo menos ACELERACAO_MINIMA[motor] vezes mais rápido que o laço
+      escalar em Python puro sobre a mesma grade (o melhor de várias
+      repetições).
+
+Motores sem entrada em ACELERACAO_MINIMA só têm a aceleração reportada.
+É o caso do memorizado: numa grade sem chaves repetidas, a conta que ele
+evita custa quase o mesmo que o acerto no cache, e a razão fica no ruído.
+
+    python benchmarks/valores_referencia.py            # confere (sai com 1 se falhar)
+    python benchmarks/valores_referencia.py --gerar    # regrava o corpus (só de propósito!)
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+CAMINHO_PADRAO = Path(__file__).resolve().parent / "dados" / "valores_referencia.npz"
+N_PONTOS = 5_000
+SEMENTE = 2024
+TOLERANCIA_PADRAO = 1e-12
+
+# Quantas vezes cada tipo de motor precisa ser mais rápido que o escalar
+# (os que não estão aqui só são reportados)
+ACELERACAO_MINIMA = {'vetorizado': 10.0}
+
+
+def gerar_entradas(n=N_PONTOS, semente=SEMENTE):
+    """Grade de entradas de cada função, com os casos de borda no começo"""
+    gerador = np.random.default_rng(semente)
+    du = lambda maximo: np.concatenate([[0, 1, 252], gerador.integers(0, maximo, n - 3)])
+    taxa = lambda minimo, maximo: np.concatenate([[0.0, minimo, maximo], gerador.uniform(minimo, maximo, n - 3)])
+    return {
+        'prefixado': {
+            'vn': np.where(gerador.random(n) < 0.9, 1000.0, gerador.uniform(100, 5000, n)),
+            'taxa': taxa(0.0, 30.0),            # % a.a.
+            'du': du(252 * 35),
+        },
+        'selic': {
+            'taxa': taxa(-0.005, 0.005),        # ágio/deságio em decimal
+            'du': du(252 * 10),
+        },
+        'ipca': {
+            'taxa': taxa(-0.02, 0.12),          # taxa real em decimal
+            'du': du(252 * 40),
+        },
+        'vna_ipca': {
+            'vna': gerador.uniform(1000, 5000, n),
+            'ipca_mensal': taxa(-0.01, 0.02),
+            'meses': gerador.integers(0, 13, n),
+        },
+    }
+
+
+# ==================== REFERÊNCIA ESCALAR ====================
+# As fórmulas de um título por vez em Python puro, como nas calculadoras
+# antes dos precificadores vetorizados. Recebem floats e ints do Python.
+
+def pu_prefixado(vn, taxa_anual, du):
+    """PU = VN / [(Taxa/100 + 1)^(du/252)], com a taxa em % a.a."""
+    return vn / ((taxa_anual / 100 + 1) ** (du / 252))
+
+
+def cotacao(taxa, du):
+    """Cotação (%) = 100 / (1 + taxa)^(du/252), com a taxa em decimal"""
+    return 100 / ((1 + taxa) ** (du / 252))
+
+
+def vna_ipca_projetado(vna_atual, ipca_mensal, meses):
+    """VNA projetado = VNA × (1 + IPCA mensal)^meses"""
+    return vna_atual * ((1 + ipca_mensal) ** meses)
+
+
+# ==================== MOTORES ====================
+# Para cada função: a escalar (referência) e os motores que devem reproduzi-la.
+# Todo motor recebe o dicionário de entradas da função e devolve um array.
+
+def _escalares():
+    return {
+        'prefixado': lambda e: np.array([pu_prefixado(vn, taxa, du)
+                                         for vn, taxa, du in zip(e['vn'].tolist(), e['taxa'].tolist(), e['du'].tolist())]),
+        'selic': lambda e: np.array([cotacao(taxa, du) for taxa, du in zip(e['taxa'].tolist(), e['du'].tolist())]),
+        'ipca': lambda e: np.array([cotacao(taxa, du) for taxa, du in zip(e['taxa'].tolist(), e['du'].tolist())]),
+        'vna_ipca': lambda e: np.array([vna_ipca_projetado(vna, ipca, meses)
+                                        for vna, ipca, meses in zip(e['vna'].tolist(), e['ipca_mensal'].tolist(),
+                                                                    e['meses'].tolist())]),
+    }
+
+
+def _memorizado(escalar):
+    """A função de um título do pacote atrás do cache LRU (medida já com o cache cheio)"""
+    from tesouro.cache import CacheLRU, memorizar
+
+    cache = CacheLRU(capacidade=2 * N_PONTOS)
+    return memorizar(cache, lambda: 1)(escalar)
+
+
+def _motores():
+    from tesouro import precificacao as p
+
+    memo_prefixado = _memorizado(p.calcular_pu_prefixado_oficial)
+    memo_selic = _memorizado(p.calcular_cotacao_selic)
+    memo_ipca = _memorizado(p.calcular_cotacao_ipca)
+
+    return {
+        'prefixado': {
+            'vetorizado': lambda e: p.preco_prefixado(e['taxa'], e['du'], e['vn']),
+            'memorizado': lambda e: np.array([memo_prefixado(vn, taxa, du) for vn, taxa, du
+                                              in zip(e['vn'].tolist(), e['taxa'].tolist(), e['du'].tolist())]),
+        },
+        'selic': {
+            'vetorizado': lambda e: p.cotacao(e['taxa'], e['du']),
+            'memorizado': lambda e: np.array([memo_selic(taxa, du) for taxa, du
+                                              in zip(e['taxa'].tolist(), e['du'].tolist())]),
+        },
+        'ipca': {
+            'vetorizado': lambda e: p.cotacao(e['taxa'], e['du']),
+            'memorizado': lambda e: np.array([memo_ipca(taxa, du) for taxa, du
+                                              in zip(e['taxa'].tolist(), e['du'].tolist())]),
+        },
+        'vna_ipca': {
+            'vetorizado': lambda e: p.projetar_vna_ipca(e['vna'], e['ipca_mensal'], e['meses']),
+        },
+    }
+
+
+# ==================== CORPUS ====================
+
+def gerar(caminho=CAMINHO_PADRAO):
+    """Grava entradas e saídas da referência escalar em Python puro"""
+    entradas = gerar_entradas()
+    escalares = _escalares()
+    arrays = {}
+    for funcao, campos in entradas.items():
+        for campo, valores in campos.items():
+            arrays[f"{funcao}.{campo}"] = valores
+        arrays[f"{funcao}.saida"] = escalares[funcao](campos)
+
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(caminho, **arrays)
+    return caminho
+
+
+def carregar(caminho=CAMINHO_PADRAO):
+    """
+    Returns:
+        dict: função -> (entradas, saídas esperadas)
+    """
+    corpus = {}
+    with np.load(caminho) as arquivo:
+        for chave in arquivo.files:
+            funcao, campo = chave.split(".", 1)
+            corpus.setdefault(funcao, ({}, None))
+            if campo == 'saida':
+                corpus[funcao] = (corpus[funcao][0], arquivo[chave])
+            else:
+                corpus[funcao][0][campo] = arquivo[chave]
+    return corpus
+
+
+def erro_relativo(obtido, esperado):
+    """Maior erro relativo entre dois arrays (NaN nos dois lados conta como igual)"""
+    obtido, esperado = np.asarray(obtido, dtype=float), np.asarray(esperado, dtype=float)
+    if obtido.shape != esperado.shape:
+        return float('inf')
+    iguais_nan = np.isnan(obtido) & np.isnan(esperado)
+    erro = np.abs(obtido - esperado) / np.maximum(np.abs(esperado), np.finfo(float).tiny)
+    return float(np.max(np.where(iguais_nan, 0.0, erro), initial=0.0))
+
+
+def _tempo(funcao, entradas, repeticoes):
+    funcao(entradas)   # aquecimento (e, nos memorizados, enche o cache)
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao(entradas)
+        tempos.append(time.perf_counter() - inicio)
+    # O melhor tempo: o ruído (escalonador, GC) só soma, nunca desconta
+    return min(tempos)
+
+
+def conferir(corpus, tolerancia=TOLERANCIA_PADRAO, repeticoes=5, aceleracao_minima=None):
+    """
+    Confere cada motor contra o corpus e contra o tempo do escalar
+
+    Returns:
+        list[dict]: uma linha por (função, motor), com 'erro_relativo',
+                    'aceleracao' e 'situacao' ('ok' ou o motivo da falha)
+    """
+    aceleracao_minima = {**ACELERACAO_MINIMA, **(aceleracao_minima or {})}
+    escalares = _escalares()
+    linhas = []
+    for funcao, motores in _motores().items():
+        entradas, esperado = corpus[funcao]
+        tempo_escalar = _tempo(escalares[funcao], entradas, repeticoes)
+        linhas.append({
+            'funcao': funcao, 'motor': 'escalar', 'aceleracao': 1.0,
+            'erro_relativo': erro_relativo(escalares[funcao](entradas), esperado),
+        })
+
+        for motor, executar in motores.items():
+            erro = erro_relativo(executar(entradas), esperado)
+            aceleracao = tempo_escalar / _tempo(executar, entradas, repeticoes)
+            linhas.append({
+                'funcao': funcao, 'motor': motor,
+                'erro_relativo': erro, 'aceleracao': aceleracao,
+                'minimo': aceleracao_minima.get(motor),
+            })
+
+    for linha in linhas:
+        if linha['erro_relativo'] > tolerancia:
+            linha['situacao'] = f"fora da tolerância ({linha['erro_relativo']:.1e} > {tolerancia:.0e})"
+        elif linha.get('minimo') is not None and linha['aceleracao'] < linha['minimo']:
+            linha['situacao'] = f"lento ({linha['aceleracao']:.1f}x < {linha['minimo']:.1f}x)"
+        else:
+            linha['situacao'] = 'ok'
+    return linhas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Valores de referência e trava de desempenho dos precificadores")
+    parser.add_argument("--gerar", action="store_true", help="regrava o corpus com a referência escalar")
+    parser.add_argument("--caminho", default=str(CAMINHO_PADRAO))
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA_PADRAO, help="erro relativo aceito")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    parser.add_argument("--aceleracao", action="append", default=[], metavar="MOTOR=FATOR",
+                        help="troca ou liga a aceleração mínima de um motor (ex: vetorizado=20)")
+    args = parser.parse_args(argv)
+
+    if args.gerar:
+        caminho = gerar(args.caminho)
+        print(f"✅ Corpus com {N_PONTOS} pontos por função gravado em {caminho}")
+        return 0
+
+    minimos = {motor: float(fator) for motor, fator in (item.split("=", 1) for item in args.aceleracao)}
+    linhas = conferir(carregar(args.caminho), args.tolerancia, args.repeticoes, minimos)
+
+    print(f"{'FUNÇÃO':<12} {'MOTOR':<12} {'ERRO REL.':>10} {'ACELERAÇÃO':>11}  SITUAÇÃO")
+    print("-" * 72)
+    for linha in linhas:
+        marca = '✅' if linha['situacao'] == 'ok' else '❌'
+        sem_trava = " (sem trava de tempo)" if linha['motor'] != 'escalar' and linha.get('minimo') is None else ""
+        print(f"{linha['funcao']:<12} {linha['motor']:<12} {linha['erro_relativo']:>10.1e} "
+              f"{linha['aceleracao']:>10.1f}x  {marca} {linha['situacao']}{sem_trava}")
+
+    falhas = [linha for linha in linhas if linha['situacao'] != 'ok']
+    if falhas:
+        print(f"\n❌ {len(falhas)} motor(es) reprovado(s)")
+        return 1
+    print("\n✅ Todos os motores reproduzem o corpus e passam na trava de tempo")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,18 @@
-import requests
-import pandas as pd
-from datetime import datetime, timedelta
+import sys
+from pathlib import Path
 
+from datetime import datetime
+
+# Permite importar o pacote tesouro/ a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tesouro import tempos
+from tesouro.dados import buscar_serie_ipca
+from tesouro.calendario import calcular_dias_uteis
+from tesouro.precificacao import calcular_cotacao_ipca as calcular_cotacao
+from tesouro.precificacao import projetar_vna_ipca as projetar_vna
+from tesouro.fontes import ultimo_valido
+from tesouro.vna import DATA_BASE_VNA_IPCA, calcular_vna_ipca
 
 
 def calcular_vna(debug=False):
@@ -15,55 +26,23 @@ def calcular_vna(debug=False):
     Returns:
         float: VNA calculado ou None se houver erro
     """
+    import pandas as pd
+
     try:
-        # Série 433 = IPCA (variação % mensal) no SGS do Bacen
-        url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.433/dados?formato=json"
-        
+        # Série 433 = IPCA (variação % mensal) no SGS do Bacen, pela camada
+        # de dados do pacote tesouro (sessão e cache compartilhados)
         print("🔄 Buscando dados do IPCA na API do BCB...")
-        r = requests.get(url, timeout=15)
-        
-        # Verificar resposta
-        if r.status_code != 200:
-            print(f"⚠️  API retornou status {r.status_code}")
-            return usar_vna_fallback()
-        
-        if not r.text or r.text.strip() == '':
-            print("⚠️  API retornou resposta vazia")
-            return usar_vna_fallback()
-        
-        # Processar dados
-        dados = pd.DataFrame(r.json())
-        
-        if dados.empty:
-            print("⚠️  Nenhum dado retornado")
-            return usar_vna_fallback()
-        
-        # Preparar os dados
-        dados["data"] = pd.to_datetime(dados["data"], dayfirst=True)
-        dados["valor"] = dados["valor"].astype(float) / 100  # converte % para fração
+        serie = buscar_serie_ipca()
         
         # Intervalo: de jul/2000 até hoje
-        inicio = pd.to_datetime("2000-07-01")
-        hoje = datetime.today()
-        
-        ipca = dados[(dados["data"] >= inicio) & (dados["data"] <= hoje)]
-        
-        if ipca.empty:
-            print("⚠️  Nenhum dado no período")
-            return usar_vna_fallback()
-        
-        # Calcula o fator acumulado
-        fator = (1 + ipca["valor"]).prod()
-        vna = 1000 * fator
-        
-        # Info sobre o cálculo
-        ultima_data = ipca["data"].max()
-        qtd_meses = len(ipca)
+        ipca = serie[serie["data"] >= pd.to_datetime(DATA_BASE_VNA_IPCA)]
+        vna, ultima_data = calcular_vna_ipca(serie)
+        fator = vna / 1000
         
         print(f"✅ VNA calculado: R$ {vna:,.2f}")
         print(f"   📅 Base: 01/07/2000 (R$ 1.000,00)")
-        print(f"   📈 Meses de IPCA: {qtd_meses}")
-        print(f"   📊 Último IPCA: {ultima_data.strftime('%m/%Y')}")
+        print(f"   📈 Meses de IPCA: {len(ipca)}")
+        print(f"   📊 Último IPCA: {ultima_data}")
         print(f"   🔢 Fator acumulado: {fator:.6f}")
         
         # Debug: mostrar tabela completa
@@ -74,41 +53,28 @@ def calcular_vna(debug=False):
             print(ipca.tail(12))  # Últimos 12 meses
         
         return vna
-        
-    except requests.exceptions.Timeout:
-        print("⚠️  Timeout ao conectar na API do BCB")
-        return usar_vna_fallback()
-    
-    except requests.exceptions.ConnectionError:
-        print("⚠️  Erro de conexão com a API do BCB")
-        return usar_vna_fallback()
-    
-    except requests.exceptions.JSONDecodeError:
-        print("⚠️  API não retornou JSON válido")
-        print(f"Resposta: {r.text[:200]}...")
-        return usar_vna_fallback()
-    
-    except KeyError as e:
-        print(f"⚠️  Campo ausente nos dados: {e}")
-        return usar_vna_fallback()
     
     except Exception as e:
-        print(f"⚠️  Erro inesperado: {type(e).__name__}: {str(e)}")
+        print(f"⚠️  Erro ao buscar o IPCA: {type(e).__name__}: {str(e)}")
         return usar_vna_fallback()
 
 
 def usar_vna_fallback():
     """
-    Usa um valor aproximado de VNA quando a API falha
-    Atualizado em outubro/2024
+    Usa o último VNA válido (gravado pelo pacote tesouro) quando a API falha
     """
-    vna_estimado = 4561.46
+    ultimo = ultimo_valido('vna_ipca')
     
     print("\n" + "="*60)
     print("⚠️  MODO FALLBACK ATIVADO")
     print("="*60)
-    print(f"📊 Usando VNA estimado: R$ {vna_estimado:,.2f}")
-    print("⚠️  Este é um valor aproximado de outubro/2024!")
+    if ultimo is None:
+        print("❌ Nenhum VNA válido registrado ainda")
+        print("="*60 + "\n")
+        return None
+    
+    vna_estimado, referencia = ultimo
+    print(f"📊 Usando último VNA válido: R$ {vna_estimado:,.2f} ({referencia})")
     print("⚠️  Para valores exatos, verifique:")
     print("    https://www.tesourodireto.com.br")
     print("="*60 + "\n")
@@ -127,21 +93,17 @@ def obter_historico_vna(ano_inicio=2000, mes_inicio=7):
     Returns:
         DataFrame: Histórico com data, IPCA e VNA acumulado
     """
+    import pandas as pd
+
     try:
-        url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.433/dados?formato=json"
-        r = requests.get(url, timeout=15)
-        dados = pd.DataFrame(r.json())
-        
-        dados["data"] = pd.to_datetime(dados["data"], dayfirst=True)
-        dados["ipca_pct"] = dados["valor"].astype(float)
-        dados["ipca_decimal"] = dados["ipca_pct"] / 100
+        serie = buscar_serie_ipca()
         
         inicio = pd.to_datetime(f"{ano_inicio}-{mes_inicio:02d}-01")
-        dados = dados[dados["data"] >= inicio].copy()
+        dados = serie[serie["data"] >= inicio].copy()
+        dados["ipca_pct"] = dados["valor"] * 100
         
         # Calcular VNA acumulado mês a mês
-        dados["fator"] = 1 + dados["ipca_decimal"]
-        dados["vna"] = (dados["fator"].cumprod() * 1000).round(2)
+        dados["vna"] = ((1 + dados["valor"]).cumprod() * 1000).round(2)
         
         return dados[["data", "ipca_pct", "vna"]]
         
@@ -149,32 +111,6 @@ def obter_historico_vna(ano_inicio=2000, mes_inicio=7):
         print(f"Erro ao obter histórico: {e}")
         return None
 
-def calcular_dias_uteis(data_atual, data_vencimento):
-    """
-    Calcula dias úteis entre duas datas (aproximação usando 252 dias úteis/ano)
-    """
-    dias_corridos = (data_vencimento - data_atual).days
-    dias_uteis = int(dias_corridos * (252 / 365))
-    return dias_uteis, dias_corridos
-
-
-def projetar_vna(vna_atual, ipca_projetado_mensal, meses=1):
-    """
-    Projeta o VNA com base no IPCA projetado
-    """
-    vna_projetado = vna_atual * ((1 + ipca_projetado_mensal) ** meses)
-    return vna_projetado
-
-
-def calcular_cotacao(taxa_real_anual, dias_uteis_vencimento):
-    """
-    Calcula a cotação usando a fórmula:
-    Cotação (%) = 100 / (1 + taxa_real)^(dias_úteis / 252)
-    """
-    cotacao = 100 / ((1 + taxa_real_anual) ** (dias_uteis_vencimento / 252))
-    return cotacao
-
-
 def calculadora_ipca_simples(ano_vencimento, taxa_real_anual, ipca_projetado_mensal=None):
     """
     Calculadora simples do Tesouro IPCA+
@@ -211,7 +147,8 @@ def calculadora_ipca_simples(ano_vencimento, taxa_real_anual, ipca_projetado_men
     
     # Passo 1: Calcular VNA atual
     print(f"\n🔄 PASSO 1: Calculando VNA atual...")
-    vna_atual = calcular_vna()
+    with tempos.etapa("vna"):
+        vna_atual = calcular_vna()
     if vna_atual is None:
         print("❌ Erro ao calcular VNA atual")
         return None
@@ -222,23 +159,27 @@ def calculadora_ipca_simples(ano_vencimento, taxa_real_anual, ipca_projetado_men
     # Calcular quantos meses até o vencimento para projeção
     meses_ate_vencimento = ((data_vencimento.year - data_compra.year) * 12 + 
                             (data_vencimento.month - data_compra.month))
-    vna_projetado = projetar_vna(vna_atual, ipca_projetado_mensal, meses=1)
+    with tempos.etapa("vna_projetado"):
+        vna_projetado = projetar_vna(vna_atual, ipca_projetado_mensal, meses=1)
     print(f"✅ VNA projetado (1 mês): R$ {vna_projetado:,.2f}")
     
     # Passo 3: Calcular dias úteis
     print(f"\n🔄 PASSO 3: Calculando prazo...")
-    dias_uteis, dias_corridos = calcular_dias_uteis(data_compra, data_vencimento)
+    with tempos.etapa("dias_uteis"):
+        dias_uteis, dias_corridos = calcular_dias_uteis(data_compra, data_vencimento)
     print(f"✅ Dias corridos: {dias_corridos}")
     print(f"✅ Dias úteis: {dias_uteis}")
     
     # Passo 4: Calcular cotação
     print(f"\n🔄 PASSO 4: Calculando cotação...")
-    cotacao = calcular_cotacao(taxa_real_anual, dias_uteis)
+    with tempos.etapa("cotacao"):
+        cotacao = calcular_cotacao(taxa_real_anual, dias_uteis)
     print(f"✅ Cotação: {cotacao:.4f}%")
     
     # Passo 5: Calcular preço final
     print(f"\n🔄 PASSO 5: Calculando preço final...")
-    preco_final = vna_projetado * (cotacao / 100)
+    with tempos.etapa("preco"):
+        preco_final = vna_projetado * (cotacao / 100)
     print(f"✅ PREÇO DO TÍTULO: R$ {preco_final:,.2f}")
     
     # Resumo
@@ -1,7 +1,15 @@
-import requests
-import pandas as pd
+import sys
+from pathlib import Path
+
 from datetime import datetime
 
+# Permite importar o pacote tesouro/ a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tesouro.dados import buscar_serie_ipca
+from tesouro.fontes import ultimo_valido
+from tesouro.vna import DATA_BASE_VNA_IPCA, calcular_vna_ipca
+
 
 def calcular_vna(debug=False):
     """
@@ -14,55 +22,23 @@ def calcular_vna(debug=False):
     Returns:
         float: VNA calculado ou None se houver erro
     """
+    import pandas as pd
+
     try:
-        # Série 433 = IPCA (variação % mensal) no SGS do Bacen
-        url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.433/dados?formato=json"
-        
+        # Série 433 = IPCA (variação % mensal) no SGS do Bacen, pela camada
+        # de dados do pacote tesouro (sessão e cache compartilhados)
         print("🔄 Buscando dados do IPCA na API do BCB...")
-        r = requests.get(url, timeout=15)
-        
-        # Verificar resposta
-        if r.status_code != 200:
-            print(f"⚠️  API retornou status {r.status_code}")
-            return usar_vna_fallback()
-        
-        if not r.text or r.text.strip() == '':
-            print("⚠️  API retornou resposta vazia")
-            return usar_vna_fallback()
-        
-        # Processar dados
-        dados = pd.DataFrame(r.json())
-        
-        if dados.empty:
-            print("⚠️  Nenhum dado retornado")
-            return usar_vna_fallback()
-        
-        # Preparar os dados
-        dados["data"] = pd.to_datetime(dados["data"], dayfirst=True)
-        dados["valor"] = dados["valor"].astype(float) / 100  # converte % para fração
+        serie = buscar_serie_ipca()
         
         # Intervalo: de jul/2000 até hoje
-        inicio = pd.to_datetime("2000-07-01")
-        hoje = datetime.today()
-        
-        ipca = dados[(dados["data"] >= inicio) & (dados["data"] <= hoje)]
-        
-        if ipca.empty:
-            print("⚠️  Nenhum dado no período")
-            return usar_vna_fallback()
-        
-        # Calcula o fator acumulado
-        fator = (1 + ipca["valor"]).prod()
-        vna = 1000 * fator
-        
-        # Info sobre o cálculo
-        ultima_data = ipca["data"].max()
-        qtd_meses = len(ipca)
+        ipca = serie[serie["data"] >= pd.to_datetime(DATA_BASE_VNA_IPCA)]
+        vna, ultima_data = calcular_vna_ipca(serie)
+        fator = vna / 1000
         
         print(f"✅ VNA calculado: R$ {vna:,.2f}")
         print(f"   📅 Base: 01/07/2000 (R$ 1.000,00)")
-        print(f"   📈 Meses de IPCA: {qtd_meses}")
-        print(f"   📊 Último IPCA: {ultima_data.strftime('%m/%Y')}")
+        print(f"   📈 Meses de IPCA: {len(ipca)}")
+        print(f"   📊 Último IPCA: {ultima_data}")
         print(f"   🔢 Fator acumulado: {fator:.6f}")
         
         # Debug: mostrar tabela completa
@@ -73,41 +49,28 @@ def calcular_vna(debug=False):
             print(ipca.tail(12))  # Últimos 12 meses
         
         return vna
-        
-    except requests.exceptions.Timeout:
-        print("⚠️  Timeout ao conectar na API do BCB")
-        return usar_vna_fallback()
-    
-    except requests.exceptions.ConnectionError:
-        print("⚠️  Erro de conexão com a API do BCB")
-        return usar_vna_fallback()
-    
-    except requests.exceptions.JSONDecodeError:
-        print("⚠️  API não retornou JSON válido")
-        print(f"Resposta: {r.text[:200]}...")
-        return usar_vna_fallback()
-    
-    except KeyError as e:
-        print(f"⚠️  Campo ausente nos dados: {e}")
-        return usar_vna_fallback()
     
     except Exception as e:
-        print(f"⚠️  Erro inesperado: {type(e).__name__}: {str(e)}")
+        print(f"⚠️  Erro ao buscar o IPCA: {type(e).__name__}: {str(e)}")
         return usar_vna_fallback()
 
 
 def usar_vna_fallback():
     """
-    Usa um valor aproximado de VNA quando a API falha
-    Atualizado em outubro/2024
+    Usa o último VNA válido (gravado pelo pacote tesouro) quando a API falha
     """
-    vna_estimado = 4561.46
+    ultimo = ultimo_valido('vna_ipca')
     
     print("\n" + "="*60)
     print("⚠️  MODO FALLBACK ATIVADO")
     print("="*60)
-    print(f"📊 Usando VNA estimado: R$ {vna_estimado:,.2f}")
-    print("⚠️  Este é um valor aproximado de outubro/2024!")
+    if ultimo is None:
+        print("❌ Nenhum VNA válido registrado ainda")
+        print("="*60 + "\n")
+        return None
+    
+    vna_estimado, referencia = ultimo
+    print(f"📊 Usando último VNA válido: R$ {vna_estimado:,.2f} ({referencia})")
     print("⚠️  Para valores exatos, verifique:")
     print("    https://www.tesourodireto.com.br")
     print("="*60 + "\n")
@@ -126,21 +89,17 @@ def obter_historico_vna(ano_inicio=2000, mes_inicio=7):
     Returns:
         DataFrame: Histórico com data, IPCA e VNA acumulado
     """
+    import pandas as pd
+
     try:
-        url = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.433/dados?formato=json"
-        r = requests.get(url, timeout=15)
-        dados = pd.DataFrame(r.json())
-        
-        dados["data"] = pd.to_datetime(dados["data"], dayfirst=True)
-        dados["ipca_pct"] = dados["valor"].astype(float)
-        dados["ipca_decimal"] = dados["ipca_pct"] / 100
+        serie = buscar_serie_ipca()
         
         inicio = pd.to_datetime(f"{ano_inicio}-{mes_inicio:02d}-01")
-        dados = dados[dados["data"] >= inicio].copy()
+        dados = serie[serie["data"] >= inicio].copy()
+        dados["ipca_pct"] = dados["valor"] * 100
         
         # Calcular VNA acumulado mês a mês
-        dados["fator"] = 1 + dados["ipca_decimal"]
-        dados["vna"] = (dados["fator"].cumprod() * 1000).round(2)
+        dados["vna"] = ((1 + dados["valor"]).cumprod() * 1000).round(2)
         
         return dados[["data", "ipca_pct", "vna"]]
         
@@ -154,7 +113,7 @@ def obter_historico_vna(ano_inicio=2000, mes_inicio=7):
 # vna_hoje = calcular_vna()
 
 
-#if __name__ == "__main__":
+if __name__ == "__main__":
     # Testes do módulo
     print("🧪 TESTE DO MÓDULO CALCULADORA VNA")
     print("="*60)
@@ -1,8 +1,12 @@
+"""
+Dias úteis entre duas datas
 
-def calcular_dias_uteis(data_atual, data_vencimento):
-    """
-    Calcula dias úteis entre duas datas (aproximação usando 252 dias úteis/ano)
-    """
-    dias_corridos = (data_vencimento - data_atual).days
-    dias_uteis = int(dias_corridos * (252 / 365))
-    return dias_uteis, dias_corridos
\ No newline at end of file
+Mantido para os scripts desta pasta; a implementação fica no pacote tesouro/.
+"""
+import sys
+from pathlib import Path
+
+# Permite importar o pacote tesouro/ a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tesouro.calendario import calcular_dias_uteis
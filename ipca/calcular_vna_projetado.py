@@ -6,8 +6,9 @@ def vna_projetado_ipca(vna_atual, ipca_projetado_mensal):
     vna_projetado = vna_atual * (1 + ipca_projetado_mensal)
     return vna_projetado
 
-# Aqui você precisa chamar a função calcular_vna() para obter o número
-vna_atual = calcular_vna()
+if __name__ == "__main__":
+    # Aqui você precisa chamar a função calcular_vna() para obter o número
+    vna_atual = calcular_vna()
 
-vna_projetado = vna_projetado_ipca(vna_atual, ipca_projetado_mensal)
-#print(vna_projetado)
+    vna_projetado = vna_projetado_ipca(vna_atual, ipca_projetado_mensal)
+    #print(vna_projetado)
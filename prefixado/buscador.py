@@ -1,4 +1,10 @@
-import tesouro_direto_br as td
+import sys
+from pathlib import Path
+
+# Permite importar o pacote tesouro/ a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tesouro.dados import buscar_catalogo
 
 
 def buscar_tesouro_prefixado_2032():  # olhar qual é o ano e a partir disso criar 
@@ -10,7 +16,7 @@ def buscar_tesouro_prefixado_2032():  # olhar qual é o ano e a partir disso cri
     
     try:
         # Busca todos os títulos
-        todos_titulos = td.busca_tesouro_direto()
+        todos_titulos = buscar_catalogo()
         
         print(f"✅ Total de títulos encontrados: {len(todos_titulos)}")
         
@@ -6,8 +6,6 @@
 # CALCULADORA ESPECÍFICA - TESOURO PREFIXADO 2032
 # Busca, extrai dados e calcula PU para comparação
 
-import tesouro_direto_br as td
-import pandas as pd
 from datetime import datetime, date
 from buscador import buscar_tesouro_prefixado_2032
 from extrair_dados import extrair_dados_prefixados_2032
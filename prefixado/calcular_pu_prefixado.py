@@ -1,9 +1,13 @@
-def calcular_pu_prefixado_oficial(vn, taxa_anual, du):
-    """
-    Fórmula oficial do Tesouro Direto para títulos prefixados:
-    PU = VN / [(Taxa/100 + 1)^(du/252)]
-    """
-    base = (taxa_anual / 100) + 1
-    expoente = du / 252
-    pu = vn / (base ** expoente)
-    return pu
\ No newline at end of file
+"""
+Fórmula oficial do Tesouro Direto para títulos prefixados:
+PU = VN / [(Taxa/100 + 1)^(du/252)]
+
+Mantido para os scripts desta pasta; a implementação fica no pacote tesouro/.
+"""
+import sys
+from pathlib import Path
+
+# Permite importar o pacote tesouro/ a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tesouro.precificacao import calcular_pu_prefixado_oficial
@@ -1,4 +1,3 @@
-import tesouro_direto_br as td
 from datetime import datetime
 
 def extrair_dados_prefixados_2032(index_titulo, dados_titulo):
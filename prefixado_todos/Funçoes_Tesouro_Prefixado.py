@@ -1,5 +1,12 @@
+import sys
+from pathlib import Path
 
-import tesouro_direto_br as td
+# Permite importar o pacote tesouro/ a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tesouro.calendario import calcular_dias_uteis
+from tesouro.dados import buscar_catalogo
+from tesouro.precificacao import calcular_pu_prefixado_oficial
 from datetime import datetime
 
 
@@ -11,7 +18,7 @@ def buscar_titulos_prefixados():
     """
     try:
         # Busca todos os títulos:
-        todos_titulos = td.busca_tesouro_direto()
+        todos_titulos = buscar_catalogo()
         
         # ✅ COMENTOU ESTE PRINT
         # print(f"✅ Total de títulos encontrados: {len(todos_titulos)}")
@@ -170,27 +177,6 @@ def extrair_dados_prefixado_qualquer_ano(index_titulo, dados_titulo):
     
     return dados_extraidos
 
-def calcular_dias_uteis(data_atual, data_vencimento):
-    """
-    Calcula dias úteis entre duas datas (aproximação usando 252 dias úteis/ano)
-    """
-    dias_corridos = (data_vencimento - data_atual).days
-    dias_uteis = int(dias_corridos * (252 / 365))
-    return dias_uteis, dias_corridos
-
-def calcular_pu_prefixado_oficial(vn, taxa_anual, du):
-    """
-    Fórmula oficial do Tesouro Direto para títulos prefixados:
-    PU = VN / [(Taxa/100 + 1)^(du/252)]
-    """
-    base = (taxa_anual / 100) + 1
-    expoente = du / 252
-    pu = vn / (base ** expoente)
-    return pu
-
-
-
-
 def calculadora_prefixado_por_ano(ano, taxa_anual):
     """
     Calculadora para qualquer ano de prefixado
@@ -239,7 +225,9 @@ def calculadora_prefixado_por_ano(ano, taxa_anual):
     )
  
     print(f"PU Calculado:     R$ {pu_calculado:,.6f}")
-calculadora_prefixado_por_ano(ano=int(input("digite o ano:")), taxa_anual=float(input("digite a taxa:")))  
+
+if __name__ == "__main__":
+    calculadora_prefixado_por_ano(ano=int(input("digite o ano:")), taxa_anual=float(input("digite a taxa:")))
    
 
 
@@ -1,4 +1,3 @@
-import tesouro_direto_br as td
 from datetime import datetime
 def extrair_dados_prefixado_qualquer_ano(index_titulo, dados_titulo):
     """
@@ -1,6 +1,14 @@
-import requests
-import pandas as pd
-from datetime import datetime, timedelta
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Permite importar o pacote tesouro/ a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tesouro import tempos
+from tesouro.calendario import calcular_dias_uteis
+from tesouro.dados import buscar_vna_selic
+from tesouro.precificacao import calcular_cotacao_selic
 
 
 
@@ -22,46 +30,10 @@ def calcular_vna_selic_projetado(vna_atual, taxa_selic_anual):
     
     return vna_projetado
 
-def calcular_cotacao_selic(taxa_contratada, dias_uteis):
-    """
-    Calcula cotação do Tesouro Selic
-    Cotação (%) = 100 / (1 + taxa_contratada)^(dias_uteis/252)
-    
-    Args:
-        taxa_contratada (float): Taxa de ágio/deságio em decimal
-        dias_uteis (int): Dias úteis até vencimento
-    """
-    expoente = dias_uteis / 252
-    cotacao = 100 / ((1 + taxa_contratada) ** expoente)
-    
-    return cotacao
-
-def calcular_dias_uteis(data_atual, data_vencimento):
-    """
-    Calcula dias úteis entre duas datas (aproximação usando 252 dias úteis/ano)
-    """
-    dias_corridos = (data_vencimento - data_atual).days
-    dias_uteis = int(dias_corridos * (252 / 365))
-    return dias_uteis, dias_corridos
-
-
 def obter_vna_selic_atual():
-    url = "https://brasilindicadores.com.br/titulos-publicos/vna"
-
     try:
-        # Lê todas as tabelas da página
-        tabelas = pd.read_html(url)
-       
-
-        # A tabela da LFT (Tesouro Selic) normalmente é a terceira (índice 2)
-        tabela_lft = tabelas[2]
-
-        # Extrair linha da LFT
-        linha = tabela_lft.iloc[0]  
-        data_ref = linha["Dt. referência"]
-        vna = float(str(linha["VNA"]).replace("R$", "").replace(".", "").replace(",", "."))
-
-        return vna, data_ref
+        # Tabela da LFT no brasilindicadores, pela camada de dados do pacote tesouro
+        return buscar_vna_selic()
     
     except Exception as e:
         print(f"Erro ao obter VNA alternativo: {e}")
@@ -107,28 +79,33 @@ def calculadora_tesouro_selic(ano_vencimento, taxa_contratada=0.0, taxa_selic_pr
     # PASSO 1: Obter VNA atual
     print(f"\n🔄 PASSO 1: Obtendo VNA atual...")
     
-    vna_atual, data_ref = obter_vna_selic_atual(  )
+    with tempos.etapa("vna"):
+        vna_atual, data_ref = obter_vna_selic_atual()
     
 
     
     # PASSO 2: Calcular VNA projetado
     print(f"\n🔄 PASSO 2: Calculando VNA projetado...")
-    vna_projetado = calcular_vna_selic_projetado(vna_atual, taxa_selic_projetada)
+    with tempos.etapa("vna_projetado"):
+        vna_projetado = calcular_vna_selic_projetado(vna_atual, taxa_selic_projetada)
     
     # PASSO 3: Calcular dias úteis
     print(f"\n🔄 PASSO 3: Calculando prazo...")
-    dias_uteis, dias_corridos = calcular_dias_uteis(data_compra, data_vencimento)
+    with tempos.etapa("dias_uteis"):
+        dias_uteis, dias_corridos = calcular_dias_uteis(data_compra, data_vencimento)
     print(f"✅ Dias corridos: {dias_corridos}")
     print(f"✅ Dias úteis (aproximado): {dias_uteis}")
     
     # PASSO 4: Calcular cotação
     print(f"\n🔄 PASSO 4: Calculando cotação...")
-    cotacao = calcular_cotacao_selic(taxa_contratada, dias_uteis)
+    with tempos.etapa("cotacao"):
+        cotacao = calcular_cotacao_selic(taxa_contratada, dias_uteis)
     print(f"✅ Cotação: {cotacao:.4f}%")
     
     # PASSO 5: Calcular preço
     print(f"\n🔄 PASSO 5: Calculando preço...")
-    preco_unitario = vna_projetado * (cotacao / 100)
+    with tempos.etapa("preco"):
+        preco_unitario = vna_projetado * (cotacao / 100)
     print(f"✅ PREÇO UNITÁRIO: R$ {preco_unitario:,.2f}")
     
     # Análise da taxa
@@ -1,13 +1,13 @@
-def calcular_cotacao_selic(taxa_contratada, dias_uteis):
-    """
-    Calcula cotação do Tesouro Selic
-    Cotação (%) = 100 / (1 + taxa_contratada)^(dias_uteis/252)
-    
-    Args:
-        taxa_contratada (float): Taxa de ágio/deságio em decimal
-        dias_uteis (int): Dias úteis até vencimento
-    """
-    expoente = dias_uteis / 252
-    cotacao = 100 / ((1 + taxa_contratada) ** expoente)
-    
-    return cotacao
\ No newline at end of file
+"""
+Cotação do Tesouro Selic:
+Cotação (%) = 100 / (1 + taxa_contratada)^(dias_uteis/252)
+
+Mantido para os scripts desta pasta; a implementação fica no pacote tesouro/.
+"""
+import sys
+from pathlib import Path
+
+# Permite importar o pacote tesouro/ a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tesouro.precificacao import calcular_cotacao_selic
@@ -1,22 +1,15 @@
-import pandas as pd
+import sys
+from pathlib import Path
 
-def obter_vna_selic_atual():
-    url = "https://brasilindicadores.com.br/titulos-publicos/vna"
-
-    try:
-        # Lê todas as tabelas da página
-        tabelas = pd.read_html(url)
-       
+# Permite importar o pacote tesouro/ a partir da raiz do repositório
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-        # A tabela da LFT (Tesouro Selic) normalmente é a terceira (índice 2)
-        tabela_lft = tabelas[2]
+from tesouro.dados import buscar_vna_selic
 
-        # Extrair linha da LFT
-        linha = tabela_lft.iloc[0]  
-        data_ref = linha["Dt. referência"]
-        vna = float(str(linha["VNA"]).replace("R$", "").replace(".", "").replace(",", "."))
-
-        return vna, data_ref
+def obter_vna_selic_atual():
+    try:
+        # Tabela da LFT no brasilindicadores, pela camada de dados do pacote tesouro
+        return buscar_vna_selic()
     
     except Exception as e:
         print(f"Erro ao obter VNA alternativo: {e}")
@@ -0,0 +1,8 @@
+"""
+Núcleo de precificação do Tesouro Direto.
+
+Os módulos deste pacote são importados sob demanda, por exemplo:
+
+    from tesouro.historico import carregar_arquivo
+    from tesouro.backtest import executar_backtest
+"""
@@ -0,0 +1,68 @@
+"""
+Redução de séries longas para gráficos (Largest-Triangle-Three-Buckets).
+
+Vinte anos de preços diários de um título são milhares de pontos, mas um
+gráfico só mostra tantos quanto tem de pixels de largura. O LTTB divide a
+série em baldes e, de cada um, fica com o ponto que forma o maior
+triângulo com o ponto escolhido antes e a média do balde seguinte: picos
+e vales continuam no desenho, com uma fração dos pontos.
+
+As funções devolvem posições na série original, para que as datas e as
+outras colunas (taxa, PU de venda, ...) sejam lidas nos mesmos pontos.
+"""
+import numpy as np
+
+
+def janela(x, inicio=None, fim=None):
+    """Fatia de x (ordenado) entre inicio e fim, inclusive"""
+    x = np.asarray(x)
+    primeiro = 0 if inicio is None else np.searchsorted(x, inicio, side='left')
+    ultimo = len(x) if fim is None else np.searchsorted(x, fim, side='right')
+    return slice(int(primeiro), int(ultimo))
+
+
+def lttb(x, y, pontos):
+    """
+    Posições dos `pontos` que representam a série (x, y) no gráfico
+
+    Pontos com y NaN são ignorados. O primeiro e o último ponto válidos
+    sempre ficam.
+
+    Args:
+        x: valores do eixo x, em ordem crescente (números ou datetime64)
+        y: valores do eixo y
+        pontos (int): quantos pontos manter (no mínimo 3)
+
+    Returns:
+        array int: posições em x e y, em ordem crescente
+    """
+    y = np.asarray(y, dtype=float)
+    validos = np.flatnonzero(~np.isnan(y))
+    if pontos >= len(validos) or pontos < 3:
+        return validos
+
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[D]').astype(np.int64)
+    x = x[validos].astype(float)
+    y = y[validos]
+    tamanho = len(y)
+
+    # pontos - 2 baldes entre o primeiro e o último ponto
+    bordas = np.append(np.linspace(1, tamanho - 1, pontos - 1).astype(int), tamanho)
+    escolhidos = np.empty(pontos, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, tamanho - 1
+
+    anterior = 0
+    for i in range(pontos - 2):
+        inicio, fim = bordas[i], bordas[i + 1]
+        media_x = x[fim:bordas[i + 2]].mean()
+        media_y = y[fim:bordas[i + 2]].mean()
+        area = np.abs(
+            (x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+            - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior])
+        )
+        anterior = inicio + int(area.argmax())
+        escolhidos[i + 1] = anterior
+
+    return validos[escolhidos]
@@ -0,0 +1,199 @@
+"""
+API HTTP de precificação.
+
+Todos os pedidos usam o mesmo MarketSnapshot em memória (renovado em
+segundo plano) e os precificadores vetorizados de tesouro.precificacao.
+
+Rotas:
+    GET  /cotacao?produto=prefixado&ano=2029&taxa=13.92
+    POST /lote        lista JSON ou NDJSON de pedidos; resposta em NDJSON
+    GET  /snapshot    versão e datas de referência do snapshot em uso
+    GET  /delta?desde=VERSAO   o que mudou desde uma versão (tesouro.cdc)
+    GET  /metrics     métricas no formato texto do Prometheus (tesouro.metricas)
+
+Uso:
+    python -m tesouro.api --porta 8000 --processos 4
+"""
+import argparse
+import asyncio
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import tornado.ioloop
+import tornado.web
+
+from tesouro import cdc, mercado, metricas
+from tesouro.coalescencia import voos
+from tesouro.precificacao import linhas_de_resultado, pedidos_de_linhas, precificar_lote
+
+# Pedidos precificados e enviados de cada vez na resposta
+TAMANHO_BLOCO = 2000
+
+# Lotes maiores que isso vão para os processos do pool; os menores são
+# precificados no próprio loop, que fica parado enquanto isso (~1 ms)
+LIMITE_LOTE_LOCAL = 500
+
+# Idade máxima do snapshot (s); a renovação roda na metade desse tempo
+MAX_IDADE_SNAPSHOT = 300
+
+
+def precificar_bloco(snapshot, linhas):
+    """
+    Precifica um bloco de linhas
+
+    Returns:
+        tuple: (trecho NDJSON da resposta, cotações precificadas por produto)
+    """
+    pedidos = pedidos_de_linhas(linhas)
+    resultado = precificar_lote(snapshot, pedidos)
+    ok = resultado['erro'] == ''
+    cotacoes = Counter(pedidos['produto'][ok].tolist())
+    texto = "".join(
+        json.dumps(saida, ensure_ascii=False) + "\n"
+        for saida in linhas_de_resultado(linhas, resultado)
+    )
+    return texto, cotacoes
+
+
+async def obter_snapshot():
+    """
+    Snapshot atual; a busca nas fontes (se precisar) roda fora do loop, e os
+    pedidos que chegarem durante ela aguardam a mesma busca
+    """
+    snapshot = mercado.snapshot_em_dia(MAX_IDADE_SNAPSHOT)
+    if snapshot is not None:
+        return snapshot
+    return await voos.executar_async('snapshot', mercado.obter_snapshot, MAX_IDADE_SNAPSHOT)
+
+
+def _ler_linhas(corpo):
+    """Aceita uma lista JSON ou um pedido JSON por linha (NDJSON)"""
+    texto = corpo.decode("utf-8").strip()
+    if texto.startswith("["):
+        return json.loads(texto)
+    return [json.loads(linha) for linha in texto.splitlines() if linha.strip()]
+
+
+class CotacaoHandler(tornado.web.RequestHandler):
+    async def get(self):
+        linha = {campo: self.get_query_argument(campo, None)
+                 for campo in ('produto', 'ano', 'taxa', 'selic', 'ipca_mensal', 'data')}
+        linha = {campo: valor for campo, valor in linha.items() if valor is not None}
+
+        snapshot = await obter_snapshot()
+        self.set_header("Content-Type", "application/json")
+        self.write(precificar_bloco(snapshot, [linha])[0])
+
+
+class LoteHandler(tornado.web.RequestHandler):
+    async def post(self):
+        try:
+            linhas = _ler_linhas(self.request.body)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise tornado.web.HTTPError(400, reason=f"Corpo inválido: {e}")
+
+        snapshot = await obter_snapshot()
+        self.set_header("Content-Type", "application/x-ndjson")
+        blocos = [linhas[i:i + TAMANHO_BLOCO] for i in range(0, len(linhas), TAMANHO_BLOCO)]
+
+        if len(linhas) <= LIMITE_LOTE_LOCAL:
+            # precificar_lote já conta as cotações neste processo
+            self.write(precificar_bloco(snapshot, linhas)[0])
+            return
+
+        # Lote grande: blocos em paralelo no pool, respondidos na ordem
+        loop = asyncio.get_running_loop()
+        pool = self.application.settings["pool"]
+        futuros = [loop.run_in_executor(pool, precificar_bloco, snapshot, bloco) for bloco in blocos]
+        cotacoes = Counter()
+        for futuro in futuros:
+            texto, contagem = await futuro
+            self.write(texto)
+            await self.flush()
+            cotacoes.update(contagem)
+
+        # As cotações contadas nos processos do pool não aparecem nas métricas
+        # deste processo: conta aqui as que saíram com preço
+        for produto in ('prefixado', 'selic', 'ipca'):
+            metricas.contar_cotacoes(produto, cotacoes[produto])
+
+
+class SnapshotHandler(tornado.web.RequestHandler):
+    async def get(self):
+        snapshot = await obter_snapshot()
+        self.write({
+            'versao': snapshot.versao,
+            'data_referencia': str(snapshot.data_referencia),
+            'idade_segundos': round(snapshot.idade(), 1),
+            'titulos': len(snapshot.tipos),
+            'vna_selic': snapshot.vna_selic,
+            'data_vna_selic': snapshot.data_vna_selic,
+            'vna_ipca': snapshot.vna_ipca,
+            'data_vna_ipca': snapshot.data_vna_ipca,
+        })
+
+
+class DeltaHandler(tornado.web.RequestHandler):
+    async def get(self):
+        await obter_snapshot()
+        try:
+            desde = int(self.get_query_argument('desde'))
+        except (tornado.web.MissingArgumentError, ValueError):
+            raise tornado.web.HTTPError(400, reason="informe desde=<versão>")
+
+        delta = cdc.delta_desde(desde)
+        if delta is None:
+            # Versão fora do histórico: o cliente precisa buscar tudo de novo
+            self.write({'de': desde, 'para': cdc.versao_atual(), 'completo': True})
+            return
+        self.write({**delta.compacto(), 'completo': False})
+
+
+class MetricasHandler(tornado.web.RequestHandler):
+    def get(self):
+        self.set_header("Content-Type", metricas.TIPO_CONTEUDO)
+        self.write(metricas.gerar())
+
+
+def criar_app(processos=None):
+    """Cria a aplicação tornado com o pool de processos para lotes grandes"""
+    return tornado.web.Application(
+        [
+            (r"/cotacao", CotacaoHandler),
+            (r"/lote", LoteHandler),
+            (r"/snapshot", SnapshotHandler),
+            (r"/delta", DeltaHandler),
+            (r"/metrics", MetricasHandler),
+        ],
+        pool=ProcessPoolExecutor(processos or os.cpu_count()),
+    )
+
+
+async def _renovar_snapshot():
+    # Renova a partir da metade da idade máxima: lê o arquivo do atualizador
+    # se houver um em dia, senão busca nas fontes
+    loop = asyncio.get_running_loop()
+    try:
+        await loop.run_in_executor(None, mercado.obter_snapshot, MAX_IDADE_SNAPSHOT / 2)
+    except Exception as e:
+        print(f"⚠️  Falha ao renovar snapshot: {e}")
+
+
+async def main(porta=8000, processos=None):
+    app = criar_app(processos)
+    app.listen(porta)
+    print(f"🚀 API de precificação em http://localhost:{porta}")
+
+    await _renovar_snapshot()
+    tornado.ioloop.PeriodicCallback(_renovar_snapshot, MAX_IDADE_SNAPSHOT / 2 * 1000).start()
+    await asyncio.Event().wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="API HTTP de precificação do Tesouro Direto")
+    parser.add_argument("--porta", type=int, default=8000)
+    parser.add_argument("--processos", type=int, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.porta, args.processos))
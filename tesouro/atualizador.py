@@ -0,0 +1,110 @@
+"""
+Processo atualizador dos dados de mercado.
+
+Busca catálogo e VNAs nas fontes em intervalos regulares (com jitter, para
+vários atualizadores não baterem nas fontes no mesmo instante) e grava o
+MarketSnapshot no arquivo compartilhado (tesouro.compartilhado). Os
+processos do app e da API leem esse arquivo em vez de buscar por conta
+própria: as fontes recebem uma busca por intervalo, não uma por processo.
+
+Cada rodada vai às fontes de verdade (dados.sem_cache): o cache de buscas
+do processo duraria mais que o intervalo e republicaria o mesmo snapshot.
+A versão do snapshot só muda quando os dados mudam; se a busca trouxer os
+mesmos valores, o arquivo é regravado com a versão anterior (só a hora de
+criação avança) e os caches dos leitores continuam valendo.
+
+Uso:
+    python -m tesouro.atualizador --intervalo 120 --jitter 0.2
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from tesouro import compartilhado, dados, limitador, mercado
+
+INTERVALO_PADRAO = 120
+JITTER_PADRAO = 0.2
+
+
+def _mesmos_dados(a, b):
+    """True se dois snapshots têm o mesmo catálogo e os mesmos VNAs"""
+    if b is None or len(a.tipos) != len(b.tipos):
+        return False
+    escalares = ('data_referencia', 'vna_selic', 'data_vna_selic', 'vna_ipca', 'data_vna_ipca')
+    return (
+        all(getattr(a, nome) == getattr(b, nome) for nome in escalares)
+        and np.array_equal(a.tipos.astype(str), b.tipos.astype(str))
+        and np.array_equal(a.vencimentos, b.vencimentos)
+        and all(np.array_equal(getattr(a, nome), getattr(b, nome), equal_nan=True)
+                for nome in ('pu', 'taxa_compra', 'taxa_venda'))
+    )
+
+
+def atualizar(caminho=compartilhado.CAMINHO_SNAPSHOT, anterior=None):
+    """
+    Faz uma rodada: busca, compara com o anterior e grava
+
+    Returns:
+        MarketSnapshot: o snapshot gravado
+    """
+    # As buscas do atualizador são de lote: o app interativo passa na frente
+    with limitador.em_lote(), dados.sem_cache():
+        novo = mercado.montar_snapshot()
+    if _mesmos_dados(novo, anterior):
+        novo = mercado.MarketSnapshot(**{**novo.__dict__, 'versao': anterior.versao})
+    compartilhado.escrever_snapshot(novo, caminho)
+    return novo
+
+
+def proxima_espera(intervalo, jitter):
+    """Intervalo com variação aleatória de ±jitter (fração do intervalo)"""
+    return max(1.0, intervalo * (1 + random.uniform(-jitter, jitter)))
+
+
+def executar(intervalo=INTERVALO_PADRAO, jitter=JITTER_PADRAO,
+             caminho=compartilhado.CAMINHO_SNAPSHOT, rodadas=None):
+    """
+    Laço do atualizador
+
+    Args:
+        rodadas (int): para depois de tantas rodadas (None = para sempre)
+    """
+    try:
+        anterior = compartilhado.ler_snapshot(caminho)
+    except (OSError, ValueError):
+        anterior = None
+
+    rodada = 0
+    while rodadas is None or rodada < rodadas:
+        rodada += 1
+        inicio = time.perf_counter()
+        try:
+            novo = atualizar(caminho, anterior)
+            situacao = "sem mudança" if anterior and novo.versao == anterior.versao else "nova versão"
+            print(f"✅ Snapshot {novo.versao} gravado ({situacao}, "
+                  f"{time.perf_counter() - inicio:.1f} s)", flush=True)
+            anterior = novo
+        except Exception as e:
+            # O arquivo anterior continua valendo até a próxima rodada
+            print(f"⚠️  Falha ao atualizar snapshot: {e}", flush=True)
+
+        if rodadas is None or rodada < rodadas:
+            time.sleep(proxima_espera(intervalo, jitter))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Atualizador do snapshot de mercado compartilhado")
+    parser.add_argument("--intervalo", type=float, default=INTERVALO_PADRAO, help="segundos entre buscas")
+    parser.add_argument("--jitter", type=float, default=JITTER_PADRAO, help="variação do intervalo (fração)")
+    parser.add_argument("--caminho", default=str(compartilhado.CAMINHO_SNAPSHOT))
+    parser.add_argument("--uma-vez", action="store_true", help="faz uma rodada e sai")
+    args = parser.parse_args(argv)
+
+    print(f"🔄 Atualizador gravando em {args.caminho} a cada ~{args.intervalo:.0f} s")
+    executar(args.intervalo, args.jitter, args.caminho, rodadas=1 if args.uma_vez else None)
+
+
+if __name__ == "__main__":
+    main()
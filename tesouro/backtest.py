@@ -0,0 +1,339 @@
+"""
+Backtest de estratégias sobre o arquivo histórico de preços.
+
+Cada estratégia descreve como os aportes mensais são distribuídos entre os
+títulos. O motor processa todas as estratégias de uma vez: as quantidades
+compradas ficam numa matriz estratégias × aportes × títulos e o patrimônio
+diário sai de somas acumuladas, sem laços por dia ou por estratégia.
+
+Simplificações:
+    - aportes no primeiro dia útil de cada mês, ao PU de compra;
+    - posições avaliadas pelo PU de venda (PU base quando não houver);
+    - no vencimento o título é resgatado pelo último PU conhecido e o valor
+      fica parado em caixa;
+    - cupons dos títulos com juros semestrais não são modelados.
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice, product
+from pathlib import Path
+
+import numpy as np
+
+from tesouro.historico import CAMINHO_PADRAO, carregar_arquivo, indice_titulo
+from tesouro.tributos import calcular_liquido
+
+
+# ==================== ESTRATÉGIAS ====================
+
+def aporte_mensal(titulo, valor=1000.0, nome=None):
+    """
+    Aporta todo mês o mesmo valor em um único título
+
+    Args:
+        titulo (tuple): (tipo, vencimento), ex: ("Tesouro Prefixado", 2029)
+        valor (float): valor de cada aporte em R$
+    """
+    return {
+        'tipo': 'aporte_mensal',
+        'titulos': [titulo],
+        'valor': valor,
+        'nome': nome or f"Aporte mensal {titulo[0]} {titulo[1]}",
+    }
+
+
+def escada(titulos, valor=1000.0, nome=None):
+    """Divide cada aporte igualmente entre vários vencimentos"""
+    return {
+        'tipo': 'escada',
+        'titulos': list(titulos),
+        'valor': valor,
+        'nome': nome or "Escada " + ", ".join(str(t[1]) for t in titulos),
+    }
+
+
+def troca_pre_ipca(prefixado, ipca, limiar=5.0, valor=1000.0, nome=None):
+    """
+    Alterna os aportes entre um Prefixado e um IPCA+
+
+    O aporte vai para o Prefixado quando a inflação implícita (taxa do
+    Prefixado menos taxa real do IPCA+, em pontos percentuais) supera o
+    limiar; caso contrário vai para o IPCA+.
+    """
+    return {
+        'tipo': 'troca',
+        'titulos': [prefixado, ipca],
+        'valor': valor,
+        'limiar': limiar,
+        'nome': nome or f"Troca Pre/IPCA+ limiar {limiar:.2f}",
+    }
+
+
+def gerar_variantes(construtor, **grades):
+    """
+    Gera estratégias para todas as combinações de parâmetros
+
+    Exemplo:
+        gerar_variantes(troca_pre_ipca, prefixado=[pre], ipca=[ipca],
+                        limiar=np.arange(3, 8, 0.01), valor=[500, 1000])
+    """
+    nomes = list(grades)
+    for valores in product(*grades.values()):
+        yield construtor(**dict(zip(nomes, valores)))
+
+
+# ==================== MOTOR ====================
+
+def _preencher_adiante(matriz):
+    """Propaga o último valor válido de cada coluna para as linhas seguintes"""
+    validos = ~np.isnan(matriz)
+    indices = np.where(validos, np.arange(len(matriz))[:, None], 0)
+    np.maximum.accumulate(indices, axis=0, out=indices)
+    preenchida = np.take_along_axis(matriz, indices, axis=0)
+    # Antes da primeira cotação não há valor a propagar
+    preenchida[np.cumsum(validos, axis=0) == 0] = np.nan
+    return preenchida
+
+
+def _montar_pesos(estrategias, colunas_estrategias, taxa_compra_aporte):
+    """Matriz estratégias × aportes × colunas com a fração de cada aporte"""
+    n_aportes, n_colunas = taxa_compra_aporte.shape
+    pesos = np.zeros((len(estrategias), n_aportes, n_colunas))
+
+    for s, (estrategia, cols) in enumerate(zip(estrategias, colunas_estrategias)):
+
+        if estrategia['tipo'] in ('aporte_mensal', 'escada'):
+            pesos[s, :, cols] = 1.0 / len(cols)
+
+        elif estrategia['tipo'] == 'troca':
+            pre, ipca = cols
+            spread = taxa_compra_aporte[:, pre] - taxa_compra_aporte[:, ipca]
+            # Sem uma das taxas, vai para o título que estiver disponível
+            vai_pre = np.where(np.isnan(spread), np.isnan(taxa_compra_aporte[:, ipca]), spread > estrategia['limiar'])
+            pesos[s, :, pre] = vai_pre
+            pesos[s, :, ipca] = ~vai_pre
+
+        else:
+            raise ValueError(f"Tipo de estratégia desconhecido: {estrategia['tipo']}")
+
+    return pesos
+
+
+def executar_backtest(arquivo, estrategias, inicio=None, fim=None):
+    """
+    Executa várias estratégias de uma vez sobre o arquivo histórico
+
+    Args:
+        arquivo (dict): arquivo de tesouro.historico.carregar_arquivo
+        estrategias (list): estratégias criadas pelas funções deste módulo
+        inicio, fim: limites do período (date ou "AAAA-MM-DD"); padrão é
+                     o histórico inteiro
+
+    Returns:
+        dict: 'nomes', 'datas', e matrizes estratégias × dias com
+              'patrimonio', 'aportes', 'resgates' e 'impostos' (IR, IOF e
+              custódia), além dos vetores 'imposto_liquidacao' e
+              'patrimonio_liquido' (valor final supondo venda de tudo no
+              último dia)
+    """
+    estrategias = list(estrategias)
+
+    # Período e datas de aporte (primeiro dia útil de cada mês)
+    datas = arquivo['datas']
+    janela = np.ones(len(datas), dtype=bool)
+    if inicio is not None:
+        janela &= datas >= np.datetime64(inicio, 'D')
+    if fim is not None:
+        janela &= datas <= np.datetime64(fim, 'D')
+    dias = np.flatnonzero(janela)
+    if len(dias) == 0:
+        raise ValueError("Período sem cotações no arquivo histórico")
+
+    datas = datas[dias]
+    meses = datas.astype('datetime64[M]')
+    idx_aporte = np.flatnonzero(np.r_[True, meses[1:] != meses[:-1]])
+    n_dias, n_aportes = len(datas), len(idx_aporte)
+
+    # Resolve os títulos e separa só as colunas usadas por alguma estratégia
+    indices = {}
+    for estrategia in estrategias:
+        for titulo in estrategia['titulos']:
+            if titulo not in indices:
+                indices[titulo] = indice_titulo(arquivo, *titulo)
+                if indices[titulo] is None:
+                    raise ValueError(f"Título não encontrado no histórico: {titulo[0]} {titulo[1]}")
+
+    usadas = sorted(set(indices.values()))
+    colunas = {c: j for j, c in enumerate(usadas)}
+    colunas_estrategias = [[colunas[indices[t]] for t in e['titulos']] for e in estrategias]
+
+    pu_compra = arquivo['pu_compra'][np.ix_(dias, usadas)]
+    taxa_compra = arquivo['taxa_compra'][np.ix_(dias, usadas)]
+    pu_avaliacao = arquivo['pu_venda'][np.ix_(dias, usadas)]
+    pu_avaliacao = np.where(np.isnan(pu_avaliacao), arquivo['pu_base'][np.ix_(dias, usadas)], pu_avaliacao)
+    pu_avaliacao = _preencher_adiante(pu_avaliacao)
+
+    # Vencimento: primeiro dia da janela na data de vencimento ou depois
+    vencimentos = arquivo['vencimentos'][usadas]
+    dia_vencimento = np.searchsorted(datas, vencimentos)
+    for j, d in enumerate(dia_vencimento):
+        if 0 < d < n_dias:
+            pu_avaliacao[d:, j] = pu_avaliacao[d - 1, j]
+
+    # Quantidades compradas em cada aporte
+    valor = np.array([e['valor'] for e in estrategias], dtype=float)
+    pesos = _montar_pesos(estrategias, colunas_estrategias, taxa_compra[idx_aporte])
+    preco_aporte = pu_compra[idx_aporte]
+    compravel = (preco_aporte > 0) & (idx_aporte[:, None] < dia_vencimento[None, :])
+    pesos *= compravel[None]
+    unidades = valor[:, None, None] * pesos / np.where(compravel, preco_aporte, 1.0)[None]
+
+    # O que não pôde ser comprado fica em caixa
+    caixa_aporte = valor[:, None] * (1.0 - pesos.sum(axis=2))
+
+    aportes = np.zeros((len(estrategias), n_dias))
+    aportes[:, idx_aporte] = valor[:, None]
+    caixa = np.zeros_like(aportes)
+    caixa[:, idx_aporte] = caixa_aporte
+    resgates = np.zeros_like(aportes)
+    impostos = np.zeros_like(aportes)
+
+    # Posição acumulada por título no dia d = soma dos aportes até d
+    ultimo_aporte = np.searchsorted(idx_aporte, np.arange(n_dias), side='right')
+    acumulado = np.concatenate(
+        [np.zeros((len(estrategias), 1, len(usadas))), np.cumsum(unidades, axis=1)], axis=1
+    )
+
+    posicoes = np.zeros_like(aportes)
+    imposto_liquidacao = np.zeros(len(estrategias))
+    data_aporte = datas[idx_aporte]
+    for j in range(len(usadas)):
+        if not unidades[:, :, j].any():
+            continue
+        posicoes += acumulado[:, ultimo_aporte, j] * np.nan_to_num(pu_avaliacao[:, j])
+
+        # IR, IOF e custódia por lote: no vencimento, ou na venda
+        # hipotética do último dia
+        venceu = dia_vencimento[j] < n_dias
+        d_saida = dia_vencimento[j] if venceu else n_dias - 1
+        pu_saida = pu_avaliacao[d_saida, j]
+        lotes = calcular_liquido(
+            unidades[:, :, j],
+            np.where(compravel[:, j], preco_aporte[:, j], pu_saida)[None],
+            pu_saida,
+            data_aporte[None],
+            datas[d_saida],
+        )
+        imposto = (lotes['bruto'] - lotes['liquido']).sum(axis=1)
+
+        if venceu:
+            resgates[:, d_saida] += unidades[:, :, j].sum(axis=1) * pu_saida
+            impostos[:, d_saida] += imposto
+        else:
+            imposto_liquidacao += imposto
+
+    patrimonio = np.cumsum(caixa, axis=1) + posicoes - np.cumsum(impostos, axis=1)
+
+    return {
+        'nomes': [e['nome'] for e in estrategias],
+        'datas': datas,
+        'patrimonio': patrimonio,
+        'aportes': aportes,
+        'resgates': resgates,
+        'impostos': impostos,
+        'imposto_liquidacao': imposto_liquidacao,
+        'patrimonio_liquido': patrimonio[:, -1] - imposto_liquidacao,
+    }
+
+
+def resumir(resultado, curvas=False):
+    """
+    Resume o resultado do backtest em um dicionário por estratégia
+
+    Args:
+        resultado (dict): saída de executar_backtest
+        curvas (bool): Se True, inclui a curva de patrimônio diária
+    """
+    patrimonio = resultado['patrimonio']
+    total_aportado = resultado['aportes'].sum(axis=1)
+    impostos_pagos = resultado['impostos'].sum(axis=1) + resultado['imposto_liquidacao']
+
+    # Maior queda em relação ao pico, descontando os aportes do período
+    liquido_aportes = patrimonio - np.cumsum(resultado['aportes'], axis=1)
+    pico = np.maximum.accumulate(liquido_aportes, axis=1)
+    queda_maxima = (pico - liquido_aportes).max(axis=1)
+
+    resumos = []
+    for s, nome in enumerate(resultado['nomes']):
+        resumo = {
+            'nome': nome,
+            'total_aportado': float(total_aportado[s]),
+            'patrimonio_final': float(patrimonio[s, -1]),
+            'impostos': float(impostos_pagos[s]),
+            'patrimonio_liquido': float(resultado['patrimonio_liquido'][s]),
+            'rentabilidade': float(resultado['patrimonio_liquido'][s] / total_aportado[s] - 1),
+            'queda_maxima': float(queda_maxima[s]),
+        }
+        if curvas:
+            resumo['curva'] = patrimonio[s]
+        resumos.append(resumo)
+
+    return resumos
+
+
+# ==================== VARREDURA EM PARALELO ====================
+
+_arquivo_processo = None
+
+
+def _iniciar_processo(caminho):
+    """Carrega o arquivo histórico uma única vez em cada processo"""
+    global _arquivo_processo
+    _arquivo_processo = carregar_arquivo(caminho)
+
+
+def _executar_lote(estrategias, inicio, fim, curvas):
+    resultado = executar_backtest(_arquivo_processo, estrategias, inicio, fim)
+    return resumir(resultado, curvas)
+
+
+def varrer_estrategias(estrategias, inicio=None, fim=None, caminho=CAMINHO_PADRAO,
+                       tamanho_lote=256, processos=None, curvas=False):
+    """
+    Executa um grande número de estratégias em paralelo, entregando os
+    resultados conforme ficam prontos
+
+    As estratégias são consumidas sob demanda (pode ser um gerador) e no
+    máximo 2 lotes por processo ficam em andamento, então a memória não
+    cresce com o tamanho da varredura.
+
+    Args:
+        estrategias: iterável de estratégias (ex: gerar_variantes(...))
+        caminho: arquivo histórico que cada processo carrega
+        tamanho_lote (int): estratégias executadas juntas por processo
+        processos (int): número de processos (padrão: todos os núcleos)
+        curvas (bool): inclui a curva de patrimônio em cada resumo
+
+    Yields:
+        dict: resumo de cada estratégia (ordem de conclusão, não de entrada)
+    """
+    if not Path(caminho).exists():
+        carregar_arquivo(caminho)
+
+    processos = processos or os.cpu_count() or 1
+    estrategias = iter(estrategias)
+
+    with ProcessPoolExecutor(processos, initializer=_iniciar_processo, initargs=(str(caminho),)) as executor:
+        pendentes = set()
+        while True:
+            lote = list(islice(estrategias, tamanho_lote))
+            if lote:
+                pendentes.add(executor.submit(_executar_lote, lote, inicio, fim, curvas))
+            if not pendentes:
+                break
+            if lote and len(pendentes) < 2 * processos:
+                continue
+
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                yield from futuro.result()
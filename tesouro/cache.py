@@ -0,0 +1,110 @@
+"""
+Cache LRU de resultados de precificação.
+
+A chave de cada resultado inclui a versão do snapshot de mercado e a data
+de referência: quando chega um snapshot novo (ou vira o dia), as entradas
+antigas deixam de valer e o cache é esvaziado automaticamente.
+
+Os caches ficam registrados neste módulo, e não em quem os usa, porque o
+Streamlit reexecuta o script do app a cada interação; um módulo importado
+sobrevive às reexecuções.
+"""
+import functools
+import threading
+from collections import OrderedDict
+from datetime import date
+
+
+class CacheLRU:
+    """Dicionário limitado que descarta o item usado há mais tempo"""
+
+    def __init__(self, capacidade=256):
+        self.capacidade = capacidade
+        self.versao = None
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()
+        self._trava = threading.Lock()
+
+    def __len__(self):
+        return len(self._itens)
+
+    def obter(self, chave, padrao=None):
+        with self._trava:
+            if chave in self._itens:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return self._itens[chave]
+            self.falhas += 1
+            return padrao
+
+    def guardar(self, chave, valor):
+        with self._trava:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+
+    def validar_versao(self, versao):
+        """Esvazia o cache se a versão dos dados mudou"""
+        if versao != self.versao:
+            with self._trava:
+                if versao != self.versao:
+                    self._itens.clear()
+                    self.versao = versao
+
+    def estatisticas(self):
+        consultas = self.acertos + self.falhas
+        return {
+            'tamanho': len(self._itens),
+            'capacidade': self.capacidade,
+            'acertos': self.acertos,
+            'falhas': self.falhas,
+            'taxa_acerto': self.acertos / consultas if consultas else 0.0,
+        }
+
+
+_caches = {}
+_trava_registro = threading.Lock()
+
+
+def obter_cache(nome, capacidade=256):
+    """Cache com esse nome, criado na primeira chamada"""
+    with _trava_registro:
+        if nome not in _caches:
+            _caches[nome] = CacheLRU(capacidade)
+        return _caches[nome]
+
+
+def memorizar(cache, versao):
+    """
+    Decorador que guarda o resultado da função no cache
+
+    A chave é (nome da função, argumentos, data de hoje); `versao` é uma
+    função chamada a cada uso que devolve a versão atual dos dados de
+    mercado. Resultados None (falhas) não são guardados.
+
+    Exemplo:
+        @memorizar(obter_cache('calculadoras'), lambda: obter_snapshot().versao)
+        def calculadora_prefixado_streamlit(ano, taxa_anual): ...
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            cache.validar_versao(versao())
+            chave = (funcao.__qualname__, args, tuple(sorted(kwargs.items())), date.today())
+
+            resultado = cache.obter(chave)
+            if resultado is None:
+                resultado = funcao(*args, **kwargs)
+                if resultado is not None:
+                    cache.guardar(chave, resultado)
+            return resultado
+
+        return envolvida
+
+    return decorador
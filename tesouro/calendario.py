@@ -0,0 +1,109 @@
+"""
+Calendário de dias úteis usado na precificação.
+
+O padrão do projeto é a aproximação du = dias corridos × 252/365 (a mesma
+da calculadora). A contagem exata, com fins de semana e feriados nacionais
+(calendário da ANBIMA), fica disponível em dias_uteis_exatos.
+"""
+import functools
+from datetime import date, datetime
+
+import numpy as np
+
+# Anos cobertos pela tabela de feriados
+ANO_INICIAL = 2000
+ANO_FINAL = 2099
+
+# (mês, dia) dos feriados nacionais de data fixa
+FERIADOS_FIXOS = [(1, 1), (4, 21), (5, 1), (9, 7), (10, 12), (11, 2), (11, 15), (12, 25)]
+
+# Dia da Consciência Negra é feriado nacional a partir de 2024
+ANO_CONSCIENCIA_NEGRA = 2024
+
+
+def pascoa(ano):
+    """Domingo de Páscoa (algoritmo de Meeus/Jones/Butcher)"""
+    a = ano % 19
+    b, c = divmod(ano, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes, dia = divmod(h + l - 7 * m + 114, 31)
+    return date(ano, mes, dia + 1)
+
+
+def feriados_nacionais(ano):
+    """Feriados nacionais de um ano, incluindo Carnaval e Corpus Christi"""
+    domingo_pascoa = np.datetime64(pascoa(ano), 'D')
+    moveis = [domingo_pascoa + d for d in (-48, -47, -2, 60)]
+    fixos = [np.datetime64(date(ano, mes, dia), 'D') for mes, dia in FERIADOS_FIXOS]
+    if ano >= ANO_CONSCIENCIA_NEGRA:
+        fixos.append(np.datetime64(date(ano, 11, 20), 'D'))
+    return sorted(fixos + moveis)
+
+
+@functools.lru_cache(maxsize=1)
+def feriados():
+    """Todos os feriados de ANO_INICIAL a ANO_FINAL (datetime64[D])"""
+    datas = [d for ano in range(ANO_INICIAL, ANO_FINAL + 1) for d in feriados_nacionais(ano)]
+    return np.array(datas, dtype='datetime64[D]')
+
+
+@functools.lru_cache(maxsize=1)
+def _calendario_util():
+    return np.busdaycalendar(holidays=feriados())
+
+
+def _dias(datas):
+    if isinstance(datas, datetime):
+        datas = datas.date()
+    return np.asarray(datas, dtype='datetime64[D]')
+
+
+def dias_uteis(data_atual, data_vencimento):
+    """
+    Dias úteis entre duas datas (aproximação usando 252 dias úteis/ano)
+
+    Aceita datas ou arrays de datas.
+
+    Returns:
+        tuple: (dias_uteis, dias_corridos) como arrays de inteiros
+    """
+    dias_corridos = (_dias(data_vencimento) - _dias(data_atual)).astype(np.int64)
+    du = np.trunc(dias_corridos * (252 / 365)).astype(np.int64)
+    return du, dias_corridos
+
+
+def dias_uteis_exatos(data_atual, data_vencimento):
+    """
+    Dias úteis de data_atual (inclusive) a data_vencimento (exclusive),
+    descontando fins de semana e feriados nacionais
+
+    Returns:
+        tuple: (dias_uteis, dias_corridos) como arrays de inteiros
+    """
+    inicio, fim = np.broadcast_arrays(_dias(data_atual), _dias(data_vencimento))
+    dias_corridos = (fim - inicio).astype(np.int64)
+    du = np.busday_count(inicio, fim, busdaycal=_calendario_util()).astype(np.int64)
+    return du, dias_corridos
+
+
+def calcular_dias_uteis(data_atual, data_vencimento, exato=False):
+    """
+    Versão para uma única data, com a assinatura usada pelas calculadoras
+
+    Returns:
+        tuple: (dias_uteis, dias_corridos) como int
+    """
+    funcao = dias_uteis_exatos if exato else dias_uteis
+    du, dias_corridos = funcao(data_atual, data_vencimento)
+    return int(du), int(dias_corridos)
+
+
+def e_dia_util(datas):
+    """True para as datas que não são fim de semana nem feriado"""
+    return np.is_busday(_dias(datas), busdaycal=_calendario_util())
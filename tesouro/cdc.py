@@ -0,0 +1,268 @@
+"""
+Captura de mudanças (CDC) entre snapshots de mercado consecutivos.
+
+Dois snapshots seguidos costumam diferir em poucos campos (PU e taxas de
+alguns títulos, às vezes um VNA), mas cada um ganha uma versão nova e quem
+guarda resultados pela versão refaz tudo. Aqui cada snapshot novo é
+comparado com o anterior e vira um Delta com só o que mudou:
+
+    - títulos alterados, com os campos (pu, taxa_compra, taxa_venda) antes
+      e depois;
+    - títulos novos e removidos;
+    - VNAs e data de referência alterados.
+
+O mercado (tesouro.mercado) registra aqui cada snapshot que passa a usar.
+Quem depende dos dados pode:
+
+    - assinar() o feed e receber cada Delta;
+    - pedir delta_desde(versão) para saber o que mudou desde a versão com
+      que calculou (None: histórico insuficiente, refazer tudo);
+    - guardar resultados pela versao_de(componente), que só muda quando o
+      componente muda ('vna_selic', 'vna_ipca', 'data_referencia', um
+      produto como 'prefixado', ou um título (tipo, vencimento)).
+"""
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# Campos de cada título comparados entre snapshots
+CAMPOS = ('pu', 'taxa_compra', 'taxa_venda')
+
+# Campos do snapshot inteiro (não de um título)
+CAMPOS_GERAIS = ('vna_selic', 'vna_ipca', 'data_referencia')
+
+# Deltas guardados para delta_desde()
+HISTORICO = 64
+
+
+@dataclass(frozen=True)
+class Delta:
+    versao_anterior: int        # None no primeiro snapshot
+    versao: int
+    alterados: dict = field(default_factory=dict)   # (tipo, vencimento) -> {campo: (antes, depois)}
+    novos: tuple = ()
+    removidos: tuple = ()
+    gerais: dict = field(default_factory=dict)      # campo geral -> (antes, depois)
+    reordenado: bool = False    # mesmos títulos, outra ordem no catálogo
+
+    @property
+    def completo(self):
+        """True quando não há como aproveitar nada (primeiro snapshot)"""
+        return self.versao_anterior is None
+
+    @property
+    def estrutural(self):
+        """True se o catálogo mudou de forma (títulos entraram, saíram ou trocaram de ordem)"""
+        return self.completo or bool(self.novos or self.removidos) or self.reordenado
+
+    def vazio(self):
+        return not (self.alterados or self.gerais or self.estrutural)
+
+    def compacto(self):
+        """Dicionário pronto para JSON, só com os valores novos"""
+        return {
+            'de': self.versao_anterior,
+            'para': self.versao,
+            'alterados': [
+                {'titulo': tipo, 'vencimento': vencimento,
+                 **{campo: _json(depois) for campo, (_, depois) in campos.items()}}
+                for (tipo, vencimento), campos in self.alterados.items()
+            ],
+            'novos': [{'titulo': tipo, 'vencimento': vencimento} for tipo, vencimento in self.novos],
+            'removidos': [{'titulo': tipo, 'vencimento': vencimento} for tipo, vencimento in self.removidos],
+            'gerais': {campo: _json(depois) for campo, (_, depois) in self.gerais.items()},
+            'reordenado': self.reordenado,
+        }
+
+
+def _json(valor):
+    if isinstance(valor, float) and np.isnan(valor):
+        return None
+    return valor if isinstance(valor, (int, float, str)) or valor is None else str(valor)
+
+
+def _chaves(snapshot):
+    return list(zip(snapshot.tipos.tolist(), snapshot.vencimentos.astype(str).tolist()))
+
+
+def _mudou(antes, depois):
+    """Máscara dos valores diferentes (NaN igual a NaN)"""
+    return ~((antes == depois) | (np.isnan(antes) & np.isnan(depois)))
+
+
+def diferenca(anterior, novo):
+    """
+    Delta de `anterior` para `novo` (anterior None: tudo é novo)
+
+    Returns:
+        Delta
+    """
+    chaves_novo = _chaves(novo)
+    if anterior is None:
+        return Delta(None, novo.versao, novos=tuple(chaves_novo))
+
+    gerais = {}
+    if anterior.vna_selic != novo.vna_selic or anterior.data_vna_selic != novo.data_vna_selic:
+        gerais['vna_selic'] = (anterior.vna_selic, novo.vna_selic)
+    if anterior.vna_ipca != novo.vna_ipca or anterior.data_vna_ipca != novo.data_vna_ipca:
+        gerais['vna_ipca'] = (anterior.vna_ipca, novo.vna_ipca)
+    if anterior.data_referencia != novo.data_referencia:
+        gerais['data_referencia'] = (str(anterior.data_referencia), str(novo.data_referencia))
+
+    mesmo_catalogo = (np.array_equal(anterior.tipos, novo.tipos)
+                      and np.array_equal(anterior.vencimentos, novo.vencimentos))
+    if mesmo_catalogo:
+        # Caso comum: mesmas linhas na mesma ordem, compara coluna a coluna
+        posicoes_novo = np.arange(len(chaves_novo))
+        posicoes_anterior = posicoes_novo
+        novos = removidos = ()
+        reordenado = False
+    else:
+        indice_anterior = {chave: i for i, chave in enumerate(_chaves(anterior))}
+        pares = [(indice_anterior.get(chave), i) for i, chave in enumerate(chaves_novo)]
+        novos = tuple(chaves_novo[i] for j, i in pares if j is None)
+        presentes = set(chaves_novo)
+        removidos = tuple(chave for chave in indice_anterior if chave not in presentes)
+        pares = [(j, i) for j, i in pares if j is not None]
+        posicoes_anterior = np.array([j for j, _ in pares], dtype=np.int64)
+        posicoes_novo = np.array([i for _, i in pares], dtype=np.int64)
+        reordenado = not novos and not removidos
+
+    alterados = {}
+    for campo in CAMPOS:
+        antes = getattr(anterior, campo)[posicoes_anterior]
+        depois = getattr(novo, campo)[posicoes_novo]
+        for k in np.flatnonzero(_mudou(antes, depois)):
+            chave = chaves_novo[posicoes_novo[k]]
+            alterados.setdefault(chave, {})[campo] = (float(antes[k]), float(depois[k]))
+
+    return Delta(anterior.versao, novo.versao, alterados, novos, removidos, gerais, reordenado)
+
+
+def combinar(deltas):
+    """Um Delta equivalente a aplicar `deltas` em sequência"""
+    primeiro, ultimo = deltas[0], deltas[-1]
+    alterados, gerais = {}, {}
+    novos, removidos = {}, {}
+    for delta in deltas:
+        for chave, campos in delta.alterados.items():
+            destino = alterados.setdefault(chave, {})
+            for campo, (antes, depois) in campos.items():
+                destino[campo] = (destino.get(campo, (antes,))[0], depois)
+        for campo, (antes, depois) in delta.gerais.items():
+            gerais[campo] = (gerais.get(campo, (antes,))[0], depois)
+        novos.update(dict.fromkeys(delta.novos))
+        removidos.update(dict.fromkeys(delta.removidos))
+    return Delta(primeiro.versao_anterior, ultimo.versao, alterados, tuple(novos), tuple(removidos),
+                 gerais, any(delta.reordenado for delta in deltas))
+
+
+# ==================== FEED DO PROCESSO ====================
+
+_ultimo = None
+_historico = deque(maxlen=HISTORICO)
+_versoes = {}           # componente -> versão do snapshot em que mudou pela última vez
+_assinantes = []
+_trava = threading.Lock()
+
+
+def _componentes(snapshot, delta):
+    """Componentes tocados pelo delta: campos gerais, títulos e seus produtos"""
+    from tesouro.mercado import produtos
+
+    tocados = set(delta.gerais)
+    # O VNA entra no preço de todos os títulos do produto
+    if 'vna_selic' in delta.gerais:
+        tocados.add('selic')
+    if 'vna_ipca' in delta.gerais:
+        tocados.add('ipca')
+    titulos = set(delta.alterados) | set(delta.novos) | set(delta.removidos)
+    tocados |= titulos
+    if titulos:
+        por_chave = dict(zip(_chaves(snapshot), produtos(snapshot).tolist()))
+        tocados |= {por_chave.get(chave, '') for chave in titulos}
+    if delta.estrutural:
+        tocados |= {'catalogo', 'prefixado', 'selic', 'ipca', ''}
+    return tocados
+
+
+def registrar(snapshot):
+    """
+    Registra o snapshot que o processo passou a usar e avisa os assinantes
+
+    Returns:
+        Delta: o que mudou desde o snapshot registrado antes (None se for o mesmo)
+    """
+    global _ultimo
+    with _trava:
+        if _ultimo is not None and snapshot.versao == _ultimo.versao:
+            return None
+        delta = diferenca(_ultimo, snapshot)
+        _ultimo = snapshot
+        _historico.append(delta)
+        if delta.completo:
+            _versoes.clear()
+            _versoes['*'] = snapshot.versao
+        for componente in _componentes(snapshot, delta):
+            _versoes[componente] = snapshot.versao
+        assinantes = list(_assinantes)
+
+    for assinante in assinantes:
+        try:
+            assinante(delta)
+        except Exception as e:
+            print(f"⚠️  Assinante do CDC falhou: {e}")
+    return delta
+
+
+def assinar(funcao):
+    """Chama funcao(delta) a cada snapshot novo; devolve a própria função (serve de decorador)"""
+    with _trava:
+        _assinantes.append(funcao)
+    return funcao
+
+
+def cancelar(funcao):
+    with _trava:
+        if funcao in _assinantes:
+            _assinantes.remove(funcao)
+
+
+def versao_atual():
+    """Versão do último snapshot registrado (None se nenhum)"""
+    return _ultimo.versao if _ultimo is not None else None
+
+
+def versao_de(componente):
+    """
+    Versão do snapshot em que o componente mudou pela última vez
+
+    Componentes: 'vna_selic', 'vna_ipca', 'data_referencia', 'catalogo',
+    um produto ('prefixado', 'selic', 'ipca') ou um título (tipo, vencimento
+    'AAAA-MM-DD'). Enquanto o componente não muda, a versão se mantém, e
+    resultados guardados com ela continuam valendo.
+    """
+    with _trava:
+        return _versoes.get(componente, _versoes.get('*'))
+
+
+def delta_desde(versao):
+    """
+    O que mudou da `versao` até o snapshot atual
+
+    Returns:
+        Delta (vazio se já está na atual), ou None se a versão é antiga
+        demais para o histórico (ou desconhecida): refazer tudo
+    """
+    with _trava:
+        if _ultimo is None:
+            return None
+        if versao == _ultimo.versao:
+            return Delta(versao, versao)
+        deltas = list(_historico)
+    for inicio, delta in enumerate(deltas):
+        if delta.versao_anterior == versao:
+            return combinar(deltas[inicio:])
+    return None
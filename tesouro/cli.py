@@ -0,0 +1,160 @@
+"""
+Precificação em lote pela linha de comando.
+
+Lê pedidos em CSV ou JSONL (arquivo ou stdin), precifica em blocos de
+tamanho fixo com os precificadores vetorizados e escreve cada bloco assim
+que fica pronto, então a memória não depende do tamanho da entrada.
+
+Colunas/campos dos pedidos: produto, ano, taxa, selic, ipca_mensal, data
+(veja tesouro.precificacao.precificar_lote).
+
+Uso:
+    python -m tesouro.cli pedidos.csv > precos.csv
+    cat pedidos.jsonl | python -m tesouro.cli --formato jsonl > precos.jsonl
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+from itertools import islice
+
+from tesouro import mercado
+from tesouro.precificacao import linhas_de_resultado, pedidos_de_linhas, precificar_lote
+
+CAMPOS_PEDIDO = ('produto', 'ano', 'taxa', 'selic', 'ipca_mensal', 'data')
+CAMPOS_RESULTADO = ('vencimento', 'dias_uteis', 'dias_corridos', 'vna_projetado', 'cotacao', 'preco', 'erro')
+TAMANHO_BLOCO = 10000
+
+
+class _LinhaInvalida(dict):
+    """Linha da entrada que nem chegou a ser um pedido (ex: JSON quebrado)"""
+
+    def __init__(self, numero, erro):
+        super().__init__(linha=numero)
+        self.erro = erro
+
+
+def ler_pedidos(entrada, formato):
+    """
+    Gera um dict por pedido, lendo a entrada linha a linha
+
+    Linha JSONL malformada não interrompe o fluxo: vira um pedido com o
+    erro, que sai na resposta como os demais pedidos inválidos.
+    """
+    if formato == 'csv':
+        yield from csv.DictReader(entrada)
+    else:
+        for numero, linha in enumerate(entrada, start=1):
+            if linha.strip():
+                try:
+                    yield json.loads(linha)
+                except json.JSONDecodeError as e:
+                    yield _LinhaInvalida(numero, f"JSON inválido na linha {numero}: {e.msg}")
+
+
+def em_blocos(pedidos, tamanho):
+    """Agrupa o gerador de pedidos em listas de até `tamanho` itens"""
+    while True:
+        bloco = list(islice(pedidos, tamanho))
+        if not bloco:
+            return
+        yield bloco
+
+
+def campos_de_entrada(bloco):
+    """
+    Colunas dos pedidos do bloco, na ordem em que aparecem; linhas que não
+    viraram pedido (JSON quebrado ou que não é objeto) não contam. Sem
+    nenhum pedido válido, ficam as colunas documentadas (CAMPOS_PEDIDO).
+    """
+    campos = {}
+    for linha in bloco:
+        if isinstance(linha, dict) and not isinstance(linha, _LinhaInvalida):
+            campos.update(dict.fromkeys(linha))
+    return list(campos) or list(CAMPOS_PEDIDO)
+
+
+class _EscritorCSV:
+    def __init__(self, saida, campos_entrada):
+        campos = [c for c in campos_entrada if c not in CAMPOS_RESULTADO] + list(CAMPOS_RESULTADO)
+        self.escritor = csv.DictWriter(saida, campos, extrasaction='ignore')
+        self.escritor.writeheader()
+
+    def escrever(self, linhas):
+        self.escritor.writerows(linhas)
+
+
+class _EscritorJSONL:
+    def __init__(self, saida, campos_entrada=None):
+        self.saida = saida
+
+    def escrever(self, linhas):
+        self.saida.writelines(json.dumps(linha, ensure_ascii=False) + "\n" for linha in linhas)
+
+
+def precificar_fluxo(entrada, saida, formato='csv', formato_saida=None,
+                     tamanho_bloco=TAMANHO_BLOCO, snapshot=None):
+    """
+    Precifica todos os pedidos da entrada e escreve na saída
+
+    Returns:
+        tuple: (pedidos processados, segundos)
+    """
+    snapshot = snapshot or mercado.obter_snapshot()
+    formato_saida = formato_saida or formato
+    classe_escritor = _EscritorCSV if formato_saida == 'csv' else _EscritorJSONL
+    escritor = None
+
+    inicio = time.perf_counter()
+    total = 0
+    for bloco in em_blocos(ler_pedidos(entrada, formato), tamanho_bloco):
+        # O cabeçalho do CSV sai das colunas dos pedidos, não da primeira
+        # linha da saída (que pode ser um erro sem as colunas da entrada)
+        if escritor is None:
+            escritor = classe_escritor(saida, campos_de_entrada(bloco))
+        pedidos = pedidos_de_linhas(bloco)
+        for i, linha in enumerate(bloco):
+            if isinstance(linha, _LinhaInvalida):
+                pedidos['erro'][i] = linha.erro
+        resultado = precificar_lote(snapshot, pedidos)
+        escritor.escrever(linhas_de_resultado(bloco, resultado))
+        saida.flush()
+        total += len(bloco)
+
+    return total, time.perf_counter() - inicio
+
+
+def _detectar_formato(caminho):
+    if caminho and caminho.lower().endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    return 'csv'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Precificação em lote de títulos do Tesouro Direto")
+    parser.add_argument("entrada", nargs="?", help="arquivo CSV/JSONL (padrão: stdin)")
+    parser.add_argument("-o", "--saida", help="arquivo de saída (padrão: stdout)")
+    parser.add_argument("--formato", choices=("csv", "jsonl"), help="formato da entrada")
+    parser.add_argument("--formato-saida", choices=("csv", "jsonl"), help="padrão: o mesmo da entrada")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO, help="pedidos por bloco vetorizado")
+    args = parser.parse_args(argv)
+
+    formato = args.formato or _detectar_formato(args.entrada)
+    entrada = open(args.entrada, newline='', encoding='utf-8') if args.entrada else sys.stdin
+    saida = open(args.saida, 'w', newline='', encoding='utf-8') if args.saida else sys.stdout
+
+    try:
+        total, segundos = precificar_fluxo(entrada, saida, formato, args.formato_saida, args.bloco)
+    finally:
+        if args.entrada:
+            entrada.close()
+        if args.saida:
+            saida.close()
+
+    taxa = total / segundos if segundos > 0 else float('inf')
+    print(f"✅ {total:,} pedidos em {segundos:.2f} s ({taxa:,.0f} pedidos/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Coalescência de buscas simultâneas (single-flight).
+
+Quando vários chamadores pedem o mesmo recurso ao mesmo tempo (ex: muitas
+sessões abrindo o app na abertura do dia), só o primeiro vai à fonte; os
+outros esperam essa mesma busca e recebem o mesmo resultado, ou a mesma
+exceção. Funciona entre threads e entre tarefas asyncio.
+"""
+import asyncio
+import functools
+import threading
+
+
+class _Voo:
+    """Uma busca em andamento"""
+
+    def __init__(self):
+        self.pronto = threading.Event()
+        self.resultado = None
+        self.erro = None
+        self.esperando = 0
+
+
+class VooUnico:
+    """Grupo de buscas coalescidas por chave"""
+
+    def __init__(self):
+        self._voos = {}
+        self._voos_async = {}
+        self._trava = threading.Lock()
+        self.coalescidas = 0
+
+    def executar(self, chave, funcao, *args, **kwargs):
+        """
+        Executa funcao(*args, **kwargs), a menos que já haja uma execução
+        com a mesma chave em andamento; nesse caso espera por ela
+        """
+        with self._trava:
+            voo = self._voos.get(chave)
+            lider = voo is None
+            if lider:
+                voo = self._voos[chave] = _Voo()
+            else:
+                voo.esperando += 1
+                self.coalescidas += 1
+
+        if not lider:
+            voo.pronto.wait()
+            if voo.erro is not None:
+                raise voo.erro
+            return voo.resultado
+
+        try:
+            voo.resultado = funcao(*args, **kwargs)
+            return voo.resultado
+        except BaseException as e:
+            voo.erro = e
+            raise
+        finally:
+            with self._trava:
+                del self._voos[chave]
+            voo.pronto.set()
+
+    async def executar_async(self, chave, funcao, *args):
+        """
+        Versão para asyncio: a função (bloqueante) roda no executor padrão
+        e as tarefas que pedirem a mesma chave aguardam o mesmo futuro, sem
+        ocupar uma thread cada. Também coalesce com chamadas de threads.
+        """
+        loop = asyncio.get_running_loop()
+        chave_loop = (id(loop), chave)
+        futuro = self._voos_async.get(chave_loop)
+        if futuro is None:
+            futuro = loop.run_in_executor(None, functools.partial(self.executar, chave, funcao, *args))
+            self._voos_async[chave_loop] = futuro
+            futuro.add_done_callback(lambda _: self._voos_async.pop(chave_loop, None))
+        else:
+            self.coalescidas += 1
+        return await asyncio.shield(futuro)
+
+    def em_andamento(self):
+        """Chaves com busca em andamento"""
+        with self._trava:
+            return list(self._voos)
+
+
+# Grupo usado pelas buscas nas fontes (tesouro.dados) e pelo snapshot
+voos = VooUnico()
+
+
+def coalescer(funcao):
+    """
+    Decorador: chamadas simultâneas com os mesmos argumentos compartilham
+    uma única execução
+    """
+    @functools.wraps(funcao)
+    def envolvida(*args):
+        return voos.executar((funcao.__qualname__, args), funcao, *args)
+
+    return envolvida
@@ -0,0 +1,162 @@
+"""
+MarketSnapshot gravado em arquivo mapeado em memória.
+
+O atualizador (tesouro.atualizador) grava cada snapshot novo neste arquivo;
+os processos do app e da API o leem com mmap, sem copiar os arrays: todos
+os processos da máquina compartilham as mesmas páginas de memória.
+
+Formato do arquivo:
+    MAGICO (8 bytes) | tamanho do cabeçalho (uint32) | cabeçalho JSON |
+    arrays alinhados em ALINHAMENTO bytes
+
+A gravação é atômica (arquivo temporário + os.replace): quem já mapeou a
+versão anterior continua lendo-a até pedir a nova.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+from tesouro.mercado import MarketSnapshot
+
+CAMINHO_SNAPSHOT = Path(
+    os.environ.get("TESOURO_SNAPSHOT")
+    or Path(os.environ.get("TESOURO_CACHE_DIR", Path.home() / ".cache" / "tesouro")) / "snapshot_mercado.bin"
+)
+
+MAGICO = b"TDSNAP01"
+ALINHAMENTO = 64
+
+ARRAYS = ('tipos', 'vencimentos', 'pu', 'taxa_compra', 'taxa_venda')
+ESCALARES = ('versao', 'vna_selic', 'data_vna_selic', 'vna_ipca', 'data_vna_ipca', 'criado_em', 'obsoletos')
+
+
+def _alinhar(posicao):
+    return -(-posicao // ALINHAMENTO) * ALINHAMENTO
+
+
+def escrever_snapshot(snapshot, caminho=CAMINHO_SNAPSHOT):
+    """Grava o snapshot no arquivo compartilhado, substituindo o anterior"""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+
+    arrays = {nome: np.ascontiguousarray(getattr(snapshot, nome)) for nome in ARRAYS}
+    arrays['tipos'] = arrays['tipos'].astype(str)
+
+    cabecalho = {nome: getattr(snapshot, nome) for nome in ESCALARES}
+    cabecalho['data_referencia'] = snapshot.data_referencia.isoformat()
+    cabecalho['arrays'] = {}
+
+    # Primeiro calcula os deslocamentos (dependem do tamanho do cabeçalho)
+    deslocamento = 0
+    for nome, array in arrays.items():
+        cabecalho['arrays'][nome] = [array.dtype.str, list(array.shape), deslocamento]
+        deslocamento = _alinhar(deslocamento + array.nbytes)
+    bruto = json.dumps(cabecalho).encode("utf-8")
+    inicio_dados = _alinhar(len(MAGICO) + 4 + len(bruto))
+
+    fd, temporario = tempfile.mkstemp(dir=caminho.parent, prefix=".snapshot_")
+    try:
+        with os.fdopen(fd, "wb") as arquivo:
+            arquivo.write(MAGICO + struct.pack("<I", len(bruto)) + bruto)
+            for nome, array in arrays.items():
+                arquivo.seek(inicio_dados + cabecalho['arrays'][nome][2])
+                arquivo.write(array.tobytes())
+            arquivo.flush()
+            os.fsync(arquivo.fileno())
+        os.replace(temporario, caminho)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+def ler_snapshot(caminho=CAMINHO_SNAPSHOT):
+    """
+    Lê o snapshot do arquivo compartilhado
+
+    Os arrays do snapshot devolvido são views (somente leitura) do mmap.
+    """
+    with open(caminho, "rb") as arquivo:
+        memoria = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if memoria[:len(MAGICO)] != MAGICO:
+        raise ValueError(f"{caminho} não é um snapshot de mercado")
+    tamanho = struct.unpack_from("<I", memoria, len(MAGICO))[0]
+    inicio = len(MAGICO) + 4
+    cabecalho = json.loads(memoria[inicio:inicio + tamanho])
+    inicio_dados = _alinhar(inicio + tamanho)
+
+    arrays = {}
+    for nome, (tipo, forma, deslocamento) in cabecalho.pop('arrays').items():
+        tipo = np.dtype(tipo)
+        quantidade = int(np.prod(forma))
+        if quantidade == 0:
+            arrays[nome] = np.empty(forma, dtype=tipo)
+            continue
+        arrays[nome] = np.frombuffer(
+            memoria, dtype=tipo, count=quantidade, offset=inicio_dados + deslocamento
+        ).reshape(forma)
+
+    return MarketSnapshot(
+        data_referencia=date.fromisoformat(cabecalho.pop('data_referencia')),
+        obsoletos=tuple(cabecalho.pop('obsoletos', ())),
+        **cabecalho,
+        **arrays,
+    )
+
+
+class LeitorSnapshot:
+    """
+    Lê o arquivo compartilhado só quando ele muda
+
+    Cada consulta custa um os.stat; o arquivo é mapeado de novo apenas
+    quando o atualizador grava uma versão nova.
+    """
+
+    def __init__(self, caminho=CAMINHO_SNAPSHOT):
+        self.caminho = Path(caminho)
+        self._assinatura = None
+        self._snapshot = None
+        self._trava = threading.Lock()
+
+    def obter(self):
+        """Snapshot atual do arquivo, ou None se ele não existir"""
+        try:
+            estado = os.stat(self.caminho)
+        except FileNotFoundError:
+            return None
+
+        assinatura = (estado.st_ino, estado.st_mtime_ns, estado.st_size)
+        if assinatura != self._assinatura:
+            with self._trava:
+                if assinatura != self._assinatura:
+                    self._snapshot = ler_snapshot(self.caminho)
+                    self._assinatura = assinatura
+        return self._snapshot
+
+
+_leitor = None
+
+
+def obter_compartilhado(max_idade=None):
+    """
+    Snapshot gravado pelo atualizador (None se não houver ou se for mais
+    velho que max_idade segundos)
+    """
+    global _leitor
+    if _leitor is None:
+        _leitor = LeitorSnapshot()
+    try:
+        snapshot = _leitor.obter()
+    except (OSError, ValueError):
+        return None
+    if snapshot is None or (max_idade is not None and snapshot.idade() > max_idade):
+        return None
+    return snapshot
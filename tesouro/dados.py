@@ -0,0 +1,301 @@
+"""
+Camada única de acesso aos dados de mercado (Tesouro Direto, BCB, ANBIMA e
+brasilindicadores).
+
+Todo acesso às fontes passa por aqui: as requisições HTTP usam uma única
+sessão (um pool de conexões por processo) e cada busca fica em cache por
+alguns minutos, então o app, a API, a CLI e os scripts que rodam no mesmo
+processo não repetem a mesma consulta. Buscas simultâneas do mesmo dado
+(cache vazio, vários usuários ao mesmo tempo) viram uma só requisição
+(tesouro.coalescencia), e cada fonte tem seu disjuntor (tesouro.disjuntor):
+fonte fora do ar é pulada na hora e o último valor em cache é servido.
+As requisições a cada host respeitam o limite de tesouro.limitador; a
+espera pelo token acontece antes do disjuntor (@limitado por fora de
+@protegido), para que o tempo na fila não conte como latência da fonte.
+
+As dependências pesadas (pandas, requests, tesouro_direto_br) são importadas
+dentro das funções, só quando um dado é de fato buscado.
+"""
+import contextvars
+import functools
+import io
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from tesouro import limitador, metricas
+from tesouro.coalescencia import coalescer
+from tesouro.disjuntor import protegido, restante
+
+URL_IPCA_SGS = "https://api.bcb.gov.br/dados/serie/bcdata.sgs.433/dados?formato=json"
+URL_VNA_SELIC = "https://brasilindicadores.com.br/titulos-publicos/vna"
+URL_VNA_ANBIMA = "https://www.anbima.com.br/informacoes/merc-sec-debentures/arqs/vna.txt"
+
+# Espelho das fontes (ex: o servidor de dados gravados dos benchmarks): com
+# TESOURO_ESPELHO=http://localhost:8765 todas as buscas, inclusive a do
+# catálogo, vão para ele em vez das fontes reais
+ESPELHO = os.environ.get("TESOURO_ESPELHO") or None
+if ESPELHO:
+    URL_IPCA_SGS = f"{ESPELHO}/bcb/ipca"
+    URL_VNA_SELIC = f"{ESPELHO}/brasilindicadores/vna"
+    URL_VNA_ANBIMA = f"{ESPELHO}/anbima/vna.txt"
+
+# Host das requisições feitas pela tesouro_direto_br
+HOST_TESOURO = "www.tesourodireto.com.br"
+
+TIMEOUT = 15
+
+# Tempo (s) que cada busca fica em cache
+TTL_PADRAO = 300
+
+# Conexões mantidas abertas por host no pool da sessão
+CONEXOES_POR_HOST = 10
+
+_sessao = None
+_trava_sessao = threading.Lock()
+
+
+def sessao():
+    """Sessão HTTP do processo, com pool de conexões reaproveitadas"""
+    global _sessao
+    if _sessao is None:
+        with _trava_sessao:
+            if _sessao is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                nova = requests.Session()
+                adaptador = HTTPAdapter(pool_connections=CONEXOES_POR_HOST, pool_maxsize=CONEXOES_POR_HOST)
+                nova.mount("https://", adaptador)
+                nova.mount("http://", adaptador)
+                _sessao = nova
+    return _sessao
+
+
+def limitado(url, requisicoes=1):
+    """
+    Decorador: gasta os tokens do host de `url` (tesouro.limitador) antes de
+    chamar a busca. Vai por fora de @protegido, para que a espera na fila
+    não conte na latência da fonte nem no orçamento do disjuntor.
+    """
+    host = urlparse(url).hostname
+
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            for _ in range(requisicoes):
+                limitador.adquirir(host)
+            return funcao(*args, **kwargs)
+
+        return envolvida
+
+    return decorador
+
+
+def obter(url, **kwargs):
+    """
+    GET pela sessão compartilhada; erros HTTP viram exceção
+
+    O token do host já foi gasto por @limitado na busca que chama.
+    """
+    tempo = restante()
+    kwargs.setdefault("timeout", TIMEOUT if tempo is None else max(0.1, min(TIMEOUT, tempo)))
+    resposta = sessao().get(url, **kwargs)
+    resposta.raise_for_status()
+    return resposta
+
+
+# ==================== CACHE DAS BUSCAS ====================
+
+_cache = {}
+_trava_cache = threading.Lock()
+_renovar = contextvars.ContextVar('renovar_buscas', default=False)
+
+
+@contextmanager
+def sem_cache():
+    """
+    Dentro do bloco as buscas vão às fontes mesmo com valor em cache (o
+    resultado novo é guardado, e o antigo ainda serve se a fonte falhar)
+    """
+    token = _renovar.set(True)
+    try:
+        yield
+    finally:
+        _renovar.reset(token)
+
+
+def em_cache(ttl=TTL_PADRAO):
+    """
+    Decorador que guarda o resultado de uma busca por `ttl` segundos
+
+    Falhas não são guardadas: a próxima chamada tenta a fonte de novo. Se a
+    fonte falhar (ou estiver com o disjuntor aberto) e houver um valor
+    anterior, ele é servido na hora e a busca fica marcada como obsoleta.
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args):
+            chave = (funcao.__name__, args)
+            item = _cache.get(chave)
+            if item is not None and time.monotonic() - item[0] < ttl and not _renovar.get():
+                metricas.registrar_cache('buscas', True)
+                return item[1]
+            metricas.registrar_cache('buscas', False)
+
+            try:
+                valor = funcao(*args)
+            except Exception:
+                if item is None:
+                    raise
+                marcar_obsoleto(funcao.__name__)
+                return item[1]
+
+            with _trava_cache:
+                _cache[chave] = (time.monotonic(), valor)
+            marcar_obsoleto(funcao.__name__, False)
+            return valor
+
+        return envolvida
+
+    return decorador
+
+
+def limpar_cache():
+    """Descarta todas as buscas guardadas"""
+    with _trava_cache:
+        _cache.clear()
+
+
+# Dados servidos de cache vencido porque a fonte falhou: nome -> desde quando
+_obsoletos = {}
+
+
+def marcar_obsoleto(nome, obsoleto=True):
+    """Marca (ou desmarca) um dado como servido de cache vencido"""
+    if obsoleto:
+        _obsoletos.setdefault(nome, time.time())
+    else:
+        _obsoletos.pop(nome, None)
+
+
+def obsoletos():
+    """Nomes dos dados servidos de cache vencido no momento"""
+    return sorted(_obsoletos)
+
+
+# ==================== FONTES ====================
+
+@em_cache()
+@coalescer
+@limitado(ESPELHO or f"https://{HOST_TESOURO}", requisicoes=1 if ESPELHO else 2)
+@protegido('tesouro')
+def buscar_catalogo():
+    """
+    Busca o catálogo atual de títulos (PU e taxas)
+
+    Returns:
+        DataFrame: índice (título, vencimento), colunas da tesouro_direto_br
+    """
+    if ESPELHO:
+        return _catalogo_do_espelho()
+
+    import tesouro_direto_br as td
+
+    # Duas requisições ao Tesouro Direto: os tokens de ambas vêm de @limitado
+    catalogo = td.busca_tesouro_direto()
+    try:
+        taxas = td.busca_tesouro_direto("taxa")
+        novas = [c for c in taxas.columns if c not in catalogo.columns]
+        catalogo = catalogo.join(taxas[novas])
+    except Exception:
+        pass
+    return catalogo
+
+
+def _catalogo_do_espelho():
+    """Catálogo servido pelo espelho (lista JSON de títulos), no formato da tesouro_direto_br"""
+    import pandas as pd
+
+    linhas = obter(f"{ESPELHO}/tesouro/catalogo").json()
+    indice = pd.MultiIndex.from_tuples(
+        [(linha["titulo"], pd.Timestamp(linha["vencimento"])) for linha in linhas],
+        names=["Tipo Titulo", "Vencimento"],
+    )
+    return pd.DataFrame({
+        "PU": [linha["pu"] for linha in linhas],
+        "Taxa Compra Manha": [linha["taxa_compra"] for linha in linhas],
+        "Taxa Venda Manha": [linha["taxa_venda"] for linha in linhas],
+    }, index=indice, dtype=float)
+
+
+@em_cache()
+@coalescer
+@limitado(URL_IPCA_SGS)
+@protegido('bcb')
+def buscar_serie_ipca():
+    """
+    Busca a série mensal do IPCA (SGS 433) no BCB
+
+    Returns:
+        DataFrame: colunas 'data' (datetime) e 'valor' (fração, 0.0059 = 0,59%)
+    """
+    import pandas as pd
+
+    dados = pd.DataFrame(obter(URL_IPCA_SGS).json())
+    dados["data"] = pd.to_datetime(dados["data"], dayfirst=True)
+    dados["valor"] = dados["valor"].astype(float) / 100
+    return dados
+
+
+@em_cache()
+@coalescer
+@limitado(URL_VNA_SELIC)
+@protegido('brasilindicadores')
+def buscar_vna_selic():
+    """
+    Busca o VNA atual do Tesouro Selic (LFT) no brasilindicadores
+
+    Returns:
+        tuple: (vna, data de referência)
+    """
+    import pandas as pd
+
+    tabelas = pd.read_html(io.StringIO(obter(URL_VNA_SELIC).text))
+    # A tabela da LFT normalmente é a terceira (índice 2)
+    linha = tabelas[2].iloc[0]
+    vna = float(str(linha["VNA"]).replace("R$", "").replace(".", "").replace(",", "."))
+    return vna, str(linha["Dt. referência"])
+
+
+def _numero_br(texto):
+    """'17.284,361' ou '17284.361' -> 17284.361"""
+    texto = texto.strip()
+    if ',' in texto:
+        texto = texto.replace('.', '').replace(',', '.')
+    return float(texto)
+
+
+@em_cache()
+@coalescer
+@limitado(URL_VNA_ANBIMA)
+@protegido('anbima')
+def buscar_vnas_anbima():
+    """
+    Busca o arquivo de VNAs da ANBIMA (vna.txt, campos separados por '@')
+
+    Returns:
+        dict: código do título ('LFT', 'NTN-B', ...) -> (vna, data de referência)
+    """
+    vnas = {}
+    for linha in obter(URL_VNA_ANBIMA).text.strip().splitlines()[1:]:  # pula o cabeçalho
+        campos = linha.split('@')
+        if len(campos) < 3:
+            continue
+        try:
+            vnas.setdefault(campos[1].strip(), (_numero_br(campos[2]), campos[0].strip()))
+        except ValueError:
+            continue
+    return vnas
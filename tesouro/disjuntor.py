@@ -0,0 +1,192 @@
+"""
+Disjuntores (circuit breakers) por fonte e orçamento de latência.
+
+Cada fonte de dados tem um disjuntor com uma janela das últimas chamadas.
+Quando a fração de falhas na janela passa do limite (chamadas mais lentas
+que o limite de latência contam como falha), o disjuntor abre: por
+TEMPO_ABERTO segundos as chamadas à fonte falham na hora, sem esperar, e
+quem chamou serve o último valor em cache. Depois disso, uma chamada de
+teste (meio-aberto) decide se o disjuntor fecha ou abre de novo.
+
+O orçamento limita o tempo total que uma requisição (ex: um carregamento
+da página) pode gastar com as fontes, somando todas as buscas que fizer.
+"""
+import contextvars
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as TempoEsgotado
+from contextlib import contextmanager
+
+from tesouro import metricas, tempos
+
+JANELA = 20
+AMOSTRAS_MINIMAS = 5
+LIMITE_FALHAS = 0.5
+LIMITE_LATENCIA = 5.0
+TEMPO_ABERTO = 30.0
+
+FECHADO, ABERTO, MEIO_ABERTO = 'fechado', 'aberto', 'meio-aberto'
+
+
+class DisjuntorAberto(Exception):
+    """A fonte está com o disjuntor aberto"""
+
+
+class OrcamentoEsgotado(Exception):
+    """O orçamento de latência da requisição acabou"""
+
+
+class Disjuntor:
+    def __init__(self, nome, janela=JANELA, limite_falhas=LIMITE_FALHAS,
+                 limite_latencia=LIMITE_LATENCIA, tempo_aberto=TEMPO_ABERTO):
+        self.nome = nome
+        self.limite_falhas = limite_falhas
+        self.limite_latencia = limite_latencia
+        self.tempo_aberto = tempo_aberto
+        self.estado = FECHADO
+        self.aberto_ate = 0.0
+        self.chamadas = deque(maxlen=janela)   # (ok, latência)
+        self._teste_em_andamento = False
+        self._trava = threading.Lock()
+
+    def permitir(self):
+        """True se a chamada pode ir à fonte"""
+        with self._trava:
+            if self.estado == FECHADO:
+                return True
+            if self.estado == ABERTO and time.monotonic() >= self.aberto_ate:
+                self.estado = MEIO_ABERTO
+            if self.estado == MEIO_ABERTO and not self._teste_em_andamento:
+                self._teste_em_andamento = True
+                return True
+            return False
+
+    def liberar(self):
+        """Devolve a vez da chamada de teste quando ela não chegou a ser feita"""
+        with self._trava:
+            self._teste_em_andamento = False
+
+    def registrar(self, ok, latencia):
+        ok = ok and latencia <= self.limite_latencia
+        with self._trava:
+            if self.estado == MEIO_ABERTO:
+                self._teste_em_andamento = False
+                if ok:
+                    self.estado = FECHADO
+                    self.chamadas.clear()
+                else:
+                    self._abrir()
+                return
+
+            self.chamadas.append((ok, latencia))
+            falhas = sum(1 for sucesso, _ in self.chamadas if not sucesso)
+            if len(self.chamadas) >= AMOSTRAS_MINIMAS and falhas / len(self.chamadas) >= self.limite_falhas:
+                self._abrir()
+
+    def _abrir(self):
+        self.estado = ABERTO
+        self.aberto_ate = time.monotonic() + self.tempo_aberto
+
+    def resumo(self):
+        latencias = sorted(latencia for _, latencia in self.chamadas)
+        return {
+            'estado': self.estado,
+            'chamadas': len(self.chamadas),
+            'falhas': sum(1 for ok, _ in self.chamadas if not ok),
+            'latencia_p50': latencias[len(latencias) // 2] if latencias else None,
+        }
+
+
+_disjuntores = {}
+_trava_registro = threading.Lock()
+
+
+def obter_disjuntor(nome):
+    """Disjuntor da fonte, criado na primeira chamada"""
+    with _trava_registro:
+        if nome not in _disjuntores:
+            _disjuntores[nome] = Disjuntor(nome)
+        return _disjuntores[nome]
+
+
+def estados():
+    """Resumo de todos os disjuntores, por fonte"""
+    with _trava_registro:
+        return {nome: disjuntor.resumo() for nome, disjuntor in _disjuntores.items()}
+
+
+# ==================== ORÇAMENTO DE LATÊNCIA ====================
+
+_prazo = contextvars.ContextVar('prazo_fontes', default=None)
+
+# Threads para as chamadas que não aceitam timeout (ex: tesouro_direto_br)
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="orcamento")
+
+
+@contextmanager
+def orcamento(segundos):
+    """Limita a `segundos` o tempo gasto com as fontes dentro do bloco"""
+    prazo = time.monotonic() + segundos
+    atual = _prazo.get()
+    token = _prazo.set(prazo if atual is None else min(atual, prazo))
+    try:
+        yield
+    finally:
+        _prazo.reset(token)
+
+
+def restante():
+    """Segundos que ainda restam do orçamento (None se não houver orçamento)"""
+    prazo = _prazo.get()
+    return None if prazo is None else prazo - time.monotonic()
+
+
+def protegido(nome):
+    """
+    Decorador: chama a fonte através do seu disjuntor e dentro do orçamento
+
+    Raises:
+        DisjuntorAberto: a fonte está fora e não foi chamada
+        OrcamentoEsgotado: a chamada não coube no que restava do orçamento
+    """
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            disjuntor = obter_disjuntor(nome)
+            if not disjuntor.permitir():
+                metricas.registrar_busca(nome, None, 'disjuntor_aberto')
+                raise DisjuntorAberto(f"fonte {nome} fora do ar (disjuntor aberto)")
+
+            tempo = restante()
+            if tempo is not None and tempo <= 0:
+                disjuntor.liberar()
+                metricas.registrar_busca(nome, None, 'orcamento')
+                raise OrcamentoEsgotado(f"sem tempo para consultar {nome}")
+
+            inicio = time.monotonic()
+            with tempos.etapa(f"fonte.{nome}"):
+                try:
+                    if tempo is None:
+                        resultado = funcao(*args, **kwargs)
+                    else:
+                        contexto = contextvars.copy_context()
+                        futuro = _executor.submit(contexto.run, funcao, *args, **kwargs)
+                        resultado = futuro.result(timeout=tempo)
+                except TempoEsgotado:
+                    disjuntor.registrar(False, time.monotonic() - inicio)
+                    metricas.registrar_busca(nome, time.monotonic() - inicio, 'orcamento')
+                    raise OrcamentoEsgotado(f"{nome} não respondeu dentro do orçamento")
+                except Exception:
+                    disjuntor.registrar(False, time.monotonic() - inicio)
+                    metricas.registrar_busca(nome, time.monotonic() - inicio, 'erro')
+                    raise
+            disjuntor.registrar(True, time.monotonic() - inicio)
+            metricas.registrar_busca(nome, time.monotonic() - inicio)
+            return resultado
+
+        return envolvida
+
+    return decorador
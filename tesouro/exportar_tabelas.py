@@ -0,0 +1,123 @@
+"""
+Exporta as tabelas usadas pela calculadora em HTML (calculadora.html).
+
+Com as tabelas, a página calcula no navegador os mesmos preços do pacote
+(precificar_lote), sem acesso à rede: o catálogo atual, os VNAs e os
+vértices das curvas de Prefixado e IPCA+ (du × taxa de compra). Os dias
+úteis seguem a convenção do projeto (tesouro.calendario.dias_uteis, 252/365),
+que a página calcula sem tabela; benchmarks/diferencial.py confere du e PU
+da página contra o precificar_lote.
+
+O arquivo .js só atribui o JSON a window.TABELAS_TESOURO, para a página
+poder carregá-lo com <script> também quando aberta direto do disco
+(file://), onde fetch() não funciona. O .json é o mesmo conteúdo.
+
+Uso:
+    python -m tesouro.exportar_tabelas --destino tabelas
+"""
+import argparse
+import json
+import math
+import os
+from pathlib import Path
+
+import numpy as np
+
+from tesouro import mercado
+from tesouro.calendario import dias_uteis
+
+DESTINO_PADRAO = Path(__file__).resolve().parent.parent / "tabelas"
+NOME_ARQUIVO = "tesouro"
+
+
+def _numero(valor):
+    """float do numpy -> float do JSON (NaN vira null)"""
+    valor = float(valor)
+    return None if math.isnan(valor) else round(valor, 8)
+
+
+def _curvas(snapshot, produtos, du):
+    """Vértices (du, taxa de compra) de cada curva, em ordem de prazo"""
+    curvas = {}
+    for produto in ('prefixado', 'ipca'):
+        linhas = np.flatnonzero((produtos == produto) & ~np.isnan(snapshot.taxa_compra) & (du > 0))
+        ordem = linhas[np.argsort(du[linhas], kind='stable')]
+        curvas[produto] = [[int(du[i]), _numero(snapshot.taxa_compra[i])] for i in ordem]
+    return curvas
+
+
+def montar_tabelas(snapshot):
+    """
+    Monta as tabelas da calculadora a partir de um snapshot
+
+    Args:
+        snapshot (MarketSnapshot): dados de mercado
+
+    Returns:
+        dict: pronto para json.dumps
+    """
+    referencia = np.datetime64(snapshot.data_referencia, 'D')
+    produtos = mercado.produtos(snapshot)
+    du, _ = dias_uteis(referencia, snapshot.vencimentos)
+
+    catalogo = [
+        {
+            'titulo': str(snapshot.tipos[i]),
+            'produto': str(produtos[i]),
+            'vencimento': str(snapshot.vencimentos[i]),
+            'pu': _numero(snapshot.pu[i]),
+            'taxa_compra': _numero(snapshot.taxa_compra[i]),
+            'taxa_venda': _numero(snapshot.taxa_venda[i]),
+        }
+        for i in range(len(snapshot.tipos))
+    ]
+
+    return {
+        'versao': int(snapshot.versao),
+        'data_referencia': str(referencia),
+        'catalogo': catalogo,
+        'vna': {
+            'selic': {'valor': _numero(snapshot.vna_selic), 'referencia': snapshot.data_vna_selic},
+            'ipca': {'valor': _numero(snapshot.vna_ipca), 'referencia': snapshot.data_vna_ipca},
+        },
+        'curvas': _curvas(snapshot, produtos, du),
+    }
+
+
+def _gravar(caminho, texto):
+    """Grava num temporário e troca de uma vez (quem lê nunca vê meio arquivo)"""
+    temporario = caminho.with_suffix(caminho.suffix + ".tmp")
+    temporario.write_text(texto, encoding="utf-8")
+    os.replace(temporario, caminho)
+
+
+def exportar(destino=DESTINO_PADRAO, snapshot=None):
+    """
+    Grava tesouro.json e tesouro.js em `destino`
+
+    Returns:
+        tuple: caminhos (json, js)
+    """
+    snapshot = snapshot or mercado.obter_snapshot()
+    texto = json.dumps(montar_tabelas(snapshot), ensure_ascii=False, separators=(',', ':'))
+
+    destino = Path(destino)
+    destino.mkdir(parents=True, exist_ok=True)
+    caminho_json = destino / f"{NOME_ARQUIVO}.json"
+    caminho_js = destino / f"{NOME_ARQUIVO}.js"
+    _gravar(caminho_json, texto)
+    _gravar(caminho_js, f"window.TABELAS_TESOURO = {texto};\n")
+    return caminho_json, caminho_js
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta as tabelas da calculadora HTML")
+    parser.add_argument("--destino", default=str(DESTINO_PADRAO), help="pasta de saída")
+    args = parser.parse_args(argv)
+
+    caminho_json, caminho_js = exportar(args.destino)
+    print(f"✅ Tabelas gravadas em {caminho_js} ({caminho_json.stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
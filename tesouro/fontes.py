@@ -0,0 +1,206 @@
+"""
+Busca com redundância (hedge) em várias fontes do mesmo dado.
+
+A primeira fonte é consultada logo; se ela não responder dentro do
+percentil de latência observado (p90 por padrão), as demais são disparadas
+em paralelo. Vale o primeiro resultado válido. Os resultados que chegam
+são conferidos entre si e contra o último valor válido conhecido, que fica
+gravado em disco e substitui os antigos valores fixos de fallback.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+
+from tesouro.disjuntor import restante
+
+CAMINHO_ULTIMOS_VALIDOS = Path(
+    os.environ.get("TESOURO_CACHE_DIR", Path.home() / ".cache" / "tesouro")
+) / "ultimos_validos.json"
+
+# Espera pela primeira fonte antes do hedge enquanto não há latências medidas
+ATRASO_PADRAO = 1.0
+PERCENTIL_HEDGE = 90
+AMOSTRAS_MINIMAS = 5
+
+# Tempo máximo esperando todas as fontes
+TIMEOUT = 15
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="fonte")
+
+
+class FontesIndisponiveis(Exception):
+    """Nenhuma fonte devolveu um valor válido"""
+
+
+class Fonte:
+    """Uma fonte de dados, com as últimas latências observadas"""
+
+    def __init__(self, nome, funcao, janela=50):
+        self.nome = nome
+        self.funcao = funcao
+        self.latencias = deque(maxlen=janela)
+
+    def buscar(self):
+        inicio = time.perf_counter()
+        try:
+            return self.funcao()
+        finally:
+            self.latencias.append(time.perf_counter() - inicio)
+
+    def atraso_hedge(self, percentil=PERCENTIL_HEDGE):
+        """Quanto esperar por esta fonte antes de disparar as outras"""
+        if len(self.latencias) < AMOSTRAS_MINIMAS:
+            return ATRASO_PADRAO
+        return float(np.percentile(self.latencias, percentil))
+
+
+# ==================== ÚLTIMOS VALORES VÁLIDOS ====================
+
+_ultimos = None
+_trava_ultimos = threading.Lock()
+
+
+def _carregar_ultimos():
+    global _ultimos
+    if _ultimos is None:
+        try:
+            _ultimos = json.loads(CAMINHO_ULTIMOS_VALIDOS.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            _ultimos = {}
+    return _ultimos
+
+
+def ultimo_valido(chave):
+    """Último valor válido gravado para a chave (None se nunca houve)"""
+    with _trava_ultimos:
+        item = _carregar_ultimos().get(chave)
+    if item is None:
+        return None
+    valor = item['valor']
+    return tuple(valor) if isinstance(valor, list) else valor
+
+
+def idade_ultimo_valido(chave):
+    """Segundos desde que o último valor válido da chave foi gravado (None se nunca houve)"""
+    with _trava_ultimos:
+        item = _carregar_ultimos().get(chave)
+    if item is None or 'instante' not in item:
+        return None
+    return max(0.0, time.time() - item['instante'])
+
+
+def guardar_ultimo_valido(chave, valor):
+    """Grava o valor como o último válido da chave (em memória e em disco)"""
+    with _trava_ultimos:
+        ultimos = _carregar_ultimos()
+        ultimos[chave] = {'valor': list(valor) if isinstance(valor, tuple) else valor, 'instante': time.time()}
+        try:
+            CAMINHO_ULTIMOS_VALIDOS.parent.mkdir(parents=True, exist_ok=True)
+            temporario = CAMINHO_ULTIMOS_VALIDOS.with_suffix(".tmp")
+            temporario.write_text(json.dumps(ultimos, ensure_ascii=False), encoding="utf-8")
+            os.replace(temporario, CAMINHO_ULTIMOS_VALIDOS)
+        except OSError:
+            pass
+
+
+# ==================== BUSCA COM HEDGE ====================
+
+divergencias = {}
+
+
+def _divergem(a, b, tolerancia):
+    return abs(a / b - 1) > tolerancia
+
+
+def buscar_com_hedge(chave, fontes, validar, tolerancia=0.01, numero=lambda v: v[0],
+                     timeout=TIMEOUT):
+    """
+    Busca o dado em várias fontes e devolve o primeiro valor válido
+
+    Args:
+        chave (str): nome do dado (para o último valor válido)
+        fontes (list[Fonte]): em ordem de preferência
+        validar (callable): validar(valor, referencia) -> bool, com a
+            referência sendo o último valor válido (ou None)
+        tolerancia (float): diferença relativa aceita entre fontes
+        numero (callable): extrai do valor o número a comparar
+
+    Returns:
+        (valor, nome da fonte)
+
+    Raises:
+        FontesIndisponiveis: se nenhuma fonte devolver um valor válido
+    """
+    referencia = ultimo_valido(chave)
+    ref_numero = numero(referencia) if referencia is not None else None
+
+    # As fontes rodam em outras threads, mas dentro do orçamento de quem chamou
+    contexto = contextvars.copy_context()
+    disparar = lambda fonte: _executor.submit(contexto.copy().run, fonte.buscar)
+
+    pendentes = {disparar(fontes[0]): fontes[0]}
+    reserva = list(fontes[1:])
+    tempo = restante()
+    limite = time.monotonic() + (timeout if tempo is None else max(0.0, min(timeout, tempo)))
+    atraso = fontes[0].atraso_hedge()
+    validos = []
+    erros = []
+
+    while pendentes:
+        espera = atraso if reserva else limite - time.monotonic()
+        prontos, _ = wait(pendentes, timeout=max(0.0, espera), return_when=FIRST_COMPLETED)
+
+        for futuro in prontos:
+            fonte = pendentes.pop(futuro)
+            if futuro.exception() is not None:
+                erros.append(f"{fonte.nome}: {futuro.exception()}")
+                continue
+            valor = futuro.result()
+            if validar(valor, referencia):
+                validos.append((valor, fonte.nome))
+            else:
+                erros.append(f"{fonte.nome}: valor inválido {valor!r}")
+
+        if validos or time.monotonic() >= limite:
+            break
+
+        # A primeira fonte falhou, veio inválida ou passou do atraso: dispara as reservas
+        for fonte in reserva:
+            pendentes[disparar(fonte)] = fonte
+        reserva = []
+
+    if not validos:
+        raise FontesIndisponiveis(f"{chave}: " + "; ".join(erros or ["sem resposta"]))
+
+    # Confere com as fontes que já responderam; se divergirem, fica a mais
+    # próxima do último valor válido
+    escolhido = validos[0]
+    for outro in validos[1:]:
+        if _divergem(numero(outro[0]), numero(escolhido[0]), tolerancia):
+            divergencias[chave] = divergencias.get(chave, 0) + 1
+            if ref_numero is not None and \
+                    abs(numero(outro[0]) - ref_numero) < abs(numero(escolhido[0]) - ref_numero):
+                escolhido = outro
+
+    # As fontes que ainda estão respondendo são conferidas quando terminarem
+    for futuro in pendentes:
+        futuro.add_done_callback(lambda f, base=numero(escolhido[0]): _conferir(chave, f, base, tolerancia, numero))
+
+    guardar_ultimo_valido(chave, escolhido[0])
+    return escolhido
+
+
+def _conferir(chave, futuro, base, tolerancia, numero):
+    if futuro.exception() is None:
+        try:
+            if _divergem(numero(futuro.result()), base, tolerancia):
+                divergencias[chave] = divergencias.get(chave, 0) + 1
+        except (TypeError, ValueError, ZeroDivisionError):
+            pass
@@ -0,0 +1,204 @@
+"""
+Grafo de cálculo incremental das calculadoras de um título.
+
+Cada calculadora encadeia as mesmas etapas: snapshot → VNA → VNA
+projetado → dias úteis → cotação → PU. Refazer tudo a cada clique custa
+pouco em conta, mas refaz também o que não mudou: trocar só a taxa não
+mexe no VNA nem no prazo.
+
+Aqui cada etapa é um nó que guarda o último valor. Quando uma entrada muda
+(definir), os nós que dependem dela ficam sujos; ao pedir um valor, só os
+nós sujos no caminho são recalculados. Se um nó recalculado dá o mesmo
+valor de antes (um snapshot novo com o mesmo VNA, por exemplo), quem
+depende dele não é refeito.
+
+    grafo = montar('selic')
+    grafo.definir(snapshot=snapshot, hoje=date.today(), ano=2029,
+                  taxa=0.0010, taxa_selic=0.1175)
+    grafo.valor('preco')
+    grafo.definir(taxa=0.0012)      # só cotação e preço são refeitos
+    grafo.valor('preco')
+
+Cada recálculo vira uma etapa em tesouro.tempos (com o nome do nó), então
+o painel de tempos do app mostra só o que foi refeito.
+"""
+import threading
+from datetime import datetime
+
+from tesouro import mercado, tempos
+from tesouro.calendario import calcular_dias_uteis
+from tesouro.precificacao import (
+    VALOR_NOMINAL_PREFIXADO,
+    calcular_cotacao_ipca,
+    calcular_cotacao_selic,
+    calcular_pu_prefixado_oficial,
+    calcular_vna_selic_projetado,
+    projetar_vna_ipca,
+)
+
+_SEM_VALOR = object()
+
+
+def _iguais(a, b):
+    """Igualdade tolerante a valores sem == booleano (arrays, snapshots)"""
+    if a is b:
+        return True
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+class _No:
+    __slots__ = ('funcao', 'dependencias', 'valor', 'alterado_em', 'conferido_em')
+
+    def __init__(self, funcao=None, dependencias=()):
+        self.funcao = funcao                # None nas entradas
+        self.dependencias = dependencias
+        self.valor = _SEM_VALOR
+        self.alterado_em = 0                # revisão em que o valor mudou pela última vez
+        self.conferido_em = -1              # revisão em que o valor foi confirmado em dia
+
+
+class Grafo:
+    """
+    Entradas e nós calculados, com memória e recálculo só do que sujou
+
+    Cada definir() que muda alguma entrada abre uma revisão nova. Um nó
+    calculado está em dia se nenhuma dependência mudou depois da última
+    vez que ele foi conferido.
+    """
+
+    def __init__(self):
+        self._nos = {}
+        self._revisao = 0
+        self._trava = threading.RLock()
+        self.recalculos = {}                # nó -> quantas vezes foi calculado
+
+    def entrada(self, nome, valor=_SEM_VALOR):
+        self._nos[nome] = _No()
+        if valor is not _SEM_VALOR:
+            self.definir(**{nome: valor})
+        return self
+
+    def no(self, nome, funcao, *dependencias):
+        """Nó calculado: funcao(*valores das dependências)"""
+        for dependencia in dependencias:
+            if dependencia not in self._nos:
+                raise KeyError(f"Dependência '{dependencia}' de '{nome}' não existe (registre antes)")
+        self._nos[nome] = _No(funcao, dependencias)
+        return self
+
+    def definir(self, **valores):
+        """Muda entradas; as que receberem o mesmo valor não sujam nada"""
+        with self._trava:
+            mudou = False
+            for nome, valor in valores.items():
+                no = self._nos[nome]
+                if no.funcao is not None:
+                    raise ValueError(f"'{nome}' é calculado, não uma entrada")
+                if no.valor is _SEM_VALOR or not _iguais(no.valor, valor):
+                    if not mudou:
+                        self._revisao += 1
+                        mudou = True
+                    no.valor = valor
+                    no.alterado_em = self._revisao
+            return mudou
+
+    def valor(self, nome):
+        with self._trava:
+            return self._atualizar(nome).valor
+
+    def valores(self, *nomes):
+        with self._trava:
+            return {nome: self._atualizar(nome).valor for nome in nomes}
+
+    def _atualizar(self, nome):
+        no = self._nos[nome]
+        if no.funcao is None:
+            if no.valor is _SEM_VALOR:
+                raise ValueError(f"Entrada '{nome}' sem valor")
+            return no
+        if no.conferido_em == self._revisao:
+            return no
+
+        dependencias = [self._atualizar(dependencia) for dependencia in no.dependencias]
+        if no.valor is _SEM_VALOR or any(d.alterado_em > no.conferido_em for d in dependencias):
+            with tempos.etapa(nome):
+                novo = no.funcao(*(d.valor for d in dependencias))
+            self.recalculos[nome] = self.recalculos.get(nome, 0) + 1
+            if no.valor is _SEM_VALOR or not _iguais(no.valor, novo):
+                no.valor = novo
+                no.alterado_em = self._revisao
+        no.conferido_em = self._revisao
+        return no
+
+
+# ==================== CALCULADORAS ====================
+# Nomes dos nós iguais aos das etapas das calculadoras (app e scripts).
+
+def _vencimento_prefixado(titulo):
+    return titulo['vencimento'] if titulo else None
+
+
+def _dias_uteis(hoje, vencimento):
+    return calcular_dias_uteis(hoje, vencimento) if vencimento is not None else None
+
+
+def montar_prefixado():
+    """Entradas: snapshot, hoje, ano e taxa (% a.a.)"""
+    grafo = Grafo()
+    for nome in ('snapshot', 'hoje', 'ano', 'taxa'):
+        grafo.entrada(nome)
+    grafo.no('titulo', lambda snapshot, ano: mercado.titulo_prefixado(snapshot, ano) if snapshot else None,
+             'snapshot', 'ano')
+    grafo.no('vencimento', _vencimento_prefixado, 'titulo')
+    grafo.no('dias_uteis', _dias_uteis, 'hoje', 'vencimento')
+    grafo.no('preco', lambda taxa, du: calcular_pu_prefixado_oficial(VALOR_NOMINAL_PREFIXADO, taxa, du[0]),
+             'taxa', 'dias_uteis')
+    return grafo
+
+
+def montar_selic():
+    """Entradas: snapshot, hoje, ano, taxa (ágio/deságio) e taxa_selic (a.a.), em decimal"""
+    grafo = Grafo()
+    for nome in ('snapshot', 'hoje', 'ano', 'taxa', 'taxa_selic'):
+        grafo.entrada(nome)
+    grafo.no('vna', lambda s: (s.vna_selic, s.data_vna_selic) if s else None, 'snapshot')
+    grafo.no('vna_projetado', lambda vna, selic: calcular_vna_selic_projetado(vna[0], selic),
+             'vna', 'taxa_selic')
+    grafo.no('vencimento', lambda ano: datetime(ano, 3, 1), 'ano')
+    grafo.no('dias_uteis', _dias_uteis, 'hoje', 'vencimento')
+    grafo.no('cotacao', lambda taxa, du: calcular_cotacao_selic(taxa, du[0]), 'taxa', 'dias_uteis')
+    grafo.no('preco', lambda vna_projetado, cotacao: vna_projetado[0] * (cotacao / 100),
+             'vna_projetado', 'cotacao')
+    return grafo
+
+
+def montar_ipca():
+    """Entradas: snapshot, hoje, ano, taxa (real a.a.) e ipca_mensal, em decimal"""
+    grafo = Grafo()
+    for nome in ('snapshot', 'hoje', 'ano', 'taxa', 'ipca_mensal'):
+        grafo.entrada(nome)
+    grafo.no('vna', lambda s: (s.vna_ipca, s.data_vna_ipca) if s else None, 'snapshot')
+    grafo.no('vna_projetado', lambda vna, ipca: float(projetar_vna_ipca(vna[0], ipca, meses=1)),
+             'vna', 'ipca_mensal')
+    # Anos ímpares vencem em 15/05, pares em 15/08
+    grafo.no('vencimento', lambda ano: datetime(ano, 5, 15) if ano % 2 == 1 else datetime(ano, 8, 15), 'ano')
+    grafo.no('dias_uteis', _dias_uteis, 'hoje', 'vencimento')
+    grafo.no('cotacao', lambda taxa, du: calcular_cotacao_ipca(taxa, du[0]), 'taxa', 'dias_uteis')
+    grafo.no('preco', lambda vna_projetado, cotacao: vna_projetado * (cotacao / 100),
+             'vna_projetado', 'cotacao')
+    return grafo
+
+
+CALCULADORAS = {
+    'prefixado': montar_prefixado,
+    'selic': montar_selic,
+    'ipca': montar_ipca,
+}
+
+
+def montar(produto):
+    """Grafo da calculadora de um produto ('prefixado', 'selic' ou 'ipca')"""
+    return CALCULADORAS[produto]()
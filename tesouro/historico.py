@@ -0,0 +1,147 @@
+"""
+Arquivo histórico de preços e taxas do Tesouro Direto.
+
+Os dados vêm do CSV público do Tesouro Transparente (um registro por título
+e dia) e são reorganizados em matrizes datas × títulos, que é o formato que
+o backtest e os gráficos precisam para trabalhar de forma vetorizada.
+"""
+import os
+from pathlib import Path
+from urllib.parse import urlparse
+
+import numpy as np
+
+from tesouro import limitador
+
+URL_HISTORICO = (
+    "https://www.tesourotransparente.gov.br/ckan/dataset/"
+    "df56aa42-484a-4a59-8184-7676580c81e3/resource/"
+    "796d2059-14e9-44e3-80c9-2d9e30b405c1/download/PrecoTaxaTesouroDireto.csv"
+)
+
+CAMINHO_PADRAO = Path(
+    os.environ.get("TESOURO_CACHE_DIR", Path.home() / ".cache" / "tesouro")
+) / "historico_precos.npz"
+
+# Colunas do CSV -> nomes usados nas matrizes do arquivo
+COLUNAS_VALORES = {
+    "Taxa Compra Manha": "taxa_compra",
+    "Taxa Venda Manha": "taxa_venda",
+    "PU Compra Manha": "pu_compra",
+    "PU Venda Manha": "pu_venda",
+    "PU Base Manha": "pu_base",
+}
+
+
+def ler_historico_csv(origem=URL_HISTORICO):
+    """
+    Lê o CSV de preços e taxas históricos (arquivo local ou URL)
+
+    Returns:
+        DataFrame: uma linha por título e data base
+    """
+    import pandas as pd
+
+    host = urlparse(str(origem)).hostname
+    if host:
+        # Download grande e sem pressa: não passa na frente do app
+        limitador.adquirir(host, limitador.LOTE)
+    df = pd.read_csv(origem, sep=";", decimal=",", thousands=".")
+    df["Data Vencimento"] = pd.to_datetime(df["Data Vencimento"], dayfirst=True)
+    df["Data Base"] = pd.to_datetime(df["Data Base"], dayfirst=True)
+    return df
+
+
+def montar_arquivo(df):
+    """
+    Converte o histórico em matrizes densas datas × títulos.
+
+    Args:
+        df (DataFrame): saída de ler_historico_csv
+
+    Returns:
+        dict: 'datas' (datetime64[D]), 'tipos', 'vencimentos' (datetime64[D])
+              e uma matriz float64 por coluna de COLUNAS_VALORES, com NaN
+              nos dias em que o título não tem cotação
+    """
+    datas = np.unique(df["Data Base"].to_numpy().astype("datetime64[D]"))
+
+    chaves = df[["Tipo Titulo", "Data Vencimento"]].drop_duplicates()
+    chaves = chaves.sort_values(["Tipo Titulo", "Data Vencimento"])
+    tipos = chaves["Tipo Titulo"].to_numpy().astype(str)
+    vencimentos = chaves["Data Vencimento"].to_numpy().astype("datetime64[D]")
+
+    # Posição (linha, coluna) de cada registro nas matrizes
+    linhas = np.searchsorted(datas, df["Data Base"].to_numpy().astype("datetime64[D]"))
+    codigos = {chave: j for j, chave in enumerate(zip(tipos, vencimentos))}
+    colunas = np.fromiter(
+        (codigos[chave] for chave in zip(
+            df["Tipo Titulo"].to_numpy().astype(str),
+            df["Data Vencimento"].to_numpy().astype("datetime64[D]"),
+        )),
+        dtype=np.int64,
+        count=len(df),
+    )
+
+    arquivo = {"datas": datas, "tipos": tipos, "vencimentos": vencimentos}
+    for coluna, nome in COLUNAS_VALORES.items():
+        matriz = np.full((len(datas), len(tipos)), np.nan)
+        matriz[linhas, colunas] = df[coluna].to_numpy(dtype=float)
+        arquivo[nome] = matriz
+
+    return arquivo
+
+
+def salvar_arquivo(arquivo, caminho=CAMINHO_PADRAO):
+    """Grava o arquivo em formato colunar (.npz, sem compressão)"""
+    caminho = Path(caminho)
+    caminho.parent.mkdir(parents=True, exist_ok=True)
+    np.savez(caminho, **arquivo)
+    return caminho
+
+
+def carregar_arquivo(caminho=CAMINHO_PADRAO, atualizar=False, origem=URL_HISTORICO):
+    """
+    Carrega o arquivo histórico, baixando e montando o CSV se necessário
+
+    Args:
+        caminho: arquivo .npz local
+        atualizar (bool): Se True, baixa o CSV de novo mesmo havendo cache
+        origem: URL ou caminho do CSV usado quando não há cache
+
+    Returns:
+        dict: mesmo formato de montar_arquivo
+    """
+    caminho = Path(caminho)
+    if atualizar or not caminho.exists():
+        arquivo = montar_arquivo(ler_historico_csv(origem))
+        salvar_arquivo(arquivo, caminho)
+        return arquivo
+
+    with np.load(caminho) as dados:
+        return {nome: dados[nome] for nome in dados.files}
+
+
+def indice_titulo(arquivo, tipo, vencimento):
+    """
+    Localiza a coluna de um título no arquivo
+
+    Args:
+        tipo (str): nome do título (ex: "Tesouro Prefixado")
+        vencimento: ano (int) ou data de vencimento ("2032-01-01", date, ...)
+
+    Returns:
+        int: índice da coluna ou None se o título não existir
+    """
+    mesmo_tipo = np.char.lower(arquivo["tipos"]) == tipo.lower()
+
+    if isinstance(vencimento, int):
+        anos = arquivo["vencimentos"].astype("datetime64[Y]").astype(int) + 1970
+        encontrados = np.flatnonzero(mesmo_tipo & (anos == vencimento))
+    else:
+        data = np.datetime64(vencimento, "D")
+        encontrados = np.flatnonzero(mesmo_tipo & (arquivo["vencimentos"] == data))
+
+    if len(encontrados) == 0:
+        return None
+    return int(encontrados[0])
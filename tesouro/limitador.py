@@ -0,0 +1,162 @@
+"""
+Limite de requisições às fontes (balde de tokens por host).
+
+Cada host tem um balde que se enche a TAXA tokens por segundo até a
+CAPACIDADE; cada requisição gasta um token e espera quando não há.
+
+Prioridades: dentro do processo, quem espera fica numa fila de prioridade
+(as requisições interativas, como as do app, passam na frente das de lote,
+como backtests e o atualizador). Entre processos, o estado do balde fica
+num arquivo travado com flock, e as requisições de lote só gastam um token
+se sobrar a RESERVA_INTERATIVA, guardada para as interativas.
+
+Em sistemas sem fcntl (Windows) o limite vale só dentro do processo.
+"""
+import contextvars
+import heapq
+import itertools
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+INTERATIVO, LOTE = 0, 1
+
+# host -> (tokens por segundo, capacidade do balde)
+LIMITES = {
+    'api.bcb.gov.br': (5.0, 10),
+    'www.tesourotransparente.gov.br': (1.0, 2),
+    'www.anbima.com.br': (2.0, 4),
+    'brasilindicadores.com.br': (1.0, 3),
+    'www.tesourodireto.com.br': (2.0, 4),
+}
+LIMITE_PADRAO = (2.0, 4)
+
+# Tokens que as requisições de lote deixam para as interativas
+RESERVA_INTERATIVA = 1.0
+
+DIRETORIO_BALDES = Path(
+    os.environ.get("TESOURO_CACHE_DIR", Path.home() / ".cache" / "tesouro")
+) / "limites"
+
+_prioridade = contextvars.ContextVar('prioridade_fontes', default=INTERATIVO)
+
+
+@contextmanager
+def em_lote():
+    """Marca as requisições feitas dentro do bloco como de lote"""
+    token = _prioridade.set(LOTE)
+    try:
+        yield
+    finally:
+        _prioridade.reset(token)
+
+
+class _EstadoArquivo:
+    """Tokens e instante da última recarga, num arquivo travado com flock"""
+
+    FORMATO = "<dd"
+
+    def __init__(self, caminho, capacidade):
+        self.caminho = caminho
+        self.capacidade = capacidade
+        caminho.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(caminho, os.O_RDWR | os.O_CREAT, 0o644)
+
+    @contextmanager
+    def travado(self):
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            bruto = os.pread(self._fd, struct.calcsize(self.FORMATO), 0)
+            if len(bruto) == struct.calcsize(self.FORMATO):
+                estado = list(struct.unpack(self.FORMATO, bruto))
+            else:
+                estado = [float(self.capacidade), time.time()]
+            yield estado
+            os.pwrite(self._fd, struct.pack(self.FORMATO, *estado), 0)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+
+class BaldeTokens:
+    def __init__(self, host, taxa, capacidade, compartilhado=True):
+        self.host = host
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self.esperas = 0
+        self._tokens = float(capacidade)
+        self._instante = time.time()
+        self._fila = []
+        self._sequencia = itertools.count()
+        self._condicao = threading.Condition()
+        self._arquivo = None
+        if compartilhado and fcntl is not None:
+            try:
+                self._arquivo = _EstadoArquivo(DIRETORIO_BALDES / f"{host}.balde", capacidade)
+            except OSError:
+                self._arquivo = None
+
+    def _gastar(self, estado, prioridade):
+        """Recarrega e tenta gastar um token; devolve quanto esperar (0 = conseguiu)"""
+        agora = time.time()
+        tokens = min(self.capacidade, estado[0] + (agora - estado[1]) * self.taxa)
+        estado[0], estado[1] = tokens, agora
+        minimo = 1.0 + (RESERVA_INTERATIVA if prioridade == LOTE else 0.0)
+        if tokens >= minimo:
+            estado[0] = tokens - 1.0
+            return 0.0
+        return (minimo - tokens) / self.taxa
+
+    def _tentar(self, prioridade):
+        if self._arquivo is not None:
+            with self._arquivo.travado() as estado:
+                return self._gastar(estado, prioridade)
+        estado = [self._tokens, self._instante]
+        espera = self._gastar(estado, prioridade)
+        self._tokens, self._instante = estado
+        return espera
+
+    def adquirir(self, prioridade=None):
+        """Espera a vez na fila e gasta um token"""
+        prioridade = _prioridade.get() if prioridade is None else prioridade
+        entrada = (prioridade, next(self._sequencia))
+        with self._condicao:
+            heapq.heappush(self._fila, entrada)
+            try:
+                while True:
+                    espera = None
+                    if self._fila[0] == entrada:
+                        espera = self._tentar(prioridade)
+                        if espera == 0.0:
+                            return
+                        self.esperas += 1
+                    self._condicao.wait(timeout=espera)
+            finally:
+                self._fila.remove(entrada)
+                heapq.heapify(self._fila)
+                self._condicao.notify_all()
+
+
+_baldes = {}
+_trava_baldes = threading.Lock()
+
+
+def obter_balde(host):
+    """Balde do host, criado na primeira chamada"""
+    with _trava_baldes:
+        if host not in _baldes:
+            taxa, capacidade = LIMITES.get(host, LIMITE_PADRAO)
+            _baldes[host] = BaldeTokens(host, taxa, capacidade)
+        return _baldes[host]
+
+
+def adquirir(host, prioridade=None):
+    """Espera até poder fazer uma requisição ao host"""
+    obter_balde(host).adquirir(prioridade)
@@ -0,0 +1,205 @@
+"""
+Foto (snapshot) dos dados de mercado usada pelos precificadores.
+
+Um MarketSnapshot reúne em arrays o catálogo de títulos e os VNAs do dia.
+Ele é imutável: quando os dados mudam, monta-se um novo com outra versão,
+e quem guardou resultados pode usar a versão para saber se estão velhos.
+"""
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+from tesouro import cdc, dados, metricas, vna
+
+
+@dataclass(frozen=True)
+class MarketSnapshot:
+    versao: int
+    data_referencia: date
+    tipos: np.ndarray           # nome de cada título do catálogo
+    vencimentos: np.ndarray     # datetime64[D]
+    pu: np.ndarray
+    taxa_compra: np.ndarray     # % a.a. (NaN quando não informado)
+    taxa_venda: np.ndarray
+    vna_selic: float
+    data_vna_selic: str
+    vna_ipca: float
+    data_vna_ipca: str
+    criado_em: float
+    obsoletos: tuple = ()       # dados servidos do cache porque a fonte falhou
+
+    def idade(self):
+        """Segundos desde a criação do snapshot"""
+        return time.time() - self.criado_em
+
+
+def _coluna(catalogo, nome):
+    if nome in catalogo.columns:
+        return catalogo[nome].to_numpy(dtype=float)
+    return np.full(len(catalogo), np.nan)
+
+
+def snapshot_de_catalogo(catalogo, vna_selic, vna_ipca, versao=None, data_referencia=None,
+                         obsoletos=()):
+    """
+    Monta um snapshot a partir de dados já buscados
+
+    Args:
+        catalogo (DataFrame): saída de dados.buscar_catalogo
+        vna_selic, vna_ipca (tuple): (vna, data de referência)
+    """
+    tipos = np.array([str(indice[0]) for indice in catalogo.index])
+    vencimentos = np.array(
+        [np.datetime64(str(indice[1])[:10], 'D') for indice in catalogo.index],
+        dtype='datetime64[D]',
+    )
+
+    return MarketSnapshot(
+        versao=versao if versao is not None else int(time.time() * 1000),
+        data_referencia=data_referencia or date.today(),
+        tipos=tipos,
+        vencimentos=vencimentos,
+        pu=_coluna(catalogo, 'PU'),
+        taxa_compra=_coluna(catalogo, 'Taxa Compra Manha'),
+        taxa_venda=_coluna(catalogo, 'Taxa Venda Manha'),
+        vna_selic=float(vna_selic[0]),
+        data_vna_selic=str(vna_selic[1]),
+        vna_ipca=float(vna_ipca[0]),
+        data_vna_ipca=str(vna_ipca[1]),
+        criado_em=time.time(),
+        obsoletos=tuple(obsoletos),
+    )
+
+
+def montar_snapshot(versao=None):
+    """Busca catálogo e VNAs nas fontes e monta um snapshot novo"""
+    catalogo = dados.buscar_catalogo()
+    vna_selic = vna.vna_selic_atual()
+    vna_ipca = vna.vna_ipca_atual()
+    return snapshot_de_catalogo(catalogo, vna_selic, vna_ipca, versao=versao,
+                                obsoletos=dados.obsoletos())
+
+
+# ==================== SNAPSHOT DO PROCESSO ====================
+
+_snapshot_atual = None
+_trava = threading.Lock()
+
+
+def snapshot_em_dia(max_idade=300):
+    """Snapshot do processo se ele tiver até max_idade segundos (senão None)"""
+    snapshot = _snapshot_atual
+    if snapshot is not None and snapshot.idade() <= max_idade:
+        return snapshot
+    return None
+
+
+def obter_snapshot(max_idade=300):
+    """
+    Snapshot compartilhado pelo processo, renovado quando passa de max_idade
+
+    Na renovação, usa o arquivo gravado pelo atualizador (tesouro.atualizador)
+    se ele estiver em dia; só busca nas fontes quando não houver atualizador.
+    Se a busca falhar, devolve o snapshot anterior mesmo vencido.
+
+    Args:
+        max_idade (float): idade máxima em segundos
+    """
+    global _snapshot_atual
+    snapshot = snapshot_em_dia(max_idade)
+    metricas.registrar_cache('snapshot', snapshot is not None)
+    if snapshot is not None:
+        return snapshot
+
+    from tesouro.compartilhado import obter_compartilhado
+
+    with _trava:
+        if _snapshot_atual is None or _snapshot_atual.idade() > max_idade:
+            try:
+                compartilhado = obter_compartilhado(max_idade)
+                metricas.registrar_cache('snapshot_compartilhado', compartilhado is not None)
+                _snapshot_atual = compartilhado or montar_snapshot()
+            except Exception:
+                # Fontes fora: segue com o snapshot anterior (vencido) se houver
+                if _snapshot_atual is None:
+                    raise
+        snapshot = _snapshot_atual
+    cdc.registrar(snapshot)
+    return snapshot
+
+
+def publicar_snapshot(snapshot):
+    """Substitui o snapshot do processo (ex: recebido de outro processo)"""
+    global _snapshot_atual
+    with _trava:
+        _snapshot_atual = snapshot
+    cdc.registrar(snapshot)
+
+
+def produtos(snapshot):
+    """
+    Produto de cada título do catálogo: 'prefixado', 'selic' ou 'ipca' para
+    os títulos sem cupom e '' para os demais (juros semestrais, Renda+, Educa+)
+    """
+    nomes = np.char.lower(snapshot.tipos.astype(str))
+    contem = lambda texto: np.char.find(nomes, texto) >= 0
+    sem_cupom = ~contem('juros')
+    return np.select(
+        [sem_cupom & contem('prefixado'), sem_cupom & contem('selic'), sem_cupom & contem('ipca')],
+        ['prefixado', 'selic', 'ipca'],
+        default='',
+    )
+
+
+def _prefixados(snapshot):
+    """Máscara dos Tesouro Prefixado sem cupom (exclui os com juros semestrais)"""
+    nomes = np.char.lower(snapshot.tipos.astype(str))
+    return (np.char.find(nomes, 'prefixado') >= 0) & (np.char.find(nomes, 'juros') < 0)
+
+
+def anos_prefixado(snapshot):
+    """Anos de vencimento com Tesouro Prefixado no catálogo, em ordem"""
+    vencimentos = snapshot.vencimentos[_prefixados(snapshot)]
+    return sorted(set((vencimentos.astype('datetime64[Y]').astype(int) + 1970).tolist()))
+
+
+def titulo_prefixado(snapshot, ano):
+    """
+    Tesouro Prefixado que vence no ano pedido
+
+    Returns:
+        dict: 'nome', 'vencimento' (date) e 'pu', ou None se não houver
+    """
+    posicoes = np.flatnonzero(
+        _prefixados(snapshot)
+        & (snapshot.vencimentos.astype('datetime64[Y]').astype(int) + 1970 == ano)
+    )
+    if len(posicoes) == 0:
+        return None
+    i = posicoes[0]
+    return {
+        'nome': str(snapshot.tipos[i]),
+        'vencimento': snapshot.vencimentos[i].astype(object),
+        'pu': float(snapshot.pu[i]),
+    }
+
+
+def vencimentos_prefixado(snapshot, anos):
+    """
+    Vencimento do Tesouro Prefixado (sem cupom) de cada ano pedido
+
+    Returns:
+        array datetime64[D]: NaT para os anos sem título no catálogo
+    """
+    vencimentos = np.sort(snapshot.vencimentos[_prefixados(snapshot)])
+    anos_catalogo = vencimentos.astype('datetime64[Y]').astype(int) + 1970
+
+    anos = np.asarray(anos)
+    if len(anos_catalogo) == 0:
+        return np.full(anos.shape, np.datetime64('NaT'), dtype='datetime64[D]')
+    posicao = np.clip(np.searchsorted(anos_catalogo, anos), 0, len(anos_catalogo) - 1)
+    encontrado = anos_catalogo[posicao] == anos
+    return np.where(encontrado, vencimentos[posicao], np.datetime64('NaT'))
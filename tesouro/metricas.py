@@ -0,0 +1,291 @@
+"""
+Métricas de operação no formato texto do Prometheus.
+
+Cobre a saúde das fontes (latência e erros por fonte, estado dos
+disjuntores), a eficiência dos caches (acertos e falhas por camada), a
+idade do snapshot e as cotações precificadas por produto.
+
+Os contadores não usam trava no caminho quente: cada thread escreve só na
+sua própria célula e quem lê (a coleta) soma as células de todas as
+threads. A trava só é usada na primeira escrita de cada thread e na coleta.
+As células de threads que já terminaram (o Streamlit usa uma thread por
+reexecução) são somadas num total base e descartadas, então o número de
+células acompanha as threads vivas, não as que já passaram.
+Estados que já existem em outro lugar (disjuntores, snapshot, caches LRU)
+são lidos na hora da coleta, sem custo nenhum para quem os atualiza.
+
+A API serve as métricas em GET /metrics; o app Streamlit sobe um servidor
+só de métricas numa thread (servir()) apenas se TESOURO_METRICAS_PORTA
+estiver definida. O servidor escuta em 127.0.0.1 (sem autenticação); para
+expor a outra máquina, defina TESOURO_METRICAS_ENDERECO (ex: 0.0.0.0).
+"""
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PORTA_PADRAO = 9108
+ENDERECO_PADRAO = os.environ.get("TESOURO_METRICAS_ENDERECO", "127.0.0.1")
+
+# Porta do servidor de métricas do app (0: não sobe)
+PORTA_APP = int(os.environ.get("TESOURO_METRICAS_PORTA") or 0)
+TIPO_CONTEUDO = "text/plain; version=0.0.4; charset=utf-8"
+
+# Limites (s) dos baldes de latência das fontes
+LIMITES_LATENCIA = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Celulas:
+    """Uma lista de números por thread; cada thread só escreve na sua"""
+
+    def __init__(self, tamanho):
+        self._tamanho = tamanho
+        self._locais = threading.local()
+        self._base = [0] * tamanho      # soma das células de threads que já terminaram
+        self._vivas = []                # (thread, célula)
+        self._trava = threading.Lock()
+
+    def celula(self):
+        try:
+            return self._locais.celula
+        except AttributeError:
+            celula = [0] * self._tamanho
+            with self._trava:
+                self._recolher()
+                self._vivas.append((threading.current_thread(), celula))
+            self._locais.celula = celula
+            return celula
+
+    def _recolher(self):
+        # Thread que terminou não escreve mais: a célula dela vai para a base
+        vivas = []
+        for thread, celula in self._vivas:
+            if thread.is_alive():
+                vivas.append((thread, celula))
+            else:
+                for i, valor in enumerate(celula):
+                    self._base[i] += valor
+        self._vivas = vivas
+
+    def somar(self):
+        with self._trava:
+            self._recolher()
+            totais = list(self._base)
+            celulas = [celula for _, celula in self._vivas]
+        return [totais[i] + sum(celula[i] for celula in celulas) for i in range(self._tamanho)]
+
+
+class _Contador:
+    __slots__ = ('_celulas',)
+
+    def __init__(self):
+        self._celulas = _Celulas(1)
+
+    def incrementar(self, valor=1):
+        self._celulas.celula()[0] += valor
+
+    def amostras(self, nome, rotulos):
+        return [(nome, rotulos, self._celulas.somar()[0])]
+
+
+class _Histograma:
+    __slots__ = ('_celulas', '_limites')
+
+    def __init__(self, limites):
+        self._limites = limites
+        # Uma posição por balde (e a de "acima de todos"), depois a soma
+        self._celulas = _Celulas(len(limites) + 2)
+
+    def observar(self, valor):
+        celula = self._celulas.celula()
+        for i, limite in enumerate(self._limites):
+            if valor <= limite:
+                break
+        else:
+            i = len(self._limites)
+        celula[i] += 1
+        celula[-1] += valor
+
+    def amostras(self, nome, rotulos):
+        totais = self._celulas.somar()
+        linhas, acumulado = [], 0
+        for limite, contagem in zip(self._limites + ('+Inf',), totais):
+            acumulado += contagem
+            linhas.append((f"{nome}_bucket", rotulos + (('le', str(limite)),), acumulado))
+        linhas.append((f"{nome}_sum", rotulos, totais[-1]))
+        linhas.append((f"{nome}_count", rotulos, acumulado))
+        return linhas
+
+
+class Familia:
+    """Métrica com rótulos: uma série por combinação de valores"""
+
+    def __init__(self, nome, ajuda, tipo, rotulos=(), fabrica=_Contador):
+        self.nome = nome
+        self.ajuda = ajuda
+        self.tipo = tipo
+        self.rotulos = tuple(rotulos)
+        self._fabrica = fabrica
+        self._series = {}
+        self._trava = threading.Lock()
+
+    def serie(self, *valores):
+        """Série com esses valores de rótulo (criada na primeira vez)"""
+        serie = self._series.get(valores)
+        if serie is None:
+            with self._trava:
+                serie = self._series.setdefault(valores, self._fabrica())
+        return serie
+
+    def amostras(self):
+        with self._trava:
+            series = list(self._series.items())
+        linhas = []
+        for valores, serie in sorted(series):
+            linhas += serie.amostras(self.nome, tuple(zip(self.rotulos, valores)))
+        return linhas
+
+
+_familias = []
+
+
+def _registrar(familia):
+    _familias.append(familia)
+    return familia
+
+
+FONTE_LATENCIA = _registrar(Familia(
+    "tesouro_fonte_latencia_segundos", "Duração das buscas em cada fonte", "histogram",
+    ("fonte",), fabrica=lambda: _Histograma(LIMITES_LATENCIA),
+))
+FONTE_ERROS = _registrar(Familia(
+    "tesouro_fonte_erros_total", "Buscas que falharam ou nem foram feitas, por motivo", "counter",
+    ("fonte", "motivo"),
+))
+CACHE_CONSULTAS = _registrar(Familia(
+    "tesouro_cache_consultas_total", "Consultas aos caches, por camada e resultado", "counter",
+    ("camada", "resultado"),
+))
+COTACOES = _registrar(Familia(
+    "tesouro_cotacoes_total", "Cotações precificadas, por produto (use rate() para cotações/s)", "counter",
+    ("produto",),
+))
+
+
+def registrar_busca(fonte, segundos, motivo=None):
+    """Latência de uma busca (None se nem foi feita) e, se falhou, o motivo"""
+    if segundos is not None:
+        FONTE_LATENCIA.serie(fonte).observar(segundos)
+    if motivo is not None:
+        FONTE_ERROS.serie(fonte, motivo).incrementar()
+
+
+def registrar_cache(camada, acerto):
+    CACHE_CONSULTAS.serie(camada, "acerto" if acerto else "falha").incrementar()
+
+
+def contar_cotacoes(produto, quantidade):
+    if quantidade:
+        COTACOES.serie(produto).incrementar(quantidade)
+
+
+# ==================== LIDAS NA COLETA ====================
+
+def _disjuntores():
+    from tesouro.disjuntor import ABERTO, FECHADO, MEIO_ABERTO, estados
+
+    linhas = []
+    for fonte, resumo in sorted(estados().items()):
+        for estado in (FECHADO, ABERTO, MEIO_ABERTO):
+            linhas.append(("tesouro_disjuntor_estado", (("fonte", fonte), ("estado", estado)),
+                           int(resumo['estado'] == estado)))
+    return ("tesouro_disjuntor_estado", "Estado do disjuntor de cada fonte (1 no estado atual)", "gauge", linhas)
+
+
+def _snapshot():
+    from tesouro import mercado
+
+    snapshot = mercado._snapshot_atual
+    linhas = []
+    if snapshot is not None:
+        linhas.append(("tesouro_snapshot_idade_segundos", (), snapshot.idade()))
+    return ("tesouro_snapshot_idade_segundos", "Idade do snapshot de mercado do processo", "gauge", linhas)
+
+
+def _caches_lru():
+    from tesouro.cache import _caches
+
+    linhas = []
+    for nome, cache in sorted(_caches.items()):
+        linhas.append(("tesouro_cache_consultas_total", (("camada", f"lru.{nome}"), ("resultado", "acerto")), cache.acertos))
+        linhas.append(("tesouro_cache_consultas_total", (("camada", f"lru.{nome}"), ("resultado", "falha")), cache.falhas))
+    return ("tesouro_cache_consultas_total", None, "counter", linhas)
+
+
+_LIDAS = (_disjuntores, _snapshot, _caches_lru)
+
+
+# ==================== EXPOSIÇÃO ====================
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _linha(nome, rotulos, valor):
+    if not rotulos:
+        return f"{nome} {_numero(valor)}"
+    texto = ",".join(f'{chave}="{_escapar(v)}"' for chave, v in rotulos)
+    return f"{nome}{{{texto}}} {_numero(valor)}"
+
+
+def gerar():
+    """Todas as métricas do processo no formato texto do Prometheus"""
+    blocos = {}
+    for familia in _familias:
+        blocos[familia.nome] = [familia.ajuda, familia.tipo, familia.amostras()]
+    for coletar in _LIDAS:
+        nome, ajuda, tipo, linhas = coletar()
+        if nome in blocos:
+            blocos[nome][2] += linhas   # mesma métrica de outra camada (ex: caches LRU)
+        else:
+            blocos[nome] = [ajuda, tipo, linhas]
+
+    saida = []
+    for nome, (ajuda, tipo, linhas) in blocos.items():
+        saida.append(f"# HELP {nome} {ajuda}")
+        saida.append(f"# TYPE {nome} {tipo}")
+        saida.extend(_linha(*linha) for linha in linhas)
+    return "\n".join(saida) + "\n"
+
+
+class _MetricasHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        corpo = gerar().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", TIPO_CONTEUDO)
+        self.send_header("Content-Length", str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+def servir(porta=PORTA_PADRAO, endereco=ENDERECO_PADRAO):
+    """
+    Sobe um servidor só de métricas (GET /metrics) numa thread daemon
+
+    Serve para processos que não têm HTTP próprio, como o app Streamlit.
+
+    Returns:
+        ThreadingHTTPServer: o servidor (server.shutdown() para parar)
+    """
+    servidor = ThreadingHTTPServer((endereco, porta), _MetricasHandler)
+    threading.Thread(target=servidor.serve_forever, name="metricas", daemon=True).start()
+    return servidor
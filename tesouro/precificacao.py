@@ -0,0 +1,352 @@
+"""
+Precificadores vetorizados do Tesouro Prefixado, Selic e IPCA+.
+
+Fórmulas usadas pela calculadora (app/app.py), pela API, pela CLI e pelos
+scripts das pastas de cada título. Recebem arrays e precificam milhares de
+pedidos em uma única passada do numpy; as versões calcular_* logo abaixo
+atendem um título por vez.
+"""
+import numpy as np
+
+from tesouro import metricas
+from tesouro.calendario import dias_uteis
+from tesouro.mercado import produtos, vencimentos_prefixado
+from tesouro.tributos import calcular_liquido
+
+PRODUTOS = ('prefixado', 'selic', 'ipca')
+VALOR_NOMINAL_PREFIXADO = 1000.0
+
+
+# ==================== FÓRMULAS ====================
+
+def preco_prefixado(taxa_anual, du, vn=VALOR_NOMINAL_PREFIXADO):
+    """PU = VN / [(Taxa/100 + 1)^(du/252)], com a taxa em % a.a."""
+    return vn / ((np.asarray(taxa_anual) / 100 + 1) ** (np.asarray(du) / 252))
+
+
+def cotacao(taxa, du):
+    """Cotação (%) = 100 / (1 + taxa)^(du/252), com a taxa em decimal"""
+    return 100 / ((1 + np.asarray(taxa)) ** (np.asarray(du) / 252))
+
+
+def vna_selic_projetado(vna_atual, taxa_selic_anual):
+    """
+    VNA projetado para D+1 pela Selic diária
+
+    Returns:
+        tuple: (vna_projetado, taxa_selic_diaria)
+    """
+    taxa_diaria = (1 + np.asarray(taxa_selic_anual)) ** (1 / 252) - 1
+    return vna_atual * (1 + taxa_diaria), taxa_diaria
+
+
+def projetar_vna_ipca(vna_atual, ipca_projetado_mensal, meses=1):
+    """VNA projetado = VNA × (1 + IPCA mensal)^meses"""
+    return vna_atual * ((1 + np.asarray(ipca_projetado_mensal)) ** meses)
+
+
+def _datas(anos, meses, dia):
+    """Monta datas dia/mês/ano a partir de arrays de anos e meses"""
+    inicio_ano = (np.asarray(anos) - 1970).astype('datetime64[Y]').astype('datetime64[M]')
+    return (inicio_ano + (np.asarray(meses) - 1)).astype('datetime64[D]') + (dia - 1)
+
+
+def vencimento_selic(anos):
+    """Tesouro Selic vence em 1º de março"""
+    return _datas(anos, 3, 1)
+
+
+def vencimento_ipca(anos):
+    """Tesouro IPCA+ vence em 15/05 nos anos ímpares e 15/08 nos pares"""
+    anos = np.asarray(anos)
+    return _datas(anos, np.where(anos % 2 == 1, 5, 8), 15)
+
+
+# ==================== UM TÍTULO POR VEZ ====================
+# Mesmas assinaturas das calculadoras (app/ e scripts), devolvendo float
+
+def calcular_pu_prefixado_oficial(vn, taxa_anual, du):
+    """Fórmula oficial do Tesouro Direto para títulos prefixados"""
+    return float(preco_prefixado(taxa_anual, du, vn))
+
+
+def calcular_vna_selic_projetado(vna_atual, taxa_selic_anual):
+    """VNA projetado para D+1, com a Selic em decimal"""
+    vna_projetado, taxa_diaria = vna_selic_projetado(vna_atual, taxa_selic_anual)
+    return float(vna_projetado), float(taxa_diaria)
+
+
+def calcular_cotacao_selic(taxa_contratada, dias_uteis):
+    """Cotação do Tesouro Selic, com o ágio/deságio em decimal"""
+    return float(cotacao(taxa_contratada, dias_uteis))
+
+
+def calcular_cotacao_ipca(taxa_real_anual, dias_uteis_vencimento):
+    """Cotação do Tesouro IPCA+, com a taxa real em decimal"""
+    return float(cotacao(taxa_real_anual, dias_uteis_vencimento))
+
+
+# ==================== LOTES ====================
+
+def _campo(pedidos, nome, n, padrao=np.nan):
+    if nome in pedidos and pedidos[nome] is not None:
+        return np.asarray(pedidos[nome], dtype=float)
+    return np.full(n, padrao)
+
+
+def precificar_lote(snapshot, pedidos):
+    """
+    Precifica um lote de pedidos de uma vez
+
+    Args:
+        snapshot (MarketSnapshot): dados de mercado
+        pedidos (dict): arrays de mesmo tamanho com
+            'produto'      -> 'prefixado', 'selic' ou 'ipca'
+            'ano'          -> ano de vencimento
+            'taxa'         -> taxa em % a.a. (prefixado: taxa anual;
+                              selic: ágio/deságio; ipca: taxa real)
+            'selic'        -> Selic projetada % a.a. (só selic)
+            'ipca_mensal'  -> IPCA projetado % ao mês (só ipca)
+            'data'         -> data da compra (opcional, padrão: data do snapshot)
+            'vencimento'   -> vencimento (opcional, padrão: pelo ano e produto)
+            'erro'         -> erros já detectados na leitura (opcional)
+
+    Returns:
+        dict: arrays 'vencimento', 'dias_uteis', 'dias_corridos',
+              'vna_projetado', 'cotacao', 'preco' e 'erro' ('' quando ok)
+    """
+    produto = np.char.lower(np.asarray(pedidos['produto'], dtype=str))
+    n = len(produto)
+    ano = np.asarray(pedidos['ano'], dtype=np.int64)
+    taxa = _campo(pedidos, 'taxa', n)
+    selic = _campo(pedidos, 'selic', n)
+    ipca_mensal = _campo(pedidos, 'ipca_mensal', n)
+    data = np.full(n, np.datetime64(snapshot.data_referencia, 'D'))
+    if pedidos.get('data') is not None:
+        informada = np.asarray(pedidos['data'], dtype='datetime64[D]')
+        data = np.where(np.isnat(informada), data, informada)
+
+    e_pre = produto == 'prefixado'
+    e_selic = produto == 'selic'
+    e_ipca = produto == 'ipca'
+
+    vencimento = np.full(n, np.datetime64('NaT'), dtype='datetime64[D]')
+    vencimento[e_pre] = vencimentos_prefixado(snapshot, ano[e_pre])
+    vencimento[e_selic] = vencimento_selic(ano[e_selic])
+    vencimento[e_ipca] = vencimento_ipca(ano[e_ipca])
+    if pedidos.get('vencimento') is not None:
+        informado = np.asarray(pedidos['vencimento'], dtype='datetime64[D]')
+        vencimento = np.where(np.isnat(informado), vencimento, informado)
+
+    du, dias_corridos = dias_uteis(data, vencimento)
+    sem_vencimento = np.isnat(vencimento)
+    du[sem_vencimento] = 0
+    dias_corridos[sem_vencimento] = 0
+
+    # Prefixado: VN fixo e taxa em %; pós-fixados: VNA projetado × cotação
+    vna_projetado = np.full(n, np.nan)
+    vna_projetado[e_pre] = VALOR_NOMINAL_PREFIXADO
+    vna_projetado[e_selic] = vna_selic_projetado(snapshot.vna_selic, selic[e_selic] / 100)[0]
+    vna_projetado[e_ipca] = projetar_vna_ipca(snapshot.vna_ipca, ipca_mensal[e_ipca] / 100)
+
+    cot = cotacao(taxa / 100, du)
+    preco = vna_projetado * cot / 100
+
+    erro = np.full(n, '', dtype=object)
+    erro[~(e_pre | e_selic | e_ipca)] = 'produto inválido'
+    erro[e_pre & np.isnat(vencimento)] = 'título não encontrado no catálogo'
+    erro[np.isnan(taxa)] = 'taxa não informada'
+    erro[e_selic & np.isnan(selic)] = 'selic não informada'
+    erro[e_ipca & np.isnan(ipca_mensal)] = 'ipca_mensal não informado'
+    if pedidos.get('erro') is not None:
+        anterior = np.asarray(pedidos['erro'], dtype=object)
+        erro = np.where(anterior != '', anterior, erro)
+    ok = erro == ''
+    cot[~ok] = np.nan
+    preco[~ok] = np.nan
+    for nome, mascara in (('prefixado', e_pre), ('selic', e_selic), ('ipca', e_ipca)):
+        metricas.contar_cotacoes(nome, int(np.count_nonzero(mascara & ok)))
+
+    return {
+        'vencimento': vencimento,
+        'dias_uteis': du,
+        'dias_corridos': dias_corridos,
+        'vna_projetado': vna_projetado,
+        'cotacao': cot,
+        'preco': preco,
+        'erro': erro,
+    }
+
+
+def precificar_catalogo(snapshot, selic, ipca_mensal, data=None, linhas=None):
+    """
+    Precifica todos os títulos sem cupom do catálogo (Prefixado, Selic e
+    IPCA+) pela taxa de compra do snapshot, numa única chamada de
+    precificar_lote
+
+    A rentabilidade é a de quem carrega o título até o vencimento: a bruta
+    em % a.a. e a líquida de IOF, IR e custódia da B3 (tesouro.tributos).
+
+    Args:
+        selic (float): Selic projetada % a.a.
+        ipca_mensal (float): IPCA projetado % ao mês
+        data: data da compra (padrão: data do snapshot)
+        linhas: posições do catálogo a precificar (padrão: todos os títulos
+            sem cupom)
+
+    Returns:
+        dict: arrays 'titulo', 'produto', 'taxa', 'pu_mercado', os de
+              precificar_lote, 'duration', 'duration_modificada' (anos),
+              'rentabilidade_bruta' e 'rentabilidade_liquida' (% a.a.)
+    """
+    produto = produtos(snapshot)
+    linhas = np.flatnonzero(produto != '') if linhas is None else np.asarray(linhas, dtype=np.int64)
+    produto = produto[linhas]
+    vencimento = snapshot.vencimentos[linhas]
+    taxa = snapshot.taxa_compra[linhas].astype(float)
+    n = len(linhas)
+    data = np.datetime64(data or snapshot.data_referencia, 'D')
+
+    resultado = precificar_lote(snapshot, {
+        'produto': produto,
+        'ano': vencimento.astype('datetime64[Y]').astype(int) + 1970,
+        'vencimento': vencimento,
+        'taxa': taxa,
+        'selic': np.full(n, selic, dtype=float),
+        'ipca_mensal': np.full(n, ipca_mensal, dtype=float),
+        'data': np.full(n, data),
+    })
+
+    # Rentabilidade bruta: a taxa no prefixado; Selic + ágio/deságio e
+    # IPCA anualizado + taxa real nos pós-fixados
+    bruta = taxa / 100
+    bruta = np.where(produto == 'selic', (1 + selic / 100) * (1 + taxa / 100) - 1, bruta)
+    bruta = np.where(produto == 'ipca', (1 + ipca_mensal / 100) ** 12 * (1 + taxa / 100) - 1, bruta)
+
+    preco = resultado['preco']
+    anos = np.where(resultado['dias_uteis'] > 0, resultado['dias_uteis'] / 252, np.nan)
+    valor_final = preco * (1 + bruta) ** anos
+    liquido = calcular_liquido(1, preco, valor_final, data, resultado['vencimento'])['liquido']
+
+    return {
+        'titulo': snapshot.tipos[linhas].astype(str),
+        'produto': produto,
+        'taxa': taxa,
+        'pu_mercado': snapshot.pu[linhas].astype(float),
+        **resultado,
+        # Sem cupom: a duration de Macaulay é o próprio prazo
+        'duration': anos,
+        'duration_modificada': anos / (1 + bruta),
+        'rentabilidade_bruta': bruta * 100,
+        'rentabilidade_liquida': ((liquido / preco) ** (1 / anos) - 1) * 100,
+    }
+
+
+# ==================== CONVERSÃO DE LINHAS ====================
+
+def _numero(valor):
+    """Converte '13,92', '13.92' ou 13.92 em float (vazio vira NaN)"""
+    if valor is None or valor == '':
+        return np.nan
+    return float(str(valor).replace(',', '.'))
+
+
+def pedidos_de_linhas(linhas):
+    """
+    Converte uma lista de pedidos (dicts vindos de JSON ou CSV) no formato
+    colunar de precificar_lote
+
+    Linhas com valores inválidos não interrompem o lote: recebem a
+    mensagem em 'erro' e saem sem preço.
+    """
+    n = len(linhas)
+    pedidos = {
+        'produto': np.empty(n, dtype=object),
+        'ano': np.zeros(n, dtype=np.int64),
+        'taxa': np.full(n, np.nan),
+        'selic': np.full(n, np.nan),
+        'ipca_mensal': np.full(n, np.nan),
+        'data': np.full(n, np.datetime64('NaT'), dtype='datetime64[D]'),
+        'erro': np.full(n, '', dtype=object),
+    }
+
+    for i, linha in enumerate(linhas):
+        if not isinstance(linha, dict):
+            pedidos['produto'][i] = ''
+            pedidos['erro'][i] = "pedido inválido: esperado um objeto JSON"
+            continue
+        try:
+            pedidos['produto'][i] = str(linha.get('produto', '')).strip().lower()
+            pedidos['ano'][i] = int(linha['ano'])
+            pedidos['taxa'][i] = _numero(linha.get('taxa'))
+            pedidos['selic'][i] = _numero(linha.get('selic'))
+            pedidos['ipca_mensal'][i] = _numero(linha.get('ipca_mensal'))
+            if linha.get('data'):
+                pedidos['data'][i] = np.datetime64(str(linha['data'])[:10], 'D')
+        except (KeyError, TypeError, ValueError) as e:
+            pedidos['produto'][i] = pedidos['produto'][i] or ''
+            pedidos['erro'][i] = f"pedido inválido: {e}"
+
+    pedidos['produto'] = pedidos['produto'].astype(str)
+    return pedidos
+
+
+def linhas_de_resultado(linhas, resultado):
+    """Junta cada pedido original com o seu resultado, um dict por linha"""
+    vencimentos = resultado['vencimento'].astype(str)
+    for i, linha in enumerate(linhas):
+        saida = dict(linha) if isinstance(linha, dict) else {'pedido': linha}
+        if resultado['erro'][i]:
+            saida['erro'] = resultado['erro'][i]
+        else:
+            saida.update({
+                'vencimento': vencimentos[i],
+                'dias_uteis': int(resultado['dias_uteis'][i]),
+                'dias_corridos': int(resultado['dias_corridos'][i]),
+                'vna_projetado': float(resultado['vna_projetado'][i]),
+                'cotacao': float(resultado['cotacao'][i]),
+                'preco': float(resultado['preco'][i]),
+            })
+        yield saida
+
+
+def reprecificar_catalogo(anterior, snapshot, delta, selic, ipca_mensal, data=None):
+    """
+    Atualiza um resultado de precificar_catalogo para um snapshot novo,
+    reprecificando só os títulos que o delta (tesouro.cdc) afetou
+
+    Um título é afetado quando seu PU ou taxas mudaram, ou quando mudou o
+    VNA do seu produto. Mudança de data de referência (sem `data` fixa) ou
+    no formato do catálogo refaz tudo.
+
+    Args:
+        anterior (dict): saída de precificar_catalogo com os mesmos selic,
+            ipca_mensal e data, no snapshot da versão delta.versao_anterior
+        delta (Delta): de cdc.delta_desde(versão do anterior); None refaz tudo
+
+    Returns:
+        dict: no formato de precificar_catalogo
+    """
+    if (anterior is None or delta is None or delta.estrutural
+            or (data is None and 'data_referencia' in delta.gerais)):
+        return precificar_catalogo(snapshot, selic, ipca_mensal, data)
+
+    produto = produtos(snapshot)
+    linhas = np.flatnonzero(produto != '')
+    produto = produto[linhas]
+    chaves = zip(snapshot.tipos[linhas].tolist(), snapshot.vencimentos[linhas].astype(str).tolist())
+    afetadas = np.fromiter((chave in delta.alterados for chave in chaves), dtype=bool, count=len(linhas))
+    if 'vna_selic' in delta.gerais:
+        afetadas |= produto == 'selic'
+    if 'vna_ipca' in delta.gerais:
+        afetadas |= produto == 'ipca'
+    if not afetadas.any():
+        return anterior
+
+    parcial = precificar_catalogo(snapshot, selic, ipca_mensal, data, linhas=linhas[afetadas])
+    resultado = {}
+    for chave, valores in anterior.items():
+        valores = valores.copy()
+        valores[afetadas] = parcial[chave]
+        resultado[chave] = valores
+    return resultado
@@ -0,0 +1,116 @@
+"""
+Sensibilidade do PU à taxa e à data de referência.
+
+Em vez de recalcular um título a cada taxa digitada, monta-se de uma vez
+uma grade datas × taxas com todos os PUs (broadcasting do numpy sobre os
+precificadores de tesouro.precificacao). Quem exibe a grade só consulta
+posições dela; para desenhar, grades grandes são reduzidas a poucas
+linhas e colunas.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+
+from tesouro.calendario import dias_uteis
+from tesouro.precificacao import (
+    VALOR_NOMINAL_PREFIXADO,
+    cotacao,
+    preco_prefixado,
+    projetar_vna_ipca,
+    vencimento_ipca,
+    vencimento_selic,
+    vencimentos_prefixado,
+    vna_selic_projetado,
+)
+
+# Tamanho padrão da grade: taxas de ±AMPLITUDE_TAXA p.p. em passos de
+# PASSO_TAXA, e no máximo MAX_DATAS datas entre hoje e o vencimento
+AMPLITUDE_TAXA = 5.0
+PASSO_TAXA = 0.01
+MAX_DATAS = 2000
+
+
+@dataclass(frozen=True)
+class GradePU:
+    datas: np.ndarray       # datetime64[D], linhas da grade
+    taxas: np.ndarray       # % a.a., colunas da grade
+    pu: np.ndarray          # PU de cada (data, taxa)
+    vencimento: np.datetime64
+
+    def posicao(self, data, taxa):
+        """Linha e coluna mais próximas de (data, taxa)"""
+        linha = np.searchsorted(self.datas, np.datetime64(data, 'D'))
+        coluna = np.abs(self.taxas - taxa).argmin()
+        return min(int(linha), len(self.datas) - 1), int(coluna)
+
+    def pu_em(self, data, taxa):
+        """PU da grade no ponto mais próximo de (data, taxa)"""
+        return float(self.pu[self.posicao(data, taxa)])
+
+
+def _vencimento(snapshot, produto, ano):
+    if produto == 'prefixado':
+        return vencimentos_prefixado(snapshot, [ano])[0]
+    if produto == 'selic':
+        return vencimento_selic([ano])[0]
+    return vencimento_ipca([ano])[0]
+
+
+def grade_pu(snapshot, produto, ano, taxa_central, inicio=None, selic=None, ipca_mensal=None,
+             amplitude=AMPLITUDE_TAXA, passo=PASSO_TAXA, max_datas=MAX_DATAS):
+    """
+    PUs de um título para uma faixa de taxas e todas as datas até o vencimento
+
+    Args:
+        produto (str): 'prefixado', 'selic' ou 'ipca'
+        ano (int): ano de vencimento
+        taxa_central (float): centro da faixa de taxas, % a.a. (no Selic,
+            o ágio/deságio)
+        inicio: primeira data (padrão: data do snapshot)
+        selic (float): Selic projetada % a.a. (só selic)
+        ipca_mensal (float): IPCA projetado % ao mês (só ipca)
+
+    Returns:
+        GradePU, ou None se o título não existir no catálogo
+    """
+    vencimento = _vencimento(snapshot, produto, ano)
+    inicio = np.datetime64(inicio or snapshot.data_referencia, 'D')
+    if np.isnat(vencimento) or vencimento <= inicio:
+        return None
+
+    # Datas corridas até o vencimento, espaçadas para caber em max_datas
+    passo_datas = max(1, int(np.ceil((vencimento - inicio).astype(int) / max_datas)))
+    datas = np.arange(inicio, vencimento, passo_datas)
+    taxas = np.round(np.arange(taxa_central - amplitude, taxa_central + amplitude + passo / 2, passo), 6)
+    if produto != 'selic':
+        taxas = taxas[taxas > -100]
+
+    du, _ = dias_uteis(datas, vencimento)
+    du = du[:, None]
+    if produto == 'prefixado':
+        pu = preco_prefixado(taxas[None, :], du, VALOR_NOMINAL_PREFIXADO)
+    else:
+        if produto == 'selic':
+            vna = vna_selic_projetado(snapshot.vna_selic, selic / 100)[0]
+        else:
+            vna = projetar_vna_ipca(snapshot.vna_ipca, ipca_mensal / 100)
+        pu = vna * cotacao(taxas[None, :] / 100, du) / 100
+
+    return GradePU(datas=datas, taxas=taxas, pu=np.asarray(pu, dtype=float), vencimento=vencimento)
+
+
+def reduzir(grade, max_linhas=120, max_colunas=120):
+    """
+    Grade com no máximo max_linhas × max_colunas pontos, para desenhar
+
+    Pega linhas e colunas igualmente espaçadas (sempre com a primeira e a
+    última); os valores são os da grade original, sem interpolação.
+    """
+    linhas = np.unique(np.linspace(0, len(grade.datas) - 1, min(max_linhas, len(grade.datas))).round().astype(int))
+    colunas = np.unique(np.linspace(0, len(grade.taxas) - 1, min(max_colunas, len(grade.taxas))).round().astype(int))
+    return GradePU(
+        datas=grade.datas[linhas],
+        taxas=grade.taxas[colunas],
+        pu=grade.pu[np.ix_(linhas, colunas)],
+        vencimento=grade.vencimento,
+    )
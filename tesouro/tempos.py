@@ -0,0 +1,226 @@
+"""
+Tempos por etapa da precificação (spans).
+
+Cada etapa (buscar VNA, projetar, dias úteis, cotação, preço) e cada
+chamada às fontes pode ser envolvida em `with etapa("nome"):`. Desligado
+(o padrão), etapa() devolve sempre o mesmo objeto vazio e o custo é o de
+uma chamada de função. Ligado, cada etapa:
+
+    - soma sua duração num histograma do processo (histogramas());
+    - entra na lista da requisição em andamento (a devolvida por
+      requisicao(), usada pelo painel de depuração do app);
+    - vira uma linha no arquivo JSONL de trace, se houver um.
+
+Liga com TESOURO_TEMPOS=1 (e TESOURO_TRACE=caminho.jsonl para o arquivo)
+ou com ativar(), para o processo inteiro. Para medir só uma requisição
+(o painel de depuração de uma sessão do app), requisicao(..., ligar=True):
+as etapas dela entram só na lista devolvida, sem histogramas nem trace.
+"""
+import bisect
+import contextvars
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+HABILITADO = os.environ.get("TESOURO_TEMPOS", "") not in ("", "0")
+CAMINHO_TRACE = os.environ.get("TESOURO_TRACE") or None
+
+# Limites (ms) dos baldes dos histogramas
+LIMITES_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histograma:
+    """Contagem de durações por balde, com total e soma"""
+
+    def __init__(self, limites=LIMITES_MS):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)   # o último balde é "acima do maior limite"
+        self.total = 0
+        self.soma_ms = 0.0
+
+    def registrar(self, ms):
+        self.contagens[bisect.bisect_left(self.limites, ms)] += 1
+        self.total += 1
+        self.soma_ms += ms
+
+    def percentil(self, p):
+        """Limite superior do balde onde cai o percentil p (0-100)"""
+        if not self.total:
+            return None
+        alvo = self.total * p / 100
+        acumulado = 0
+        for limite, contagem in zip(self.limites + (float('inf'),), self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return limite
+        return float('inf')
+
+    def resumo(self):
+        return {
+            'total': self.total,
+            'media_ms': self.soma_ms / self.total if self.total else None,
+            'p50_ms': self.percentil(50),
+            'p95_ms': self.percentil(95),
+            'p99_ms': self.percentil(99),
+        }
+
+
+_histogramas = {}
+_trava = threading.Lock()
+_arquivo = None
+
+_requisicao = contextvars.ContextVar('requisicao_tempos', default=None)
+_pai = contextvars.ContextVar('etapa_pai', default=None)
+_ligado = contextvars.ContextVar('tempos_ligado', default=False)
+_ultima = []
+_ids = itertools.count(1)
+
+
+def _registrar(registro):
+    with _trava:
+        histograma = _histogramas.get(registro['nome'])
+        if histograma is None:
+            histograma = _histogramas[registro['nome']] = Histograma()
+        histograma.registrar(registro['duracao_ms'])
+
+        if CAMINHO_TRACE:
+            global _arquivo
+            if _arquivo is None:
+                _arquivo = open(CAMINHO_TRACE, "a", encoding="utf-8")
+            _arquivo.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+            _arquivo.flush()
+
+
+class _Etapa:
+    __slots__ = ('nome', 'atributos', 'inicio', 'instante', 'token')
+
+    def __init__(self, nome, atributos):
+        self.nome = nome
+        self.atributos = atributos
+
+    def __enter__(self):
+        self.token = _pai.set(self.nome)
+        self.instante = time.time()
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, erro, rastro):
+        duracao_ms = (time.perf_counter() - self.inicio) * 1000
+        _pai.reset(self.token)
+        requisicao = _requisicao.get()
+        registro = {
+            'nome': self.nome,
+            'pai': _pai.get(),
+            'requisicao': requisicao[0] if requisicao else None,
+            'instante': self.instante,
+            'duracao_ms': duracao_ms,
+            **({'erro': tipo.__name__} if tipo is not None else {}),
+            **self.atributos,
+        }
+        if requisicao is not None:
+            requisicao[1].append(registro)
+        if HABILITADO:
+            _registrar(registro)
+        return False
+
+
+class _EtapaNula:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, erro, rastro):
+        return False
+
+
+_NULA = _EtapaNula()
+
+
+def etapa(nome, **atributos):
+    """Context manager que mede o bloco (não faz nada se desligado)"""
+    if not HABILITADO and not _ligado.get():
+        return _NULA
+    return _Etapa(nome, atributos)
+
+
+def medido(nome):
+    """Decorador: mede cada chamada da função como uma etapa"""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not HABILITADO and not _ligado.get():
+                return funcao(*args, **kwargs)
+            with _Etapa(nome, {}):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+@contextmanager
+def requisicao(nome, ligar=False, **atributos):
+    """
+    Agrupa as etapas do bloco (inclusive em outras threads que copiem o
+    contexto) como uma requisição; ao terminar, ela vira a última requisição
+
+    Args:
+        ligar (bool): mede esta requisição mesmo com a medição do processo
+            desligada (as etapas ficam só na lista devolvida)
+
+    Yields:
+        list: as etapas registradas até agora (vazia se desligado)
+    """
+    global _ultima
+    if not HABILITADO and not ligar:
+        yield []
+        return
+
+    etapas = []
+    token = _requisicao.set((next(_ids), etapas))
+    token_ligado = _ligado.set(True)
+    try:
+        with _Etapa(nome, atributos):
+            yield etapas
+    finally:
+        _ligado.reset(token_ligado)
+        _requisicao.reset(token)
+        if HABILITADO:
+            _ultima = etapas
+
+
+def ultima_requisicao():
+    """
+    Etapas da última requisição terminada no processo (de qualquer
+    thread), na ordem em que acabaram; para as de uma requisição
+    específica, use a lista devolvida por requisicao()
+    """
+    return list(_ultima)
+
+
+def histogramas():
+    """Resumo do histograma de cada etapa"""
+    with _trava:
+        return {nome: h.resumo() for nome, h in sorted(_histogramas.items())}
+
+
+def ativar(habilitado=True, caminho_trace=None):
+    """Liga (ou desliga) a medição; caminho_trace grava as etapas em JSONL"""
+    global HABILITADO, CAMINHO_TRACE, _arquivo
+    with _trava:
+        HABILITADO = habilitado
+        if caminho_trace != CAMINHO_TRACE and _arquivo is not None:
+            _arquivo.close()
+            _arquivo = None
+        CAMINHO_TRACE = caminho_trace
+
+
+def limpar():
+    """Zera os histogramas e a última requisição"""
+    global _ultima
+    with _trava:
+        _histogramas.clear()
+        _ultima = []
@@ -0,0 +1,91 @@
+"""
+Impostos e taxas sobre o resgate de títulos do Tesouro Direto.
+
+Todas as funções aceitam arrays (um elemento por lote) e fazem o cálculo de
+uma vez com numpy, para servir tanto a uma carteira inteira quanto aos
+milhares de lotes de um backtest.
+
+Regras consideradas:
+    - IR regressivo sobre o rendimento (22,5% até 180 dias ... 15% acima
+      de 720 dias), calculado após o IOF;
+    - IOF regressivo sobre o rendimento para resgates com menos de 30 dias;
+    - taxa de custódia da B3 de 0,20% a.a., proporcional aos dias corridos,
+      sobre o valor médio da posição no período.
+"""
+import numpy as np
+
+# Tabela regressiva do IR: (dias corridos até, alíquota)
+TABELA_IR = ((180, 0.225), (360, 0.20), (720, 0.175))
+ALIQUOTA_IR_LONGO_PRAZO = 0.15
+
+# Alíquota do IOF sobre o rendimento para resgate no dia 0, 1, ..., 29
+TABELA_IOF = np.array([
+    100, 96, 93, 90, 86, 83, 80, 76, 73, 70,
+    66, 63, 60, 56, 53, 50, 46, 43, 40, 36,
+    33, 30, 26, 23, 20, 16, 13, 10, 6, 3,
+]) / 100
+
+TAXA_CUSTODIA_B3 = 0.002
+
+
+def aliquota_ir(dias):
+    """Alíquota do IR pela tabela regressiva, para um array de prazos em dias"""
+    dias = np.asarray(dias)
+    condicoes = [dias <= limite for limite, _ in TABELA_IR]
+    aliquotas = [aliquota for _, aliquota in TABELA_IR]
+    return np.select(condicoes, aliquotas, default=ALIQUOTA_IR_LONGO_PRAZO)
+
+
+def aliquota_iof(dias):
+    """Alíquota do IOF regressivo (zero a partir de 30 dias)"""
+    dias = np.asarray(dias)
+    indice = np.clip(dias, 0, len(TABELA_IOF) - 1)
+    return np.where(dias < len(TABELA_IOF), TABELA_IOF[indice], 0.0)
+
+
+def calcular_liquido(quantidade, pu_compra, pu_venda, data_compra, data_venda,
+                     taxa_custodia=TAXA_CUSTODIA_B3, isento_custodia=False):
+    """
+    Calcula o valor líquido do resgate de vários lotes de uma vez
+
+    Os argumentos podem ser escalares ou arrays de formatos compatíveis
+    (broadcasting do numpy), por exemplo estratégias × aportes.
+
+    Args:
+        quantidade: quantidade de títulos de cada lote
+        pu_compra: PU pago na compra
+        pu_venda: PU recebido no resgate
+        data_compra, data_venda: datas (datetime64, date ou "AAAA-MM-DD")
+        taxa_custodia (float): taxa anual da B3 em decimal
+        isento_custodia: máscara dos lotes isentos de custódia
+
+    Returns:
+        dict: arrays 'dias', 'bruto', 'rendimento', 'iof', 'ir',
+              'custodia' e 'liquido'
+    """
+    quantidade = np.asarray(quantidade, dtype=float)
+    pu_compra = np.asarray(pu_compra, dtype=float)
+    pu_venda = np.asarray(pu_venda, dtype=float)
+    dias = (np.asarray(data_venda, dtype='datetime64[D]')
+            - np.asarray(data_compra, dtype='datetime64[D]')).astype(int)
+
+    bruto = quantidade * pu_venda
+    rendimento = bruto - quantidade * pu_compra
+    tributavel = np.maximum(rendimento, 0.0)
+
+    iof = tributavel * aliquota_iof(dias)
+    ir = (tributavel - iof) * aliquota_ir(dias)
+
+    valor_medio = quantidade * (pu_compra + pu_venda) / 2
+    custodia = valor_medio * taxa_custodia * np.maximum(dias, 0) / 365
+    custodia = np.where(isento_custodia, 0.0, custodia)
+
+    return {
+        'dias': dias,
+        'bruto': bruto,
+        'rendimento': rendimento,
+        'iof': iof,
+        'ir': ir,
+        'custodia': custodia,
+        'liquido': bruto - iof - ir - custodia,
+    }
@@ -0,0 +1,147 @@
+"""
+VNA (Valor Nominal Atualizado) do Tesouro Selic e do Tesouro IPCA+.
+
+O VNA do IPCA+ é guardado como série mensal acumulada (um valor por mês
+desde jul/2000), então o VNA de qualquer mês sai de uma consulta ao índice,
+sem refazer o produto da série inteira. O da LFT vem pronto da fonte.
+
+O VNA da LFT tem duas fontes, consultadas com hedge (tesouro.fontes): a
+ANBIMA (vna.txt) e o brasilindicadores. O da NTN-B vem só do BCB (série do
+IPCA acumulada até o último mês divulgado): o VNA da NTN-B no vna.txt da
+ANBIMA é o do dia, já com o IPCA projetado pro rata, outra grandeza, e as
+calculadoras projetam o mês seguinte a partir do acumulado. Se as fontes
+falharem, vale o último VNA válido.
+"""
+from dataclasses import dataclass
+from datetime import date
+
+import numpy as np
+
+from tesouro import dados
+from tesouro.fontes import Fonte, FontesIndisponiveis, buscar_com_hedge, idade_ultimo_valido, ultimo_valido
+
+# Base do VNA do IPCA+: R$ 1.000,00 em 15/07/2000
+DATA_BASE_VNA_IPCA = "2000-07-01"
+VNA_BASE_IPCA = 1000.0
+
+# Diferença aceita entre as fontes e variação máxima contra o último VNA
+# válido, por mês desde que ele foi gravado (composta; mínimo de um mês)
+TOLERANCIA_ENTRE_FONTES = 0.01
+VARIACAO_MAXIMA = 0.10
+SEGUNDOS_MES = 30 * 86400
+
+
+@dataclass(frozen=True)
+class SerieVNA:
+    meses: np.ndarray       # datetime64[M], mês de cada IPCA
+    valores: np.ndarray     # VNA acumulado até o fim de cada mês
+
+    def em(self, data=None):
+        """
+        VNA acumulado até o último IPCA divulgado em `data` (padrão: hoje)
+
+        Returns:
+            tuple: (vna, mês de referência "MM/AAAA")
+        """
+        mes = np.datetime64(data or date.today(), 'M')
+        posicao = np.searchsorted(self.meses, mes, side='right') - 1
+        if posicao < 0:
+            raise ValueError("Série do IPCA sem dados no período")
+        referencia = self.meses[posicao].astype(object)
+        return float(self.valores[posicao]), referencia.strftime('%m/%Y')
+
+
+def serie_vna_ipca(serie):
+    """
+    Acumula a série do IPCA (dados.buscar_serie_ipca) desde jul/2000
+
+    Returns:
+        SerieVNA
+    """
+    meses = serie["data"].to_numpy(dtype='datetime64[M]')
+    valores = serie["valor"].to_numpy(dtype=float)
+    base = meses >= np.datetime64(DATA_BASE_VNA_IPCA, 'M')
+    ordem = np.argsort(meses[base], kind='stable')
+    meses, valores = meses[base][ordem], valores[base][ordem]
+    return SerieVNA(meses=meses, valores=VNA_BASE_IPCA * np.cumprod(1 + valores))
+
+
+def calcular_vna_ipca(serie, ate=None):
+    """
+    VNA do IPCA+ acumulando a série até a data `ate` (padrão: hoje)
+
+    Returns:
+        tuple: (vna, mês de referência "MM/AAAA")
+    """
+    return serie_vna_ipca(serie).em(ate)
+
+
+def _da_anbima(codigo):
+    def buscar():
+        for titulo, valor in dados.buscar_vnas_anbima().items():
+            if codigo in titulo:
+                return valor
+        raise KeyError(f"{codigo} não encontrado no vna.txt da ANBIMA")
+    return buscar
+
+
+def variacao_aceita(idade):
+    """
+    Variação máxima contra um último válido com `idade` segundos
+
+    Cresce com o tempo: depois de uma queda longa das fontes o VNA andou de
+    verdade, e um limite fixo recusaria para sempre todo valor novo.
+    """
+    meses = max(1.0, (idade or 0.0) / SEGUNDOS_MES)
+    return (1 + VARIACAO_MAXIMA) ** meses - 1
+
+
+def _validador(chave):
+    """validar(valor, referencia) para buscar_com_hedge, com o limite pela idade do último válido"""
+    variacao = variacao_aceita(idade_ultimo_valido(chave))
+
+    def valido(valor, referencia):
+        vna = valor[0]
+        if not (np.isfinite(vna) and vna > 0):
+            return False
+        return referencia is None or abs(vna / referencia[0] - 1) <= variacao
+    return valido
+
+
+FONTES_VNA_SELIC = [
+    Fonte('anbima', _da_anbima('LFT')),
+    Fonte('brasilindicadores', dados.buscar_vna_selic),
+]
+
+FONTES_VNA_IPCA = [
+    Fonte('bcb', lambda: calcular_vna_ipca(dados.buscar_serie_ipca())),
+]
+
+
+def _buscar_vna(chave, fontes):
+    """
+    VNA da primeira fonte válida; se nenhuma responder, o último válido
+
+    Returns:
+        tuple: (vna, data de referência)
+    """
+    try:
+        valor, _ = buscar_com_hedge(chave, fontes, _validador(chave), TOLERANCIA_ENTRE_FONTES)
+        dados.marcar_obsoleto(chave, False)
+        return valor
+    except FontesIndisponiveis:
+        ultimo = ultimo_valido(chave)
+        if ultimo is None:
+            raise
+        dados.marcar_obsoleto(chave)
+        return ultimo[0], f"{ultimo[1]} (último válido)"
+
+
+def vna_selic_atual():
+    """VNA atual do Tesouro Selic"""
+    return _buscar_vna('vna_selic', FONTES_VNA_SELIC)
+
+
+def vna_ipca_atual():
+    """VNA atual do IPCA+"""
+    return _buscar_vna('vna_ipca', FONTES_VNA_IPCA)
@@ -0,0 +1,47 @@
+"""
+Precificação em lote pela linha de comando (tesouro.cli), com os dados
+gravados dos benchmarks no lugar do mercado de verdade.
+
+    python -m pytest tests
+"""
+import csv
+import io
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+sys.path.insert(0, str(RAIZ / "benchmarks"))
+
+import dados_gravados
+from tesouro import cli
+
+
+def _precificar_csv(texto_jsonl):
+    saida = io.StringIO()
+    snapshot = dados_gravados.carregar().snapshot()
+    cli.precificar_fluxo(io.StringIO(texto_jsonl), saida, 'jsonl', 'csv', snapshot=snapshot)
+    saida.seek(0)
+    leitor = csv.DictReader(saida)
+    return leitor.fieldnames, list(leitor)
+
+
+def test_primeira_linha_malformada_nao_derruba_colunas_da_entrada():
+    campos, linhas = _precificar_csv(
+        '{"produto": "selic", "ano": 2029\n'
+        '{"produto": "selic", "ano": 2029, "taxa": 0.05, "selic": 11.75, "cliente": "A"}\n'
+        '{"produto": "prefixado", "ano": 2031, "taxa": 13.5, "cliente": "B"}\n'
+    )
+
+    assert campos[:5] == ['produto', 'ano', 'taxa', 'selic', 'cliente']
+    assert campos[5:] == list(cli.CAMPOS_RESULTADO)
+    assert linhas[0]['erro'].startswith("JSON inválido na linha 1")
+    assert [linha['cliente'] for linha in linhas[1:]] == ['A', 'B']
+    assert all(linha['preco'] and not linha['erro'] for linha in linhas[1:])
+
+
+def test_bloco_sem_pedido_valido_usa_colunas_documentadas():
+    campos, linhas = _precificar_csv('{quebrado\n')
+
+    assert campos == list(cli.CAMPOS_PEDIDO) + list(cli.CAMPOS_RESULTADO)
+    assert len(linhas) == 1 and linhas[0]['erro']